@@ -0,0 +1,271 @@
+"""
+Analytics - ส่งออกสถิติของรายงานทั้งหมด (รายข่าว รายวัน รายผู้ใช้) เป็นไฟล์แบบ columnar สำหรับนักวิเคราะห์
+
+    python analytics.py export                                   (ทุกตาราง เป็น CSV ใน Config.ANALYTICS_OUTPUT_DIR)
+    python analytics.py export --db /tmp/bench.db --format npz --out /tmp/analytics
+    python analytics.py export --tables rumours days --chunk-size 50000
+
+- อ่านตาราง Report ทีละช่วงของ report_id (Config.ANALYTICS_CHUNK_SIZE) แต่ละแถวถูกอัดใน SQL เป็นจำนวนเต็มสองค่า
+  (รหัสข่าว/วัน/ประเภท และรหัสผู้ใช้) ที่ต่อกันเป็นข้อความก้อนเดียวต่อคอลัมน์ด้วย group_concat
+  แล้วแปลงเป็น array ด้วย NumPy - ไม่มี tuple/int ของ Python ต่อรายงาน (ต้นทุนหลักเมื่ออ่านทีละแถวด้วย fetchmany)
+- นับรวมทีละ chunk ลงตัวสะสมขนาดเท่าจำนวนข่าว/วัน/ผู้ใช้ หน่วยความจำจึงไม่โตตามจำนวนรายงาน
+- เปิดฐานข้อมูลแบบอ่านอย่างเดียว (ไม่ migrate ไม่เขียน) และอ่านทุกอย่างใน transaction เดียว
+  ทุกตารางจึงมาจาก snapshot เดียวกันแม้ระบบยังรับรายงานอยู่
+
+ตารางที่ส่งออก (คอลัมน์ <ประเภท> คือ distorted_count, inciting_count, false_count, credible_count
+ตามลำดับของ ReportModel.REPORT_TYPES และ credibility_score ใช้สูตรเดียวกับ RumourModel.score_from_counts
+ซึ่งปัดเศษครึ่งพอดีต่างจาก ROUND ของ trigger จึงอาจต่างจาก Rumour.credibility_score ได้ 0.01):
+    rumours  rumour_id, report_count, <ประเภท>, credibility_score, first_report, last_report   (ทุกข่าว)
+    days     date, report_count, <ประเภท>, credibility_score          (ทุกวันตั้งแต่รายงานแรกถึงรายงานล่าสุด)
+    users    user_id, report_count, <ประเภท>, first_report, last_report   (เฉพาะผู้ใช้ที่เคยรายงาน)
+
+format csv เขียนหนึ่งไฟล์ต่อตาราง ส่วน npz เขียน array ต่อคอลัมน์ (np.load แล้วใช้ได้ทันที วันที่เป็น datetime64[D])
+ต้องติดตั้ง NumPy (pip install numpy) - ส่วนอื่นของระบบไม่ใช้
+"""
+import argparse
+import csv
+import os
+import pathlib
+import sqlite3
+import sys
+import time
+from config.settings import Config
+from models.report import ReportModel
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+TABLES = ('rumours', 'days', 'users')
+FORMATS = ('csv', 'npz')
+TYPE_COLUMNS = ('distorted_count', 'inciting_count', 'false_count', 'credible_count')  # ตาม REPORT_TYPES
+CREDIBLE = ReportModel.REPORT_TYPES.index('น่าเชื่อถือ')
+
+DAY_BITS = 16  # วันนับจาก 1970-01-01 (ใช้ได้ถึงปี 2149)
+TYPE_BITS = 2
+LOOKUP_SPREAD = 4  # ใช้ตาราง lookup เมื่อ id สูงสุดไม่เกินกี่เท่าของจำนวน id (ขนาดตาราง 8 ไบต์ต่อค่า)
+_DAY = 'CAST(julianday({}) - 2440587.5 AS INTEGER)'
+_TYPE = 'CASE report_type {} END'.format(
+    ' '.join(f'WHEN ? THEN {code}' for code in range(len(ReportModel.REPORT_TYPES))))
+_PACKED = f"(rumour_id << {DAY_BITS + TYPE_BITS}) | ({_DAY.format('report_date')} << {TYPE_BITS}) | {_TYPE}"
+_REPORTS = (
+    f"SELECT group_concat({_PACKED}, ','), group_concat(user_id, ',') "
+    f"FROM Report WHERE report_id > ? AND report_id <= ?"
+)
+_DAY_RANGE = f"SELECT {_DAY.format('MIN(report_date)')}, {_DAY.format('MAX(report_date)')} FROM Report"
+
+
+def require_numpy():
+    if np is None:
+        raise SystemExit('ต้องติดตั้ง NumPy ก่อน: pip install numpy')
+
+
+def connect(db_path):
+    """เปิดฐานข้อมูลแบบอ่านอย่างเดียว (autocommit - ควบคุม transaction เองด้วย BEGIN)"""
+    if not os.path.exists(db_path):
+        raise SystemExit(f'ไม่พบไฟล์ฐานข้อมูล {db_path}')
+    uri = pathlib.Path(db_path).resolve().as_uri() + '?mode=ro'
+    return sqlite3.connect(uri, uri=True, isolation_level=None)
+
+
+def iter_report_chunks(conn, chunk_size=None):
+    """อ่านตาราง Report ทีละช่วงของ report_id กว้าง chunk_size คืนค่า dict ของคอลัมน์ (numpy array int64):
+    rumour_id, user_id, day (วันนับจาก 1970-01-01) และ type (ลำดับใน ReportModel.REPORT_TYPES)
+    """
+    chunk_size = chunk_size or Config.ANALYTICS_CHUNK_SIZE
+    first, last = conn.execute("SELECT MIN(report_id), MAX(report_id) FROM Report").fetchone()
+    if first is None:
+        return
+    for start in range(first - 1, last, chunk_size):
+        packed, user_ids = conn.execute(_REPORTS, ReportModel.REPORT_TYPES + (start, start + chunk_size)).fetchone()
+        if packed is None:
+            continue  # ช่วงที่รายงานถูกลบหมด
+        key = np.fromstring(packed, dtype=np.int64, sep=',')
+        yield {
+            'rumour_id': key >> (DAY_BITS + TYPE_BITS),
+            'user_id': np.fromstring(user_ids, dtype=np.int64, sep=','),
+            'day': (key >> TYPE_BITS) & ((1 << DAY_BITS) - 1),
+            'type': key & ((1 << TYPE_BITS) - 1),
+        }
+
+
+class Tally:
+    """ตัวนับรายงานแยกประเภทของ entity ชุดหนึ่ง (ข่าว/วัน/ผู้ใช้) และวันแรก/วันล่าสุดที่มีรายงาน"""
+
+    def __init__(self, size, track_days=True):
+        self.counts = np.zeros((size, len(ReportModel.REPORT_TYPES)), dtype=np.int64)
+        self.first = np.full(size, np.iinfo(np.int64).max) if track_days else None
+        self.last = np.full(size, np.iinfo(np.int64).min) if track_days else None
+
+    def add(self, index, types, days=None):
+        """นับรายงานหนึ่ง chunk (index: ตำแหน่งของ entity ของแต่ละรายงาน)"""
+        np.add.at(self.counts.reshape(-1), index * self.counts.shape[1] + types, 1)
+        if self.first is not None:
+            np.minimum.at(self.first, index, days)
+            np.maximum.at(self.last, index, days)
+
+    def columns(self):
+        """คอลัมน์ report_count, <ประเภท>, credibility_score (dict ตามลำดับ)"""
+        total = self.counts.sum(axis=1)
+        columns = {'report_count': total}
+        columns.update(zip(TYPE_COLUMNS, self.counts.T))
+        columns['credibility_score'] = credibility_scores(self.counts[:, CREDIBLE], total)
+        return columns
+
+    def report_dates(self):
+        """คอลัมน์ first_report, last_report (NaT เมื่อไม่มีรายงาน)"""
+        reported = self.counts.any(axis=1)
+        return {
+            'first_report': _dates(np.where(reported, self.first, 0), reported),
+            'last_report': _dates(np.where(reported, self.last, 0), reported),
+        }
+
+
+def credibility_scores(credible, total):
+    """คะแนนความน่าเชื่อถือของทุกแถว - สูตรเดียวกับ RumourModel.score_from_counts (0.0 เมื่อไม่มีรายงาน)"""
+    scores = np.zeros(len(total))
+    np.divide(credible * 100.0, total, out=scores, where=total > 0)
+    return np.round(scores, 2)
+
+
+def _dates(days, present):
+    return np.where(present, days.astype('datetime64[D]'), np.datetime64('NaT', 'D'))
+
+
+class IdIndex:
+    """ตำแหน่งของ id ใน ids (เรียงแล้ว) - ใช้ตาราง lookup เมื่อ id ชิดกัน (user_id แบบ AUTOINCREMENT)
+    และ searchsorted เมื่อ id กระจาย (รหัสข่าว 8 หลัก)
+    """
+
+    def __init__(self, ids):
+        self.ids = ids
+        self.lookup = None
+        if len(ids) and ids[0] >= 0 and ids[-1] < LOOKUP_SPREAD * len(ids):
+            self.lookup = np.full(ids[-1] + 1, -1, dtype=np.int64)
+            self.lookup[ids] = np.arange(len(ids))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def positions(self, values):
+        """คืนค่า (ตำแหน่ง, mask ของค่าที่พบ) - รายงานของข่าว/ผู้ใช้ที่ถูกลบไปแล้วไม่ถูกนับ"""
+        if self.lookup is not None:
+            inside = (values >= 0) & (values < len(self.lookup))
+            positions = self.lookup[np.where(inside, values, 0)]
+            return positions, inside & (positions >= 0)
+        if not len(self.ids):
+            return np.zeros(len(values), dtype=np.int64), np.zeros(len(values), dtype=bool)
+        positions = np.minimum(np.searchsorted(self.ids, values), len(self.ids) - 1)
+        return positions, self.ids[positions] == values
+
+
+def _index(conn, query):
+    return IdIndex(np.fromiter((row[0] for row in conn.execute(query)), dtype=np.int64))
+
+
+def aggregate(conn, tables=TABLES, chunk_size=None):
+    """นับรายงานทั้งหมดใน snapshot เดียว คืนค่า dict ชื่อตาราง -> dict ชื่อคอลัมน์ -> numpy array"""
+    conn.execute('BEGIN')
+    try:
+        rumours = _index(conn, "SELECT rumour_id FROM Rumour ORDER BY rumour_id") if 'rumours' in tables else None
+        users = _index(conn, "SELECT user_id FROM Users ORDER BY user_id") if 'users' in tables else None
+        first_day, last_day = conn.execute(_DAY_RANGE).fetchone()
+        if first_day is None:
+            first_day, last_day = 0, -1  # ยังไม่มีรายงาน: ตาราง days ว่าง
+        tallies = {
+            'rumours': Tally(len(rumours)) if rumours is not None else None,
+            'days': Tally(last_day - first_day + 1, track_days=False) if 'days' in tables else None,
+            'users': Tally(len(users)) if users is not None else None,
+        }
+        for chunk in iter_report_chunks(conn, chunk_size):
+            if tallies['rumours'] is not None:
+                positions, found = rumours.positions(chunk['rumour_id'])
+                tallies['rumours'].add(positions[found], chunk['type'][found], chunk['day'][found])
+            if tallies['days'] is not None:
+                tallies['days'].add(chunk['day'] - first_day, chunk['type'])
+            if tallies['users'] is not None:
+                positions, found = users.positions(chunk['user_id'])
+                tallies['users'].add(positions[found], chunk['type'][found], chunk['day'][found])
+    finally:
+        conn.execute('ROLLBACK')
+
+    results = {}
+    if tallies['rumours'] is not None:
+        results['rumours'] = {'rumour_id': rumours.ids, **tallies['rumours'].columns(),
+                              **tallies['rumours'].report_dates()}
+    if tallies['days'] is not None:
+        days = np.arange(first_day, last_day + 1)
+        results['days'] = {'date': days.astype('datetime64[D]'), **tallies['days'].columns()}
+    if tallies['users'] is not None:
+        reported = tallies['users'].counts.any(axis=1)
+        columns = {'user_id': users.ids, **tallies['users'].columns(), **tallies['users'].report_dates()}
+        del columns['credibility_score']
+        results['users'] = {name: values[reported] for name, values in columns.items()}
+    return results
+
+
+def write_csv(columns, path):
+    """เขียนหนึ่งตารางเป็น CSV (UTF-8 แถวแรกเป็นชื่อคอลัมน์ วันที่เป็น YYYY-MM-DD และค่าว่างแทน NaT)"""
+    values = []
+    for column in columns.values():
+        if np.issubdtype(column.dtype, np.datetime64):
+            column = np.where(np.isnat(column), '', np.datetime_as_string(column))
+        values.append(column.tolist())
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        writer.writerows(zip(*values))
+
+
+def write_npz(columns, path):
+    """เขียนหนึ่งตารางเป็น .npz (array ต่อคอลัมน์ ไม่บีบอัด)"""
+    np.savez(path, **columns)
+
+
+WRITERS = {
+    'csv': write_csv,
+    'npz': write_npz,
+}
+
+
+def export(args):
+    """python analytics.py export - นับแล้วเขียนแต่ละตารางเป็น <out>/<ตาราง>.<format>"""
+    require_numpy()
+    db_path = args.db or Config.DATABASE_NAME
+    out = args.out or Config.ANALYTICS_OUTPUT_DIR
+    started = time.perf_counter()
+    conn = connect(db_path)
+    try:
+        results = aggregate(conn, args.tables, args.chunk_size)
+    finally:
+        conn.close()
+    counted = time.perf_counter()
+    os.makedirs(out, exist_ok=True)
+    for name, columns in results.items():
+        path = os.path.join(out, f'{name}.{args.format}')
+        WRITERS[args.format](columns, path)
+        print(f'✓ {path} ({len(next(iter(columns.values()))):,} แถว)')
+    print(f'นับ {counted - started:.2f} วินาที เขียนไฟล์ {time.perf_counter() - counted:.2f} วินาที')
+
+
+COMMANDS = {
+    'export': export,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python analytics.py', description='ส่งออกสถิติรายงานของระบบติดตามข่าวลือ')
+    commands = parser.add_subparsers(dest='command', required=True)
+    export_command = commands.add_parser('export', help='นับรายงานรายข่าว/รายวัน/รายผู้ใช้แล้วเขียนเป็นไฟล์')
+    export_command.add_argument('--db', help='ไฟล์ฐานข้อมูล (ค่าเริ่มต้น Config.DATABASE_NAME)')
+    export_command.add_argument('--out', help=f'โฟลเดอร์ผลลัพธ์ (ค่าเริ่มต้น {Config.ANALYTICS_OUTPUT_DIR})')
+    export_command.add_argument('--format', choices=FORMATS, default='csv')
+    export_command.add_argument('--tables', nargs='+', choices=TABLES, default=list(TABLES))
+    export_command.add_argument('--chunk-size', type=int, help=f'ค่าเริ่มต้น {Config.ANALYTICS_CHUNK_SIZE}')
+    args = parser.parse_args(argv)
+    return COMMANDS[args.command](args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""
+ASGI - entry point แบบ async ของระบบ (ใช้ app ตัวเดียวกับ main.py)
+
+    uvicorn asgi:app --host 127.0.0.1 --port 5000     (หรือ python asgi.py)
+
+- ทุก route ของ main.py (หน้ารวมข่าว รายละเอียด สรุปผล ฟอร์มรายงาน/ตรวจสอบ และ API) รันบน thread pool
+  ขนาด Config.ASGI_WORKER_THREADS การเรียก Model (sqlite3 แบบ blocking) จึงไม่บล็อก event loop
+  และใช้ thread เฉพาะช่วงที่ประมวลผล request เท่านั้น
+- /events/panic ส่งจาก event loop โดยตรง ผู้รับ SSE ที่รอเฉย ๆ จึงไม่ถือ thread
+  (development server ของ main.py ใช้หนึ่ง thread ต่อหนึ่งการเชื่อมต่อตลอดอายุการเชื่อมต่อ)
+- การเชื่อมต่อ keep-alive ที่ว่างอยู่เป็นหน้าที่ของ ASGI server (uvicorn/hypercorn) ไม่ใช้ thread เช่นกัน
+
+เป็น ASGI 3 application ธรรมดา ไม่ต้องติดตั้ง framework เพิ่ม แต่ต้องมี ASGI server (pip install uvicorn)
+response ของ route อื่นถูกรวมทั้งก้อนใน thread ก่อนส่ง (มีเพียง /events/panic ที่เป็น stream)
+"""
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import Config
+from main import SSE_HEADERS, SSE_HEARTBEAT_MESSAGE, SSE_RETRY_MESSAGE, app as flask_app, sse_event
+from models import panic_worker, report_batcher
+
+SSE_PATH = '/events/panic'
+_SSE_START_HEADERS = [(b'content-type', b'text/event-stream; charset=utf-8')] + [
+    (name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in SSE_HEADERS.items()
+]
+
+
+class AsyncSubscription:
+    """ผู้รับ event ของ PanicEvents ที่ส่งต่อเข้า asyncio.Queue ของ event loop (put_nowait เรียกจาก thread ใดก็ได้)"""
+
+    def __init__(self, loop, max_pending=100):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=max_pending)
+
+    def put_nowait(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            pass  # event loop ปิดไปแล้ว
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            pass  # เหมือนผู้รับแบบ thread: อ่านไม่ทันจนคิวเต็มจะพลาด event นั้น
+
+
+def _environ(scope, path, body):
+    """WSGI environ (PEP 3333) จาก scope ของ ASGI"""
+    server = scope.get('server') or (Config.HOST, Config.PORT)
+    client = scope.get('client')
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': path.encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1] or ''),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0] if client else '',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        key = name.decode('latin-1').upper().replace('-', '_')
+        if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            key = f'HTTP_{key}'
+        value = value.decode('latin-1')
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+def call_wsgi(wsgi_app, environ):
+    """เรียก WSGI app (ใน thread ของ executor) คืนค่า (status, headers ของ ASGI, body)"""
+    response = {}
+    chunks = []
+
+    def start_response(status, headers, exc_info=None):
+        # ยังไม่ได้ส่งอะไรให้ client จึงแทนที่ header เดิมได้เสมอ (กรณี error หลังเรียกครั้งแรก)
+        response['status'] = int(status.split(' ', 1)[0])
+        response['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+        return chunks.append
+
+    result = wsgi_app(environ, start_response)
+    try:
+        chunks.extend(result)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return response['status'], response['headers'], b''.join(chunks)
+
+
+class AsgiApp:
+    """ASGI application ที่ส่ง request ให้ Flask app บน thread pool และส่ง SSE จาก event loop"""
+
+    def __init__(self, wsgi_app, max_workers=None):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or Config.ASGI_WORKER_THREADS,
+                                           thread_name_prefix='asgi-worker')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            root_path = scope.get('root_path', '')
+            path = scope['path']
+            if root_path and path.startswith(root_path):
+                path = path[len(root_path):]
+            if path == SSE_PATH and scope['method'] == 'GET':
+                await self._panic_events(receive, send)
+            else:
+                await self._http(scope, path, receive, send)
+        elif scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        else:
+            raise RuntimeError(f"ไม่รองรับการเชื่อมต่อแบบ {scope['type']}")
+
+    async def _http(self, scope, path, receive, send):
+        body = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body.append(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+        environ = _environ(scope, path, b''.join(body))
+        loop = asyncio.get_running_loop()
+        status, headers, content = await loop.run_in_executor(self.executor, call_wsgi, self.wsgi_app, environ)
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': content})
+
+    async def _panic_events(self, receive, send):
+        """GET /events/panic - รูปแบบเดียวกับ main.panic_events แต่รอ event ใน event loop ไม่ใช่ใน thread"""
+        subscription = panic_worker.events.subscribe(AsyncSubscription(asyncio.get_running_loop()))
+        disconnected = asyncio.ensure_future(self._wait_disconnect(receive))
+        try:
+            await send({'type': 'http.response.start', 'status': 200, 'headers': _SSE_START_HEADERS})
+            await send({'type': 'http.response.body', 'body': SSE_RETRY_MESSAGE.encode(), 'more_body': True})
+            while True:
+                getter = asyncio.ensure_future(subscription.queue.get())
+                done, _ = await asyncio.wait({getter, disconnected}, timeout=Config.SSE_HEARTBEAT,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    if getter.result() is None:  # server กำลังปิด (PanicEvents.close) - จบ response
+                        await send({'type': 'http.response.body', 'body': b''})
+                        return
+                    message = sse_event(getter.result())
+                else:
+                    getter.cancel()
+                    if disconnected in done:
+                        return
+                    message = SSE_HEARTBEAT_MESSAGE
+                await send({'type': 'http.response.body', 'body': message.encode(), 'more_body': True})
+        finally:
+            panic_worker.events.unsubscribe(subscription)
+            disconnected.cancel()
+
+    @staticmethod
+    async def _wait_disconnect(receive):
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # main.py migrate และเริ่ม worker เบื้องหลังไว้แล้วตอน import
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await asyncio.get_running_loop().run_in_executor(None, self.shutdown)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def shutdown(self):
+        """บันทึกรายงาน/ตรวจ panic ที่ค้างอยู่ให้เสร็จ แล้วปิด thread pool"""
+        report_batcher.stop()
+        panic_worker.stop()
+        self.executor.shutdown(wait=True)
+
+
+app = AsgiApp(flask_app)
+
+
+def run():
+    """เริ่ม ASGI server ด้วย uvicorn (python asgi.py)"""
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit('ต้องติดตั้ง ASGI server ก่อน: pip install uvicorn (หรือรัน hypercorn asgi:app)')
+    print(f'📍 ASGI: http://{Config.HOST}:{Config.PORT}')
+    uvicorn.run(app, host=Config.HOST, port=Config.PORT)
+
+
+if __name__ == '__main__':
+    run()
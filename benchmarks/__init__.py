@@ -0,0 +1,10 @@
+"""
+Benchmarks - ชุดวัดประสิทธิภาพของระบบติดตามข่าวลือ
+- dataset: สร้างข้อมูลจำลองขนาดใหญ่ลงไฟล์ SQLite แยก (ไม่แตะ rumor_tracking.db)
+- routes: วัด latency / throughput ของแต่ละหน้าผ่าน Flask test client
+- models: micro-benchmark ของแต่ละ method ใน RumourModel / ReportModel / UserModel (ผ่าน repository)
+- parity: ตรวจว่า entry point main.py และ app.py ตอบทุก route เหมือนกัน
+- batching: throughput ของการส่งรายงานพร้อมกัน บันทึกทันทีเทียบกับ report_batcher (group commit)
+- serving: development server เทียบกับ asgi.py (uvicorn) เมื่อมีการเชื่อมต่อ SSE ค้างไว้จำนวนมาก
+ผลลัพธ์เป็น JSON เพื่อนำมาเทียบกันระหว่างรอบ (python -m benchmarks compare)
+"""
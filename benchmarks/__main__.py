@@ -0,0 +1,337 @@
+"""
+คำสั่งของชุด benchmark (รันจากโฟลเดอร์โปรเจกต์)
+
+    python -m benchmarks generate --scale large --db /tmp/bench.db
+    python -m benchmarks run --db /tmp/bench.db --requests 500 --threads 4 --output result.json
+    python -m benchmarks compare base.json result.json --threshold 1.25
+    python -m benchmarks plans --db /tmp/bench.db
+    python -m benchmarks concurrency --db /tmp/bench.db --readers 4 --writers 2 --writes 500
+    python -m benchmarks ingest --db /tmp/bench.db --threads 4 --rumours-per-batch 1 100 --total 5000
+    python -m benchmarks parity
+    python -m benchmarks batching --db /tmp/bench.db --threads 16 --writes 2000
+    python -m benchmarks serving --db /tmp/bench.db --idle 1000 --clients 50 --requests 2000
+    python -m benchmarks prefork --db /tmp/bench.db --workers 1 2 4 --clients 32 --requests 3000
+    python -m benchmarks analytics --db /tmp/bench.db --chunk-size 100000
+
+run จะคัดลอกฐานข้อมูลไปไฟล์ชั่วคราวก่อนวัด ไฟล์ต้นฉบับจึงใช้วัดซ้ำได้หลายรอบ
+run และ plans คืนค่า exit code 1 ถ้า query หลักไม่ใช้ index ตาม database.QUERY_PLAN_EXPECTATIONS (QUERY_PLANS ของ Model)
+compare คืนค่า exit code 1 ถ้า p50/p99 ของรายการใดช้าลงเกิน threshold เท่า
+concurrency คืนค่า exit code 1 ถ้าใน WAL ยังมี reader/writer ที่เจอ database is locked
+ingest คืนค่า exit code 1 ถ้ารหัสข่าวที่สร้างซ้ำกัน/นอกช่วง หรือมี error
+parity คืนค่า exit code 1 ถ้า route เดิมทำงานต่างจากพฤติกรรมของโค้ดต้นฉบับ (ฐานข้อมูลและนาฬิกาคงที่)
+batching คืนค่า exit code 1 ถ้าผลรายงาน (created/duplicate) ของแบบ batch ต่างจากเดิม มี error หรือ batch ช้ากว่า
+serving คืนค่า exit code 1 ถ้ามี request ที่ error หรือ asgi.py ใช้ thread เพิ่มตามการเชื่อมต่อ SSE ที่ค้างไว้
+prefork คืนค่า exit code 1 ถ้ามี request ที่ error หรือ throughput ไม่เพิ่มตามจำนวน worker (ที่ไม่เกินจำนวน CPU)
+analytics คืนค่า exit code 1 ถ้าผลของ analytics.py ไม่ตรงกับ SQL หรือช้ากว่านับด้วย query ต่อข่าว (ต้องติดตั้ง NumPy)
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from database import check_query_plans
+from . import analytics, batching, concurrency, dataset, ingest, methods, parity, prefork, routes, serving
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _dataset_size(args):
+    users, rumours, reports = dataset.SCALES[args.scale]
+    return args.users or users, args.rumours or rumours, args.reports or reports
+
+
+def _generate(args):
+    users, rumours, reports = _dataset_size(args)
+    print(f'กำลังสร้างข้อมูล {users:,} users / {rumours:,} rumours / {reports:,} reports -> {args.db}',
+          file=sys.stderr)
+    counts = dataset.generate(args.db, users, rumours, reports, seed=args.seed, verbose=args.verbose)
+    print(json.dumps(counts))
+
+
+def _run(args):
+    if not os.path.exists(args.db):
+        _generate(args)
+
+    workdir = tempfile.mkdtemp(prefix='rumour-bench-')
+    try:
+        scratch = os.path.join(workdir, 'bench.db')
+        shutil.copyfile(args.db, scratch)
+        conn = sqlite3.connect(scratch)
+        try:
+            size = {
+                table.lower(): conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                for table in ('Users', 'Rumour', 'Report')
+            }
+        finally:
+            conn.close()
+
+        result = {
+            'meta': {
+                'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'revision': _git_revision(),
+                'python': platform.python_version(),
+                'sqlite': sqlite3.sqlite_version,
+                'platform': platform.platform(),
+                'dataset': size,
+                'requests': args.requests,
+                'iterations': args.iterations,
+                'threads': args.threads,
+                'cache': args.cache,
+            },
+        }
+        if args.suite in ('all', 'routes'):
+            result['routes'] = routes.run(
+                scratch, count=args.requests, threads=args.threads, cache=args.cache, seed=args.seed)
+        if args.suite in ('all', 'models'):
+            result['models'] = methods.run(
+                scratch, iterations=args.iterations, cache=args.cache, seed=args.seed)
+        problems = check_query_plans(scratch)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    print(output)
+    _fail_on(problems)
+
+
+def _fail_on(problems):
+    for problem in problems:
+        print(f'✗ {problem}', file=sys.stderr)
+    if problems:
+        sys.exit(1)
+
+
+def _plans(args):
+    if not os.path.exists(args.db):
+        _generate(args)
+    workdir = tempfile.mkdtemp(prefix='rumour-plans-')
+    try:
+        scratch = os.path.join(workdir, 'plans.db')
+        shutil.copyfile(args.db, scratch)  # check_query_plans migrate ฐานข้อมูลก่อนตรวจ
+        problems = check_query_plans(scratch)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    _fail_on(problems)
+    print('✓ query หลักใช้ index ตามที่กำหนดทั้งหมด')
+
+
+def compare(base, current, threshold, min_delta_ms=0.5):
+    """เทียบผลสองรอบ คืนค่ารายการที่ช้าลงเกิน threshold เท่า
+
+    ไม่นับรายการที่ช้าลงน้อยกว่า min_delta_ms (ค่าระดับ microsecond แกว่งตามเครื่องได้มาก)
+    """
+    regressions = []
+    for suite in ('routes', 'models'):
+        for name, now in current.get(suite, {}).items():
+            before = base.get(suite, {}).get(name)
+            if not before:
+                continue
+            for metric in ('p50_ms', 'p99_ms'):
+                if (before[metric] > 0 and now[metric] > before[metric] * threshold
+                        and now[metric] - before[metric] >= min_delta_ms):
+                    regressions.append(
+                        f'{suite}/{name} {metric}: {before[metric]} -> {now[metric]} '
+                        f'(x{now[metric] / before[metric]:.2f})'
+                    )
+    return regressions
+
+
+def _compare(args):
+    with open(args.base, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(args.current, encoding='utf-8') as f:
+        current = json.load(f)
+    regressions = compare(base, current, args.threshold, args.min_delta_ms)
+    for line in regressions:
+        print(f'✗ {line}')
+    if regressions:
+        sys.exit(1)
+    print(f'✓ ไม่มีรายการที่ช้าลงเกิน x{args.threshold}')
+
+
+def _concurrency(args):
+    if not os.path.exists(args.db):
+        _generate(args)
+    results = concurrency.run(args.db, readers=args.readers, writers=args.writers, writes=args.writes,
+                              seed=args.seed)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    problems = concurrency.check(results)
+    for problem in problems:
+        print(f'✗ {problem}', file=sys.stderr)
+    if problems:
+        sys.exit(1)
+
+
+def _ingest(args):
+    if not os.path.exists(args.db):
+        _generate(args)
+    results = ingest.run(args.db, threads=args.threads, total=args.total, batches=args.rumours_per_batch,
+                         seed=args.seed)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    problems = ingest.check(results)
+    for problem in problems:
+        print(f'✗ {problem}', file=sys.stderr)
+    if problems:
+        sys.exit(1)
+
+
+def _parity(args):
+    results = parity.run()
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    _fail_on(parity.check(results))
+
+
+def _batching(args):
+    if not os.path.exists(args.db):
+        _generate(args)
+    results = batching.run(args.db, threads=args.threads, writes=args.writes, seed=args.seed,
+                           batch_size=args.batch_size, batch_delay=args.batch_delay)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    problems = batching.check(results)
+    for problem in problems:
+        print(f'✗ {problem}', file=sys.stderr)
+    if problems:
+        sys.exit(1)
+
+
+def _serving(args):
+    if not os.path.exists(args.db):
+        _generate(args)
+    results = serving.run(args.db, servers=args.servers, idle=args.idle, clients=args.clients,
+                          requests=args.requests, seed=args.seed)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    problems = serving.check(results)
+    for problem in problems:
+        print(f'✗ {problem}', file=sys.stderr)
+    if problems:
+        sys.exit(1)
+
+
+def _prefork(args):
+    if not os.path.exists(args.db):
+        _generate(args)
+    results = prefork.run(args.db, workers=args.workers, clients=args.clients, requests=args.requests)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    problems = prefork.check(results)
+    for problem in problems:
+        print(f'✗ {problem}', file=sys.stderr)
+    if problems:
+        sys.exit(1)
+
+
+def _analytics(args):
+    if not os.path.exists(args.db):
+        _generate(args)
+    results = analytics.run(args.db, chunk_size=args.chunk_size)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    problems = analytics.check(results)
+    for problem in problems:
+        print(f'✗ {problem}', file=sys.stderr)
+    if problems:
+        sys.exit(1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='benchmark ระบบติดตามข่าวลือ')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def dataset_options(command):
+        command.add_argument('--db', default='bench.db', help='ไฟล์ฐานข้อมูลสำหรับวัด')
+        command.add_argument('--scale', choices=sorted(dataset.SCALES), default='small')
+        command.add_argument('--users', type=int)
+        command.add_argument('--rumours', type=int)
+        command.add_argument('--reports', type=int)
+        command.add_argument('--seed', type=int, default=2568)
+        command.add_argument('--verbose', action='store_true')
+
+    generate = commands.add_parser('generate', help='สร้างข้อมูลจำลอง')
+    dataset_options(generate)
+    generate.set_defaults(handler=_generate)
+
+    run = commands.add_parser('run', help='วัด route และ method ของ Model')
+    dataset_options(run)
+    run.add_argument('--suite', choices=('all', 'routes', 'models'), default='all')
+    run.add_argument('--requests', type=int, default=200, help='จำนวน request ต่อ route')
+    run.add_argument('--iterations', type=int, default=200, help='จำนวนรอบต่อ method')
+    run.add_argument('--threads', type=int, default=1)
+    run.add_argument('--cache', action='store_true', help='เปิด query cache ระหว่างวัด')
+    run.add_argument('--output', help='บันทึกผล JSON ลงไฟล์')
+    run.set_defaults(handler=_run)
+
+    plans_command = commands.add_parser('plans', help='ตรวจ EXPLAIN QUERY PLAN ของ query หลัก')
+    dataset_options(plans_command)
+    plans_command.set_defaults(handler=_plans)
+
+    compare_command = commands.add_parser('compare', help='เทียบผลสองรอบ')
+    compare_command.add_argument('base')
+    compare_command.add_argument('current')
+    compare_command.add_argument('--threshold', type=float, default=1.25)
+    compare_command.add_argument('--min-delta-ms', type=float, default=0.5)
+    compare_command.set_defaults(handler=_compare)
+
+    concurrency_command = commands.add_parser('concurrency', help='วัดผู้อ่านระหว่างมีการเขียนต่อเนื่อง')
+    dataset_options(concurrency_command)
+    concurrency_command.add_argument('--readers', type=int, default=4)
+    concurrency_command.add_argument('--writers', type=int, default=2)
+    concurrency_command.add_argument('--writes', type=int, default=500)
+    concurrency_command.set_defaults(handler=_concurrency)
+
+    ingest_command = commands.add_parser('ingest', help='วัด throughput ของการสร้างข่าวลือ')
+    dataset_options(ingest_command)
+    ingest_command.add_argument('--threads', type=int, default=4)
+    ingest_command.add_argument('--total', type=int, default=5000, help='จำนวนข่าวต่อขนาด batch')
+    ingest_command.add_argument('--rumours-per-batch', type=int, nargs='+', default=[1, 100])
+    ingest_command.set_defaults(handler=_ingest)
+
+    parity_command = commands.add_parser('parity', help='ตรวจว่า route เดิมยังทำงานตามพฤติกรรมของโค้ดต้นฉบับ')
+    parity_command.set_defaults(handler=_parity)
+
+    batching_command = commands.add_parser('batching', help='วัด throughput ของการส่งรายงานแบบ group commit')
+    dataset_options(batching_command)
+    batching_command.add_argument('--threads', type=int, default=16)
+    batching_command.add_argument('--writes', type=int, default=2000)
+    batching_command.add_argument('--batch-size', type=int, help='แทน Config.REPORT_BATCH_SIZE')
+    batching_command.add_argument('--batch-delay', type=float, help='แทน Config.REPORT_BATCH_DELAY (วินาที)')
+    batching_command.set_defaults(handler=_batching)
+
+    serving_command = commands.add_parser('serving', help='เทียบ development server กับ asgi.py เมื่อมี SSE ค้างไว้')
+    dataset_options(serving_command)
+    serving_command.add_argument('--servers', nargs='+', choices=serving.SERVERS, default=list(serving.SERVERS))
+    serving_command.add_argument('--idle', type=int, default=1000, help='จำนวนการเชื่อมต่อ /events/panic ที่เปิดค้างไว้')
+    serving_command.add_argument('--clients', type=int, default=50, help='จำนวน client ที่ขอหน้าเว็บพร้อมกัน')
+    serving_command.add_argument('--requests', type=int, default=2000)
+    serving_command.set_defaults(handler=_serving)
+
+    prefork_command = commands.add_parser('prefork', help='วัด throughput ของ server.py serve ตามจำนวน worker')
+    dataset_options(prefork_command)
+    prefork_command.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    prefork_command.add_argument('--clients', type=int, default=32, help='จำนวน client ที่ขอหน้าเว็บพร้อมกัน')
+    prefork_command.add_argument('--requests', type=int, default=3000)
+    prefork_command.set_defaults(handler=_prefork)
+
+    analytics_command = commands.add_parser('analytics', help='เทียบ analytics.py กับการนับด้วย query ต่อข่าว')
+    dataset_options(analytics_command)
+    analytics_command.add_argument('--chunk-size', type=int, help='จำนวนรายงานที่อ่านต่อครั้ง')
+    analytics_command.set_defaults(handler=_analytics)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == '__main__':
+    main()
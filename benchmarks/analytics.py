@@ -0,0 +1,84 @@
+"""
+Analytics - เทียบการนับรายงานแยกประเภทแบบ query ต่อข่าว/วัน/ผู้ใช้ (COUNT ... GROUP BY report_type ทีละราย)
+กับ analytics.aggregate ที่อ่านตาราง Report ทีละ chunk แล้วนับทั้งสามตารางด้วย NumPy ในรอบเดียว
+
+ผลของทั้งสองแบบต้องตรงกันทุกแถว อ่านฐานข้อมูลแบบอ่านอย่างเดียว จึงไม่ต้องคัดลอกไฟล์
+"""
+import time
+import analytics
+from analytics import np  # None ถ้าไม่ได้ติดตั้ง NumPy (run แจ้งให้ติดตั้ง)
+from models.report import ReportModel
+
+
+# นับแบบเดิม: query หนึ่งครั้งต่อข่าว/วัน/ผู้ใช้ (ใช้ index idx_report_rumour_type, idx_report_date และ UNIQUE(user_id, rumour_id))
+QUERIES = {
+    'rumours': "SELECT report_type, COUNT(*) FROM Report WHERE rumour_id = ? GROUP BY report_type",
+    'days': "SELECT report_type, COUNT(*) FROM Report WHERE report_date >= ? AND report_date < ? GROUP BY report_type",
+    'users': "SELECT report_type, COUNT(*) FROM Report WHERE user_id = ? GROUP BY report_type",
+}
+
+
+def _per_entity_counts(conn, query, keys):
+    """จำนวนรายงานแยกประเภทของแต่ละ key ด้วย query หนึ่งครั้งต่อ key คืนค่า dict key -> list (เฉพาะที่มีรายงาน)"""
+    codes = {report_type: code for code, report_type in enumerate(ReportModel.REPORT_TYPES)}
+    counts = {}
+    for key in keys:
+        for report_type, count in conn.execute(query, key):
+            counts.setdefault(key, [0] * len(codes))[codes[report_type]] = count
+    return counts
+
+
+def _keys(conn, results):
+    """ของแต่ละตาราง: (key ที่ query แบบเดิมต้องวนทั้งหมด, key ของแต่ละแถวในผลของ analytics.aggregate)"""
+    rumour_keys = [(rumour_id,) for rumour_id in results['rumours']['rumour_id'].tolist()]
+    dates = results['days']['date']
+    day_keys = list(zip(np.datetime_as_string(dates).tolist(), np.datetime_as_string(dates + 1).tolist()))
+    return {
+        'rumours': (rumour_keys, rumour_keys),
+        'days': (day_keys, day_keys),
+        'users': (conn.execute("SELECT user_id FROM Users").fetchall(),
+                  [(user_id,) for user_id in results['users']['user_id'].tolist()]),
+    }
+
+
+def run(db_path, chunk_size=None):
+    """วัดทั้งสองแบบบน db_path คืนค่า dict: ขนาดข้อมูล เวลาแต่ละแบบ และจำนวนแถวที่ผลไม่ตรง"""
+    analytics.require_numpy()
+    conn = analytics.connect(db_path)
+    try:
+        started = time.perf_counter()
+        results = analytics.aggregate(conn, chunk_size=chunk_size)
+        vectorized = time.perf_counter() - started
+
+        queries, mismatches = {}, {}
+        for table, (queried, rows) in _keys(conn, results).items():
+            started = time.perf_counter()
+            expected = _per_entity_counts(conn, QUERIES[table], queried)
+            queries[table] = {'queries': len(queried), 'seconds': round(time.perf_counter() - started, 3)}
+            counts = np.column_stack([results[table][name] for name in analytics.TYPE_COLUMNS]).tolist()
+            actual = {key: row for key, row in zip(rows, counts) if any(row)}
+            mismatches[table] = len(set(expected) ^ set(actual)) + sum(
+                1 for key, row in expected.items() if actual.get(key, row) != row)
+    finally:
+        conn.close()
+    per_entity = sum(result['seconds'] for result in queries.values())
+    reports = int(results['days']['report_count'].sum())
+    return {
+        'reports': reports,
+        'vectorized': {
+            'seconds': round(vectorized, 3),
+            'reports_per_s': round(reports / vectorized) if vectorized else None,
+        },
+        'per_entity_queries': queries,
+        'speedup': round(per_entity / vectorized, 1) if vectorized else None,
+        'mismatches': mismatches,
+    }
+
+
+def check(results):
+    """เงื่อนไขผ่าน: ทุกตารางตรงกับการนับด้วย query และเร็วกว่า query ต่อข่าว/วัน/ผู้ใช้รวมกัน"""
+    problems = [f'{table}: ผลไม่ตรงกับ SQL {count} แถว' for table, count in results['mismatches'].items() if count]
+    if results['speedup'] is not None and results['speedup'] < 1:
+        problems.append(f"analytics.aggregate ({results['vectorized']['seconds']} วินาที) "
+                        f"ช้ากว่า query ต่อข่าว/วัน/ผู้ใช้ (x{results['speedup']})")
+    return problems
@@ -0,0 +1,134 @@
+"""
+Batching - วัด throughput ของการส่งรายงานพร้อมกันหลาย thread เทียบบันทึกทันที (หนึ่ง commit ต่อรายงาน)
+กับ report_batcher (หนึ่ง commit ต่อชุด) บนสำเนาฐานข้อมูลแยกกันของแต่ละแบบ
+วัดทั้ง PRAGMA synchronous=NORMAL (ค่าของระบบ) และ FULL (fsync ทุก commit) เพื่อเห็นผลของ fsync
+
+batch ประหยัดได้เฉพาะค่า commit ต่อรายงาน (BEGIN/COMMIT และ fsync) งานต่อแถว (INSERT, trigger ตัวนับ/สถิติ,
+ตรวจ panic) ยังเท่าเดิม อัตราเร่ง (check.speedup) จึงขึ้นกับว่า fsync ของดิสก์นั้นแพงเทียบกับงานต่อแถวแค่ไหน
+ขนาดชุดยังถูกจำกัดด้วยจำนวน thread ที่รอผลพร้อมกัน (--threads) ลองค่าอื่นด้วย --batch-size / --batch-delay
+
+รายการที่ส่งมีรายงานซ้ำปนอยู่ ทั้งสองแบบจึงต้องได้ผล created/duplicate ตรงกันทุกรายการ
+"""
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from config.settings import Config
+from database import REPORT_TYPES, migrate
+from .dataset import load_targets, fresh_pairs
+from .timing import summarize
+
+DUPLICATE_EVERY = 10  # ทุก ๆ 10 รายการส่งคู่ (user_id, rumour_id) ที่ส่งไปแล้วซ้ำอีกครั้ง
+
+
+def _items(db_path, writes, rng):
+    targets = load_targets(db_path)
+    pairs = fresh_pairs(db_path, writes, targets['unverified_ids'], targets['max_user_id'], rng)
+    items = []
+    for index, (user_id, rumour_id) in enumerate(pairs):
+        items.append((user_id, rumour_id, REPORT_TYPES[index % len(REPORT_TYPES)]))
+        if index % DUPLICATE_EVERY == DUPLICATE_EVERY - 1:
+            items.append((user_id, rumour_id, REPORT_TYPES[0]))
+    return items
+
+
+def _burst(submit, items, threads):
+    """ส่ง items ด้วย threads thread (แต่ละ thread ส่งทีละรายการแล้วรอผล) คืนค่า (สรุปผล, สถานะตามลำดับ items)"""
+    statuses = [None] * len(items)
+    samples, errors = [], [0]
+    lock = threading.Lock()
+
+    def worker(offset):
+        local_samples, failed = [], 0
+        # คู่ซ้ำอยู่ติดกับคู่แรกใน items แบ่งแบบนี้จึงส่งจากคนละ thread พร้อมกัน
+        for index in range(offset, len(items), threads):
+            t0 = time.perf_counter()
+            try:
+                statuses[index] = submit(*items[index])['status']
+            except sqlite3.Error:
+                failed += 1
+            local_samples.append(time.perf_counter() - t0)
+        with lock:
+            samples.extend(local_samples)
+            errors[0] += failed
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    summary = summarize(samples, elapsed, errors[0])
+    summary['reports_per_s'] = round(statuses.count('created') / elapsed, 1) if elapsed else 0.0
+    return summary, statuses
+
+
+def run(db_path, threads=16, writes=2000, synchronous=('NORMAL', 'FULL'), seed=2568,
+        batch_size=None, batch_delay=None):
+    """วัดแต่ละค่า synchronous ทั้งแบบบันทึกทันทีและแบบ batch คืนค่า dict ชื่อ -> ผล
+
+    batch_size / batch_delay ใช้แทน Config.REPORT_BATCH_SIZE / REPORT_BATCH_DELAY (None = ค่าของ Config)
+    """
+    from models import Database, query_cache, repository
+    from models.batcher import ReportBatcher
+    query_cache.clear()
+    original_name, original_pragmas = Config.DATABASE_NAME, Config.DB_PRAGMAS
+    workdir = tempfile.mkdtemp(prefix='rumour-batching-')
+    items = _items(db_path, writes, random.Random(seed))
+    results, outcomes = {}, {}
+    try:
+        for mode in synchronous:
+            for batched in (False, True):
+                name = f"{'batched' if batched else 'direct'}[synchronous={mode}]"
+                scratch = os.path.join(workdir, f'{name}.db')
+                shutil.copyfile(db_path, scratch)
+                migrate(scratch)
+                Config.DATABASE_NAME = scratch
+                Config.DB_PRAGMAS = dict(original_pragmas, synchronous=mode)
+                batcher = ReportBatcher(repository, batch_size=batch_size, batch_delay=batch_delay)
+                if batched:
+                    batcher.start()
+                try:
+                    summary, statuses = _burst(batcher.submit_report, items, threads)
+                finally:
+                    batcher.stop()
+                    Database.close_all()
+                results[name] = summary
+                outcomes[name] = statuses
+    finally:
+        Config.DATABASE_NAME, Config.DB_PRAGMAS = original_name, original_pragmas
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results['check'] = {
+        'items': len(items),
+        'created': {name: statuses.count('created') for name, statuses in outcomes.items()},
+        'duplicate': {name: statuses.count('duplicate') for name, statuses in outcomes.items()},
+        'speedup': {
+            mode: round(results[f'batched[synchronous={mode}]']['reports_per_s']
+                        / results[f'direct[synchronous={mode}]']['reports_per_s'], 1)
+            for mode in synchronous if results[f'direct[synchronous={mode}]']['reports_per_s']
+        },
+    }
+    return results
+
+
+def check(results):
+    """เงื่อนไขผ่าน: ทุกแบบได้จำนวน created/duplicate เท่ากัน ไม่มี error และแบบ batch ไม่ช้ากว่าเดิม"""
+    summary = results['check']
+    problems = []
+    for field in ('created', 'duplicate'):
+        if len(set(summary[field].values())) > 1:
+            problems.append(f'จำนวน {field} ไม่ตรงกัน: {summary[field]}')
+    for name, result in results.items():
+        if name != 'check' and result['errors']:
+            problems.append(f"{name}: error {result['errors']} ครั้ง")
+    for name in results:
+        if name.startswith('direct['):
+            batched = results.get(name.replace('direct', 'batched', 1))
+            if batched and batched['throughput_per_s'] < results[name]['throughput_per_s']:
+                problems.append(f'{name}: แบบ batch ช้ากว่าบันทึกทันที')
+    return problems
@@ -0,0 +1,169 @@
+"""
+Concurrency - ตรวจว่าผู้อ่านไม่ถูกบล็อกระหว่างมีการเขียนต่อเนื่อง
+รัน reader หลาย thread (หน้ารวมข่าว + รายละเอียดข่าว) พร้อม writer ที่ส่งรายงานรัวๆ
+เทียบ journal_mode แบบเดิม (DELETE) กับ WAL บนสำเนาฐานข้อมูลแยกกัน
+หลังรันตรวจในฐานข้อมูลว่ารายงานที่ตอบว่าบันทึกแล้วอยู่ครบ ไม่ซ้ำ และตัวนับของข่าวตรงกับจำนวนรายงานจริง
+"""
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from config.settings import Config
+from database import REPORT_TYPES, migrate
+from .dataset import load_targets, fresh_pairs
+from .timing import summarize
+
+
+def _burst(db_path, readers, writers, writes, rng):
+    """รัน reader/writer พร้อมกัน คืนค่าสรุปผลของแต่ละฝั่ง"""
+    from models import repository
+
+    targets = load_targets(db_path)
+    pairs = fresh_pairs(db_path, writes, targets['unverified_ids'], targets['max_user_id'], rng)
+    rumour_ids = targets['rumour_ids']
+    done = threading.Event()
+    read_samples, write_samples = [], []
+    errors = {'read': 0, 'write': 0}
+    created, unexpected = [], []
+    lock = threading.Lock()
+
+    def locked(exc):
+        """นับเฉพาะ database is locked/busy - error อื่น (เช่น schema ไม่ตรง) ต้องทำให้ benchmark ล้ม"""
+        if 'locked' in str(exc) or 'busy' in str(exc):
+            return True
+        unexpected.append(exc)
+        done.set()
+        return False
+
+    def reader(seed):
+        local_rng = random.Random(seed)
+        samples, failed = [], 0
+        while not done.is_set():
+            t0 = time.perf_counter()
+            try:
+                repository.rumours.get_rumours_page()
+                repository.rumours.get_rumour_by_id(local_rng.choice(rumour_ids))
+            except sqlite3.OperationalError as exc:
+                if not locked(exc):
+                    break
+                failed += 1
+            samples.append(time.perf_counter() - t0)
+        with lock:
+            read_samples.extend(samples)
+            errors['read'] += failed
+
+    def writer(batch):
+        samples, failed, accepted = [], 0, []
+        for index, (user_id, rumour_id) in enumerate(batch):
+            t0 = time.perf_counter()
+            try:
+                result = repository.reports.submit_report(user_id, rumour_id, REPORT_TYPES[index % len(REPORT_TYPES)])
+            except sqlite3.OperationalError as exc:
+                if not locked(exc):
+                    break
+                failed += 1
+            else:
+                if result['status'] == 'created':
+                    accepted.append((user_id, rumour_id))
+            samples.append(time.perf_counter() - t0)
+        with lock:
+            write_samples.extend(samples)
+            errors['write'] += failed
+            created.extend(accepted)
+
+    reader_threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    writer_threads = [threading.Thread(target=writer, args=(pairs[i::writers],)) for i in range(writers)]
+    for thread in reader_threads:
+        thread.start()
+    started = time.perf_counter()
+    for thread in writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    for thread in reader_threads:
+        thread.join()
+    if unexpected:
+        raise unexpected[0]
+
+    return {
+        'readers': summarize(read_samples, elapsed, errors['read']),
+        'writers': summarize(write_samples, elapsed, errors['write']),
+        'integrity': _integrity(db_path, pairs, created, errors['write']),
+    }
+
+
+def _integrity(db_path, pairs, created, failed):
+    """ตรวจผลการเขียนในฐานข้อมูล คืนค่า dict จำนวนรายงานที่หาย/ซ้ำ และข่าวที่ตัวนับไม่ตรง
+
+    ทุกคู่ใน pairs ยังไม่เคยรายงานมาก่อน จึงต้องได้ 'created' ทุกครั้งที่ไม่ error
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = {pair: conn.execute("SELECT COUNT(*) FROM Report WHERE user_id = ? AND rumour_id = ?", pair).fetchone()[0]
+                for pair in pairs}
+        rumour_ids = sorted({rumour_id for _, rumour_id in pairs})
+        counters = sum(
+            conn.execute(
+                "SELECT report_count != (SELECT COUNT(*) FROM Report WHERE rumour_id = ?) FROM Rumour WHERE rumour_id = ?",
+                (rumour_id, rumour_id),
+            ).fetchone()[0]
+            for rumour_id in rumour_ids
+        )
+    finally:
+        conn.close()
+    return {
+        'submitted': len(pairs),
+        'created': len(created),
+        'not_created': len(pairs) - len(created) - failed,  # ตอบสถานะอื่น (เช่น duplicate) ทั้งที่ไม่เคยรายงาน
+        'lost': sum(1 for pair in created if rows[pair] == 0),
+        'duplicated': sum(1 for count in rows.values() if count > 1) + len(created) - len(set(created)),
+        'counter_mismatches': counters,
+    }
+
+
+def run(db_path, readers=4, writers=2, writes=500, journal_modes=('DELETE', 'WAL'), seed=2568):
+    """วัดแต่ละ journal_mode บนสำเนาของ db_path คืนค่า dict mode -> ผล"""
+    from models import Database, query_cache
+    query_cache.enabled = False  # วัดการอ่านจากฐานข้อมูลจริง
+    original_name, original_pragmas = Config.DATABASE_NAME, Config.DB_PRAGMAS
+    workdir = tempfile.mkdtemp(prefix='rumour-concurrency-')
+    results = {}
+    try:
+        for mode in journal_modes:
+            scratch = os.path.join(workdir, f'{mode.lower()}.db')
+            shutil.copyfile(db_path, scratch)
+            migrate(scratch)
+            Config.DATABASE_NAME = scratch
+            Config.DB_PRAGMAS = dict(original_pragmas, journal_mode=mode)
+            try:
+                results[mode] = _burst(scratch, readers, writers, writes, random.Random(seed))
+            finally:
+                Database.close_all()
+    finally:
+        Config.DATABASE_NAME, Config.DB_PRAGMAS = original_name, original_pragmas
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def check(results):
+    """เงื่อนไขผ่าน: ใน WAL ไม่มี reader/writer ที่ error ด้วย database is locked
+    และทุก journal_mode ไม่มีรายงานที่หาย/ซ้ำ หรือข่าวที่ตัวนับไม่ตรงกับรายงานจริง
+    """
+    problems = []
+    for mode, result in results.items():
+        integrity = result['integrity']
+        for name in ('not_created', 'lost', 'duplicated', 'counter_mismatches'):
+            if integrity[name]:
+                problems.append(f"{mode}: {name} {integrity[name]} รายการ")
+    wal = results.get('WAL')
+    if wal is None:
+        return problems + ['ไม่ได้วัด journal_mode=WAL']
+    for side in ('readers', 'writers'):
+        if wal[side]['errors']:
+            problems.append(f"WAL: {side} error {wal[side]['errors']} ครั้ง (database is locked)")
+    return problems
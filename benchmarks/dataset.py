@@ -0,0 +1,172 @@
+"""
+Dataset - สร้างข้อมูลจำลองขนาดใหญ่สำหรับวัดประสิทธิภาพ
+เขียนลงไฟล์ SQLite แยก (scratch) ด้วย schema เดียวกับระบบจริง (รัน migrate ก่อน)
+
+ระหว่างโหลดข้อมูลจะถอด trigger ออกชั่วคราวแล้วคำนวณตัวนับ/สถิติและดัชนีค้นหาใหม่ทีเดียวตอนจบ
+เพราะ trigger ต่อแถวทำให้การโหลดหลายล้านแถวช้ามาก
+"""
+import os
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from config.settings import Config
+from database import migrate, rebuild_counters, rebuild_search_index, REPORT_TYPES
+
+# ขนาดที่ตั้งชื่อไว้ใช้บ่อย (users, rumours, reports)
+SCALES = {
+    'small': (1_000, 200, 10_000),
+    'medium': (50_000, 5_000, 500_000),
+    'large': (1_000_000, 100_000, 10_000_000),
+}
+
+VERIFIER_EVERY = 100  # ผู้ใช้ทุก ๆ 100 คนเป็นผู้ตรวจสอบ
+VERIFIED_RATIO = 0.05  # สัดส่วนข่าวที่ถูกตรวจสอบแล้ว
+CHUNK_SIZE = 50_000
+
+FIRST_NAMES = ('สมชาย', 'สมหญิง', 'วิชัย', 'มานี', 'ประยุทธ', 'สุดา', 'ธนพล', 'กมล', 'อรุณ', 'พิมพ์ใจ')
+LAST_NAMES = ('ใจดี', 'รักสงบ', 'มั่นคง', 'ศรีสุข', 'พูนผล', 'แก้วมณี', 'ทองดี', 'บุญมา')
+TOPICS = ('น้ำมันมะพร้าว', 'วัคซีน', 'แผ่นดินไหว', 'ราคาทองคำ', 'ธนาคาร', 'น้ำประปา', 'สัญญาณ 5G', 'ไข่ไก่')
+CLAIMS = ('รักษาโรคได้', 'มีสารอันตราย', 'จะเกิดพรุ่งนี้', 'ขึ้นราคา 10 เท่า', 'ปิดให้บริการ', 'ทำให้ป่วย')
+SOURCES = ('Facebook', 'LINE', 'Twitter', 'TikTok', 'YouTube', 'เว็บไซต์ข่าว')
+
+
+def _users(count, rng):
+    for user_id in range(1, count + 1):
+        name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+        if user_id % VERIFIER_EVERY == 0:
+            yield (user_id, f'verifier{user_id:07d}', name, 'ผู้ตรวจสอบ', f'VER{user_id:07d}')
+        else:
+            yield (user_id, f'user{user_id:07d}', name, 'ผู้ใช้ทั่วไป', None)
+
+
+def _report_counts(rumours, reports, users, rng):
+    """แบ่งจำนวนรายงานให้แต่ละข่าวแบบหางยาว (ข่าวดังไม่กี่ข่าวมีรายงานมาก)"""
+    weights = [1.0 / (rank + 1) ** 0.8 for rank in range(rumours)]
+    rng.shuffle(weights)
+    scale = reports / sum(weights)
+    return [min(users, int(weight * scale)) for weight in weights]
+
+
+def generate(path, users, rumours, reports, seed=2568, verbose=False):
+    """สร้างฐานข้อมูลจำลองที่ path (เขียนทับไฟล์เดิม) คืนค่า dict จำนวนแถวจริง"""
+    if os.path.exists(path):
+        os.remove(path)
+    migrate(path)
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1)
+    span = 180 * 24 * 3600
+
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+        triggers = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'").fetchall()
+        conn.execute('BEGIN')
+        for name, _ in triggers:
+            conn.execute(f'DROP TRIGGER {name}')
+
+        conn.executemany(
+            "INSERT INTO Users (user_id, username, name, role, verifier_code) VALUES (?, ?, ?, ?, ?)",
+            _users(users, rng),
+        )
+
+        rumour_ids = rng.sample(range(10_000_000, 100_000_000), rumours)
+        created = {rumour_id: start + timedelta(seconds=rng.randrange(span)) for rumour_id in rumour_ids}
+        conn.executemany(
+            "INSERT INTO Rumour (rumour_id, title, content, source, created_date) VALUES (?, ?, ?, ?, ?)",
+            (
+                (rumour_id,
+                 f'{rng.choice(TOPICS)}{rng.choice(CLAIMS)}',
+                 f'มีการแชร์ว่า{rng.choice(TOPICS)}{rng.choice(CLAIMS)} ' * rng.randint(1, 4),
+                 rng.choice(SOURCES),
+                 created[rumour_id].strftime('%Y-%m-%d %H:%M:%S'))
+                for rumour_id in rumour_ids
+            ),
+        )
+
+        def report_rows():
+            for rumour_id, count in zip(rumour_ids, _report_counts(rumours, reports, users, rng)):
+                base = created[rumour_id]
+                for user_id in rng.sample(range(1, users + 1), count):
+                    reported = base + timedelta(seconds=rng.randrange(7 * 24 * 3600))
+                    yield (user_id, rumour_id, reported.strftime('%Y-%m-%d %H:%M:%S'),
+                           rng.choice(REPORT_TYPES))
+
+        rows = report_rows()
+        while True:
+            chunk = [row for _, row in zip(range(CHUNK_SIZE), rows)]
+            if not chunk:
+                break
+            conn.executemany(
+                "INSERT INTO Report (user_id, rumour_id, report_date, report_type) VALUES (?, ?, ?, ?)", chunk)
+            if verbose:
+                print(f'  reports: {conn.execute("SELECT MAX(report_id) FROM Report").fetchone()[0]:,}')
+
+        for _, ddl in triggers:
+            conn.execute(ddl)
+        conn.execute('COMMIT')
+    finally:
+        conn.close()
+
+    rebuild_counters(path)
+    rebuild_search_index(path)
+
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("UPDATE Rumour SET status = 'panic' WHERE report_count >= ?", (Config.PANIC_THRESHOLD,))
+        verifiers = [row[0] for row in conn.execute("SELECT user_id FROM Users WHERE verifier_code IS NOT NULL")]
+        if verifiers:
+            for rumour_id in rng.sample(rumour_ids, int(rumours * VERIFIED_RATIO)):
+                conn.execute(
+                    "UPDATE Rumour SET is_verified = 1, verification_result = ?, verified_by = ? WHERE rumour_id = ?",
+                    (rng.choice(('ข้อมูลจริง', 'ข้อมูลเท็จ')), rng.choice(verifiers), rumour_id),
+                )
+        conn.commit()
+        conn.execute('ANALYZE')
+        counts = {
+            table.lower(): conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+            for table in ('Users', 'Rumour', 'Report')
+        }
+    finally:
+        conn.close()
+    return counts
+
+
+def load_targets(path):
+    """อ่าน id ที่ใช้เป็นเป้าหมายของ benchmark จากฐานข้อมูล"""
+    conn = sqlite3.connect(path)
+    try:
+        rumour_ids = [row[0] for row in conn.execute("SELECT rumour_id FROM Rumour")]
+        unverified = [row[0] for row in conn.execute(
+            "SELECT rumour_id FROM Rumour WHERE COALESCE(is_verified, 0) = 0")]
+        verifiers = [row[0] for row in conn.execute(
+            "SELECT user_id FROM Users WHERE verifier_code IS NOT NULL")]
+        max_user = conn.execute("SELECT MAX(user_id) FROM Users").fetchone()[0] or 0
+    finally:
+        conn.close()
+    return {
+        'rumour_ids': rumour_ids,
+        'unverified_ids': unverified,
+        'verifier_ids': verifiers,
+        'max_user_id': max_user,
+    }
+
+
+def fresh_pairs(path, count, rumour_ids, max_user_id, rng):
+    """สุ่มคู่ (user_id, rumour_id) ที่ยังไม่เคยรายงาน สำหรับ benchmark การเขียน"""
+    conn = sqlite3.connect(path)
+    pairs = set()
+    try:
+        for _ in range(count * 20):
+            if len(pairs) >= count:
+                break
+            pair = (rng.randint(1, max_user_id), rng.choice(rumour_ids))
+            if pair in pairs:
+                continue
+            exists = conn.execute(
+                "SELECT 1 FROM Report WHERE user_id = ? AND rumour_id = ?", pair).fetchone()
+            if not exists:
+                pairs.add(pair)
+    finally:
+        conn.close()
+    return list(pairs)
@@ -0,0 +1,122 @@
+"""
+Ingest - วัด throughput ของการสร้างข่าวลือ (RumourModel.create_rumour / create_rumours)
+หลาย thread สร้างพร้อมกันบนสำเนาฐานข้อมูล แล้วตรวจว่ารหัสที่ได้ไม่ซ้ำและอยู่ในช่วง 8 หลัก
+"""
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from config.settings import Config
+from database import migrate
+from .dataset import CLAIMS, SOURCES, TOPICS
+from .timing import summarize
+
+
+def _items(count, rng):
+    return [
+        (f'{rng.choice(TOPICS)}{rng.choice(CLAIMS)}',
+         f'มีการแชร์ว่า{rng.choice(TOPICS)}{rng.choice(CLAIMS)}',
+         rng.choice(SOURCES))
+        for _ in range(count)
+    ]
+
+
+def _burst(threads, total, batch, rng):
+    """สร้างข่าว total ข่าวด้วย threads thread ครั้งละ batch ข่าว คืนค่า (สรุปผล, รหัสที่ได้ทั้งหมด)"""
+    from models import repository
+
+    batches = [_items(min(batch, total - start), rng) for start in range(0, total, batch)]
+    samples, created, errors = [], [], [0]
+    lock = threading.Lock()
+
+    def worker(assigned):
+        local_samples, local_ids, failed = [], [], 0
+        for items in assigned:
+            t0 = time.perf_counter()
+            try:
+                if batch == 1:
+                    local_ids.append(repository.rumours.create_rumour(items[0][0], items[0][2], items[0][1]))
+                else:
+                    result = repository.rumours.create_rumours(items)
+                    local_ids.extend(item['rumour_id'] for item in result['results'] if 'rumour_id' in item)
+            except sqlite3.Error:
+                failed += 1
+            local_samples.append(time.perf_counter() - t0)
+        with lock:
+            samples.extend(local_samples)
+            created.extend(local_ids)
+            errors[0] += failed
+
+    workers = [threading.Thread(target=worker, args=(batches[i::threads],)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    summary = summarize(samples, elapsed, errors[0])
+    summary['rumours_per_s'] = round(len(created) / elapsed, 1) if elapsed else 0.0
+    return summary, created
+
+
+def _count_rumours(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM Rumour").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def run(db_path, threads=4, total=5000, batches=(1, 100), seed=2568):
+    """วัดการสร้างข่าวแต่ละขนาด batch บนสำเนาของ db_path คืนค่า dict ชื่อ -> ผล"""
+    from models import Database, query_cache
+    from models.ids import rumour_ids
+    original_name = Config.DATABASE_NAME
+    workdir = tempfile.mkdtemp(prefix='rumour-ingest-')
+    results = {}
+    try:
+        scratch = os.path.join(workdir, 'ingest.db')
+        shutil.copyfile(db_path, scratch)
+        migrate(scratch)  # ให้มี trigger ครบ (ดัชนีค้นหา ฯลฯ) เหมือนระบบจริง
+        Config.DATABASE_NAME = scratch
+        query_cache.clear()
+        rng = random.Random(seed)
+        before = _count_rumours(scratch)
+        created = []
+        for batch in batches:
+            summary, ids = _burst(threads, total, batch, rng)
+            results[f'create_rumours[{batch}]'] = summary
+            created.extend(ids)
+        after = _count_rumours(scratch)
+        results['check'] = {
+            'created': len(created),
+            'unique': len(set(created)),
+            'in_range': sum(10_000_000 <= rumour_id <= 99_999_999 for rumour_id in created),
+            'rows_added': after - before,
+        }
+    finally:
+        Database.close_all()
+        rumour_ids.reset()
+        Config.DATABASE_NAME = original_name
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def check(results):
+    """เงื่อนไขผ่าน: ทุกรหัสไม่ซ้ำ อยู่ในช่วง 8 หลัก ตรงกับแถวที่เพิ่มจริง และไม่มี error"""
+    summary = results['check']
+    problems = []
+    if summary['unique'] != summary['created']:
+        problems.append(f"รหัสซ้ำ {summary['created'] - summary['unique']} รหัส")
+    if summary['in_range'] != summary['created']:
+        problems.append(f"รหัสนอกช่วง 8 หลัก {summary['created'] - summary['in_range']} รหัส")
+    if summary['rows_added'] != summary['created']:
+        problems.append(f"แถวที่เพิ่ม {summary['rows_added']} ไม่ตรงกับรหัสที่ได้ {summary['created']}")
+    for name, result in results.items():
+        if name != 'check' and result['errors']:
+            problems.append(f"{name}: error {result['errors']} ครั้ง")
+    return problems
@@ -0,0 +1,94 @@
+"""
+Methods - micro-benchmark ของแต่ละ method ใน RumourModel / ReportModel / UserModel
+ค่าเริ่มต้นปิด query cache เพื่อวัดเวลาของ query จริง (เปิดได้ด้วย cache=True)
+
+หมายเหตุ: method ที่เขียนข้อมูลจะเปลี่ยนข้อมูลในฐานข้อมูลที่ใช้วัด
+"""
+import random
+from config.settings import Config
+from database import REPORT_TYPES
+from .dataset import load_targets, fresh_pairs, CLAIMS, SOURCES, TOPICS
+from .timing import measure, summarize
+
+HEAVY_DIVISOR = 20  # method ที่อ่านทั้งตารางวัดน้อยรอบกว่า
+
+
+def _cases(targets, iterations, db_path, rng):
+    """รายการ (ชื่อ, function(i), จำนวนรอบ) ของทุก method"""
+    from models import repository
+    rumours, reports, users = repository.rumours, repository.reports, repository.users
+
+    rumour_ids = targets['rumour_ids']
+    unverified = targets['unverified_ids']
+    verifiers = targets['verifier_ids'] or [1]
+    ids = [rng.choice(rumour_ids) for _ in range(iterations)]
+    heavy = max(5, iterations // HEAVY_DIVISOR)
+
+    # คู่ (user, rumour) ที่ยังไม่เคยรายงาน แยกกันระหว่าง method ที่เขียน
+    pairs = fresh_pairs(db_path, iterations * 2 + 100 * heavy, unverified, targets['max_user_id'], rng)
+    create_pairs = pairs[:iterations]
+    submit_pairs = pairs[iterations:iterations * 2]
+    bulk_pairs = pairs[iterations * 2:]
+    to_verify = rng.sample(unverified, min(iterations, len(unverified)))
+    to_panic = rng.sample(rumour_ids, min(iterations, len(rumour_ids)))
+    searches = [rng.choice((rng.choice(TOPICS), f'{rng.choice(TOPICS)}{rng.choice(CLAIMS)}',
+                            f'{rng.choice(TOPICS)} {rng.choice(SOURCES)}')) for _ in range(iterations)]
+
+    def bulk(i):
+        chunk = bulk_pairs[i * 100:(i + 1) * 100]
+        reports.bulk_create_reports([
+            (user_id, rumour_id, REPORT_TYPES[user_id % 4]) for user_id, rumour_id in chunk
+        ])
+
+    return [
+        ('RumourModel.score_from_counts', lambda i: rumours.score_from_counts(i % 7, 7), iterations),
+        ('RumourModel.calculate_credibility_score',
+         lambda i: rumours.calculate_credibility_score(ids[i]), iterations),
+        ('RumourModel.update_credibility_score',
+         lambda i: rumours.update_credibility_score(ids[i]), iterations),
+        ('RumourModel.get_all_rumours', lambda i: rumours.get_all_rumours(), heavy),
+        ('RumourModel.get_rumours_page', lambda i: rumours.get_rumours_page(), iterations),
+        ('RumourModel.get_rumour_by_id', lambda i: rumours.get_rumour_by_id(ids[i]), iterations),
+        ('RumourModel.get_rumour_report_count',
+         lambda i: rumours.get_rumour_report_count(ids[i]), iterations),
+        ('RumourModel.get_panic_rumours', lambda i: rumours.get_panic_rumours(), heavy),
+        ('RumourModel.search', lambda i: rumours.search(searches[i]), iterations),
+        ('RumourModel.get_dashboard_stats', lambda i: rumours.get_dashboard_stats(), iterations),
+        ('RumourModel.get_data_version', lambda i: rumours.get_data_version(), iterations),
+        ('ReportModel.check_duplicate_report',
+         lambda i: reports.check_duplicate_report(i + 1, ids[i]), iterations),
+        ('ReportModel.get_reports_by_rumour', lambda i: reports.get_reports_by_rumour(ids[i]), iterations),
+        ('ReportModel.get_reports_page', lambda i: reports.get_reports_page(ids[i]), iterations),
+        ('ReportModel.create_report',
+         lambda i: reports.create_report(*create_pairs[i], REPORT_TYPES[i % 4]), len(create_pairs)),
+        ('ReportModel.submit_report',
+         lambda i: reports.submit_report(*submit_pairs[i], REPORT_TYPES[i % 4]), len(submit_pairs)),
+        ('ReportModel.bulk_create_reports[100]', bulk, len(bulk_pairs) // 100),
+        ('RumourModel.create_rumour',
+         lambda i: rumours.create_rumour(searches[i], SOURCES[i % len(SOURCES)], searches[i]), iterations),
+        ('RumourModel.update_status_to_panic',
+         lambda i: rumours.update_status_to_panic(to_panic[i]), len(to_panic)),
+        ('RumourModel.verify_rumour',
+         lambda i: rumours.verify_rumour(to_verify[i], 'ข้อมูลเท็จ', verifiers[i % len(verifiers)]),
+         len(to_verify)),
+        ('UserModel.get_all_users', lambda i: users.get_all_users(), heavy),
+        ('UserModel.get_verifiers', lambda i: users.get_verifiers(), heavy),
+        ('UserModel.search_users', lambda i: users.search_users(f'user{i % 100:02d}'), iterations),
+        ('UserModel.get_user_by_id', lambda i: users.get_user_by_id(i % targets['max_user_id'] + 1), iterations),
+    ]
+
+
+def run(db_path, iterations=200, cache=False, seed=2568):
+    """วัดทุก method คืนค่า dict ชื่อ method -> สรุปผล"""
+    Config.DATABASE_NAME = db_path
+    from models import query_cache
+    query_cache.clear()
+    query_cache.enabled = cache
+
+    targets = load_targets(db_path)
+    rng = random.Random(seed)
+    results = {}
+    for name, func, count in _cases(targets, iterations, db_path, rng):
+        samples, elapsed, errors = measure(func, count)
+        results[name] = summarize(samples, elapsed, errors)
+    return results
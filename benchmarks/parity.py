@@ -0,0 +1,216 @@
+"""
+Parity - ตรวจว่า route เดิมของระบบ (/, /detail, /summary, /report, /verify) ยังทำงานตามพฤติกรรมของโค้ดต้นฉบับ
+ทุกข้อตรวจเขียนจากพฤติกรรมของ main.py ฉบับแรก (ก่อนปรับประสิทธิภาพ) จึงไม่ได้เทียบ app กับตัวเอง:
+status / redirect, ข้อความ flash, กฎการรายงานซ้ำ (4.1), PANIC เมื่อครบ PANIC_THRESHOLD (4.2),
+ข่าวที่ตรวจสอบแล้วรับรายงานไม่ได้ (4.3), ตรวจสอบได้ครั้งเดียวและเฉพาะผู้ตรวจสอบ (4.4) และลำดับหน้ารวมข่าว
+
+รันกับฐานข้อมูลชุดเล็กที่สร้างใหม่ทุกครั้ง (ผู้ใช้ ข่าว และเวลาคงที่) และให้ repository ใช้นาฬิกาที่หยุดไว้
+(repository.clock - ไม่แตะ time.time ของ thread อื่นใน process) เลื่อนทีละ CLOCK_STEP ระหว่างรายงาน
+เพื่อไม่ให้เกณฑ์ความเร็ว (PANIC_WINDOWS) ทำงานก่อนเกณฑ์จำนวนรายงาน ผลจึงเหมือนเดิมทุกรอบ
+นอกจากนี้ตรวจว่า request ผ่าน app:app (ชื่อเดิม) และ main:app ไปถึง route ชุดเดียวกันและได้ผลเหมือนกัน
+"""
+import os
+import shutil
+import sqlite3
+import tempfile
+from datetime import datetime
+from config.settings import Config
+from database import migrate
+from models.clock import SystemClock
+from models.hotness import EPOCH_KEY
+
+START = datetime(2026, 1, 1, 9, 0, 0).timestamp()  # เวลาของนาฬิกาที่หยุดไว้ตอนเริ่ม
+CLOCK_STEP = 2 * 60 * 60  # วินาทีที่เลื่อนนาฬิการะหว่าง request ที่เขียน (ยาวกว่าทุกช่วงของ PANIC_WINDOWS)
+
+USERS = [(user_id, f'user{user_id}', f'ผู้ใช้ทดสอบ {user_id}', 'ผู้ใช้ทั่วไป', None) for user_id in range(1, 7)] + [
+    (7, 'verifier7', 'ผู้ตรวจสอบ 7', 'ผู้ตรวจสอบ', 'V0007'),
+    (8, 'verifier8', 'ผู้ตรวจสอบ 8', 'ผู้ตรวจสอบ', 'V0008'),
+]
+HOT, WARM, COLD = 10000001, 10000002, 10000003
+RUMOURS = [
+    (HOT, 'ข่าวทดสอบ ร้อนแรง', 'ข่าวที่จะถูกรายงานจนเป็น PANIC', 'เพจทดสอบ', '2025-12-30 08:00:00'),
+    (WARM, 'ข่าวทดสอบ อุ่น', 'ข่าวที่มีรายงานหนึ่งครั้ง', 'กลุ่มทดสอบ', '2025-12-31 08:00:00'),
+    (COLD, 'ข่าวทดสอบ ตรวจสอบแล้ว', 'ข่าวที่ผู้ตรวจสอบยืนยันผล', 'เว็บทดสอบ', '2025-12-31 12:00:00'),
+]
+MISSING = 99999999
+
+
+class FrozenClock(SystemClock):
+    """นาฬิกาที่หยุดไว้ เลื่อนเฉพาะเมื่อเรียก advance"""
+
+    def __init__(self, start):
+        self.now_ts = start
+
+    def time(self):
+        return self.now_ts
+
+    def advance(self, seconds=CLOCK_STEP):
+        self.now_ts += seconds
+
+
+def _create_fixture(path):
+    """สร้างฐานข้อมูลชุดเล็กที่ค่าคงที่ (epoch ของ hotness คือ START แทนเวลาที่ migrate)"""
+    migrate(path)
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("UPDATE Stats SET value = ? WHERE name = ?", (START, EPOCH_KEY))
+        conn.executemany("INSERT INTO Users (user_id, username, name, role, verifier_code) VALUES (?, ?, ?, ?, ?)", USERS)
+        conn.executemany("INSERT INTO Rumour (rumour_id, title, content, source, created_date) VALUES (?, ?, ?, ?, ?)",
+                         RUMOURS)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _rumour(path, rumour_id):
+    """สถานะของข่าวในฐานข้อมูลโดยตรง (ไม่ผ่าน cache ของ app)"""
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    try:
+        row = conn.execute(
+            "SELECT status, is_verified, verification_result, verified_by, credibility_score, "
+            "(SELECT COUNT(*) FROM Report WHERE Report.rumour_id = Rumour.rumour_id) AS reports "
+            "FROM Rumour WHERE rumour_id = ?", (rumour_id,)).fetchone()
+        dates = [date for date, in conn.execute(
+            "SELECT report_date FROM Report WHERE rumour_id = ? ORDER BY report_id", (rumour_id,))]
+    finally:
+        conn.close()
+    return dict(row, report_dates=dates)
+
+
+def _entry_point_checks(apps):
+    """request แบบอ่านอย่างเดียวผ่านทุก entry point ต้องไปถึง endpoint เดียวกันและได้ status / body เหมือนกัน"""
+    urls = ['/', '/summary', f'/detail/{HOT}', f'/detail/{MISSING}', '/api/summary', f'/api/rumours/{HOT}']
+    checks = []
+    for url in urls:
+        seen = set()
+        for app in apps.values():
+            adapter = app.url_map.bind('localhost')
+            response = app.test_client().get(url)
+            seen.add((adapter.match(url)[0], response.status_code, response.get_data()))
+        checks.append((f"GET {url} ผ่าน {' และ '.join(apps)} ได้ผลเหมือนกัน", len(seen) == 1))
+    return checks
+
+
+def _checks(client, clock, path):
+    """ส่ง request ตามลำดับแล้วตรวจกับพฤติกรรมเดิม คืนค่ารายการ (ชื่อข้อตรวจ, ผ่านหรือไม่)"""
+    from models import panic_worker
+    checks = []
+
+    def send(method, url, form=None):
+        response = client.open(url, method=method, data=form, follow_redirects=True)
+        panic_worker.flush()
+        return response
+
+    def post(url, form):
+        clock.advance()
+        response = client.post(url, data=form)
+        panic_worker.flush()
+        return response
+
+    def expect(name, passed):
+        checks.append((name, bool(passed)))
+
+    body = send('GET', '/').get_data(as_text=True)
+    expect('GET / แสดงข่าวทุกข่าว', all(title in body for _, title, _, _, _ in RUMOURS))
+    response = send('GET', f'/detail/{HOT}')
+    expect('GET /detail/<id> แสดงข่าว', response.status_code == 200 and RUMOURS[0][1] in response.get_data(as_text=True))
+    response = client.get(f'/detail/{MISSING}')
+    expect('GET /detail ของข่าวที่ไม่มี redirect ไปหน้ารวมข่าว',
+           response.status_code == 302 and response.headers['Location'] == '/')
+    expect('... พร้อมข้อความไม่พบข่าว', 'ไม่พบข่าวลือที่ค้นหา' in send('GET', '/').get_data(as_text=True))
+    expect('GET /summary', send('GET', '/summary').status_code == 200)
+
+    response = post(f'/report/{HOT}', {'report_type': 'บิดเบือน'})
+    expect('POST /report ไม่มีผู้ใช้ redirect ไปหน้ารายละเอียด',
+           response.status_code == 302 and response.headers['Location'] == f'/detail/{HOT}')
+    expect('... พร้อมข้อความให้เลือกผู้ใช้',
+           'กรุณาเลือกผู้ใช้และประเภทรายงาน' in send('GET', f'/detail/{HOT}').get_data(as_text=True))
+
+    # รายงานสี่ครั้งยังไม่ถึง PANIC_THRESHOLD (5) - ครั้งที่ห้าเปลี่ยนสถานะ (Rule 4.2)
+    report_types = ['บิดเบือน', 'น่าเชื่อถือ', 'ปลุกปั่น', 'น่าเชื่อถือ', 'ข้อมูลเท็จ']
+    report_times = []
+    for user_id, report_type in zip(range(1, 5), report_types):
+        response = post(f'/report/{HOT}', {'user_id': user_id, 'report_type': report_type})
+        report_times.append(clock.time())
+        expect(f'รายงานครั้งที่ {user_id} redirect ไปหน้ารายละเอียด', response.headers.get('Location') == f'/detail/{HOT}')
+    body = send('GET', f'/detail/{HOT}').get_data(as_text=True)
+    expect('... พร้อมข้อความรายงานสำเร็จ', 'รายงานข่าวลือสำเร็จ' in body and USERS[3][2] in body)
+    expect('รายงาน 4 ครั้งยังไม่เป็น PANIC', _rumour(path, HOT)['status'] == 'ปกติ')
+
+    post(f'/report/{HOT}', {'user_id': 1, 'report_type': 'ปลุกปั่น'})
+    body = send('GET', f'/detail/{HOT}').get_data(as_text=True)
+    expect('รายงานซ้ำแจ้งว่าผู้ใช้เคยรายงานแล้ว (Rule 4.1)', 'เคยรายงานข่าวนี้ไปแล้ว' in body and USERS[0][2] in body)
+    expect('... และไม่ถูกบันทึก', _rumour(path, HOT)['reports'] == 4)
+
+    post(f'/report/{HOT}', {'user_id': 5, 'report_type': report_types[4]})
+    report_times.append(clock.time())
+    rumour = _rumour(path, HOT)
+    expect('รายงานครั้งที่ 5 เปลี่ยนเป็น PANIC', rumour['status'] == 'panic' and rumour['reports'] == 5)
+    expect('credibility_score = น่าเชื่อถือ / ทั้งหมด x 100', rumour['credibility_score'] == 40.0)
+    expect('report_date คือเวลาที่รายงาน', rumour['report_dates'] == [
+        datetime.fromtimestamp(at).strftime('%Y-%m-%d %H:%M:%S') for at in report_times])
+    expect('/summary แสดงข่าว PANIC', RUMOURS[0][1] in send('GET', '/summary').get_data(as_text=True))
+
+    post(f'/report/{WARM}', {'user_id': 6, 'report_type': 'น่าเชื่อถือ'})
+    expect('ข่าวที่มีรายงานเดียวยังเป็นปกติ', _rumour(path, WARM)['status'] == 'ปกติ')
+
+    post(f'/verify/{COLD}', {'verifier_id': 1, 'verification_result': 'ข้อมูลเท็จ'})
+    body = send('GET', f'/detail/{COLD}').get_data(as_text=True)
+    expect('ผู้ใช้ทั่วไปตรวจสอบข่าวไม่ได้', 'ไม่มีสิทธิ์เป็นผู้ตรวจสอบ' in body and not _rumour(path, COLD)['is_verified'])
+    response = post(f'/verify/{COLD}', {'verifier_id': 7, 'verification_result': 'ข้อมูลเท็จ'})
+    expect('POST /verify redirect ไปหน้ารายละเอียด', response.headers.get('Location') == f'/detail/{COLD}')
+    expect('... พร้อมข้อความตรวจสอบสำเร็จ',
+           'ตรวจสอบข่าวลือสำเร็จ: ข้อมูลเท็จ' in send('GET', f'/detail/{COLD}').get_data(as_text=True))
+    post(f'/verify/{COLD}', {'verifier_id': 8, 'verification_result': 'จริง'})
+    rumour = _rumour(path, COLD)
+    expect('ข่าวตรวจสอบได้ครั้งเดียว (Rule 4.4)',
+           'ข่าวลือนี้ถูกตรวจสอบแล้ว' in send('GET', f'/detail/{COLD}').get_data(as_text=True)
+           and (rumour['is_verified'], rumour['verification_result'], rumour['verified_by']) == (1, 'ข้อมูลเท็จ', 7))
+    post(f'/report/{COLD}', {'user_id': 2, 'report_type': 'บิดเบือน'})
+    expect('ข่าวที่ตรวจสอบแล้วรับรายงานเพิ่มไม่ได้ (Rule 4.3)',
+           'ไม่สามารถรายงานเพิ่มได้' in send('GET', f'/detail/{COLD}').get_data(as_text=True)
+           and _rumour(path, COLD)['reports'] == 0)
+    expect('POST /verify ของข่าวที่ไม่มีได้ 404',
+           post(f'/verify/{MISSING}', {'verifier_id': 7, 'verification_result': 'จริง'}).status_code == 404)
+
+    body = send('GET', '/').get_data(as_text=True)
+    positions = [body.find(title) for _, title, _, _, _ in RUMOURS]
+    expect('หน้ารวมข่าวเรียงข่าวที่มีรายงานมากก่อน', -1 not in positions and positions == sorted(positions))
+    return checks
+
+
+def run():
+    """ตรวจทุกข้อบนฐานข้อมูลชุดเล็กที่สร้างใหม่ คืนค่า dict: checks, passed, failed (ชื่อข้อตรวจที่ไม่ผ่าน)"""
+    from models import Database, panic_worker, query_cache, repository
+    from models.ids import rumour_ids
+    original = (Config.DATABASE_NAME, repository.clock)
+    clock = FrozenClock(START)
+    workdir = tempfile.mkdtemp(prefix='rumour-parity-')
+    try:
+        path = os.path.join(workdir, 'parity.db')
+        _create_fixture(path)
+        # main.py migrate และโหลดรายงานล่าสุดตอน import - ชี้ไปที่ชุดทดสอบก่อน แล้วเริ่มจากสถานะว่าง
+        Config.DATABASE_NAME = path
+        repository.clock = clock
+        import app
+        import main
+        query_cache.clear()
+        rumour_ids.reset()
+        panic_worker.detector.clear()
+        checks = _entry_point_checks({'app:app': app.app, 'main:app': main.app})
+        checks += _checks(main.app.test_client(), clock, path)
+    finally:
+        Database.close_all()
+        Config.DATABASE_NAME, repository.clock = original
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        'checks': len(checks),
+        'passed': sum(1 for _, passed in checks if passed),
+        'failed': [name for name, passed in checks if not passed],
+    }
+
+
+def check(results):
+    """เงื่อนไขผ่าน: ทุกข้อตรวจตรงกับพฤติกรรมเดิม"""
+    return [f'ไม่ตรงกับพฤติกรรมเดิม: {name}' for name in results['failed']]
@@ -0,0 +1,70 @@
+"""
+Prefork - วัด throughput ของ server.py serve เมื่อเพิ่มจำนวน worker บนหน้าที่อ่านอย่างเดียว (/ และ /summary)
+
+แต่ละจำนวน worker รันเป็น process แยกบนสำเนาฐานข้อมูลของตัวเอง ใช้ client ชุดเดียวกับ serving.py
+client รันใน process เดียว (asyncio) บนเครื่องเดียวกัน จึงแย่ง CPU กับ worker - ผลที่จำนวน worker
+เท่ากับจำนวน CPU จะต่ำกว่าที่ server ทำได้จริงเล็กน้อย
+"""
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from database import migrate
+from server import default_workers
+from .serving import PROJECT_DIR, _free_port, _load, _wait_ready
+
+PATHS = ['/', '/summary']
+SCALING_EFFICIENCY = 0.6  # throughput ต่อ worker ขั้นต่ำเทียบกับ worker เดียว (เฉพาะเมื่อ worker ไม่เกินจำนวน CPU)
+
+
+async def _measure(db_path, workers, clients, requests):
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, 'server.py', 'serve', '--workers', str(workers), '--db', db_path, '--port', str(port)],
+        cwd=PROJECT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        await _wait_ready(port, process)
+        await _load(port, PATHS, clients, workers * 50)  # warm-up (cache/connection pool ของทุก worker)
+        return await _load(port, PATHS, clients, requests)
+    finally:
+        process.terminate()
+        try:
+            process.wait(30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def run(db_path, workers=(1, 2, 4), clients=32, requests=3000):
+    """วัดแต่ละจำนวน worker บนสำเนาของ db_path คืนค่า dict: cpus และ 'workers=N' -> ผล"""
+    workdir = tempfile.mkdtemp(prefix='rumour-prefork-')
+    results = {'cpus': default_workers()}
+    try:
+        for count in workers:
+            scratch = os.path.join(workdir, f'workers-{count}.db')
+            shutil.copyfile(db_path, scratch)
+            migrate(scratch)
+            results[f'workers={count}'] = asyncio.run(_measure(scratch, count, clients, requests))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def check(results):
+    """เงื่อนไขผ่าน: ไม่มี request ที่ error และ throughput เพิ่มตามจำนวน worker (ที่ไม่เกินจำนวน CPU)"""
+    problems = []
+    base = results.get('workers=1')
+    for name, result in results.items():
+        if name == 'cpus':
+            continue
+        if result['errors']:
+            problems.append(f"{name}: request error {result['errors']} ครั้ง")
+        count = int(name.split('=', 1)[1])
+        if base and 1 < count <= results['cpus']:
+            expected = base['throughput_per_s'] * count * SCALING_EFFICIENCY
+            if result['throughput_per_s'] < expected:
+                problems.append(f"{name}: {result['throughput_per_s']} req/s ต่ำกว่า {expected:.0f} "
+                                f"({SCALING_EFFICIENCY:.0%} ของ worker เดียวคูณ {count})")
+    return problems
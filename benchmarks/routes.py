@@ -0,0 +1,98 @@
+"""
+Routes - วัด latency และ throughput ของแต่ละหน้าผ่าน Flask test client
+ไม่ผ่าน network จึงวัดเฉพาะเวลาของ controller + model + template
+
+หมายเหตุ: /report และ /verify เขียนข้อมูลจริงลงฐานข้อมูลที่ใช้วัด
+"""
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import Config
+from database import REPORT_TYPES
+from .dataset import load_targets, fresh_pairs, CLAIMS, TOPICS
+from .timing import summarize
+
+ROUTES = ('index', 'detail', 'search', 'summary', 'report', 'verify')
+READ_ROUTES = ('index', 'detail', 'search', 'summary')  # วอร์มก่อนวัด (เขียนซ้ำไม่ได้จึงไม่วอร์ม)
+
+
+def _load_app(db_path):
+    """import main หลังตั้งค่า DATABASE_NAME เพื่อให้ทั้ง migrate และ Model ใช้ไฟล์ที่วัด"""
+    Config.DATABASE_NAME = db_path
+    import main
+    return main.app
+
+
+def _requests(route, targets, count, db_path, rng):
+    """สร้างรายการ (method, url, form) ของแต่ละ route ล่วงหน้า (ไม่นับเวลา)"""
+    rumour_ids = targets['rumour_ids']
+    if route == 'index':
+        return [('GET', '/', None)] * count
+    if route == 'search':
+        return [('GET', f'/search?q={rng.choice(TOPICS)}{rng.choice(CLAIMS)}', None) for _ in range(count)]
+    if route == 'summary':
+        return [('GET', '/summary', None)] * count
+    if route == 'detail':
+        return [('GET', f'/detail/{rng.choice(rumour_ids)}', None) for _ in range(count)]
+    if route == 'report':
+        pairs = fresh_pairs(db_path, count, targets['unverified_ids'], targets['max_user_id'], rng)
+        return [
+            ('POST', f'/report/{rumour_id}',
+             {'user_id': user_id, 'report_type': rng.choice(REPORT_TYPES)})
+            for user_id, rumour_id in pairs
+        ]
+    if route == 'verify':
+        if not targets['verifier_ids']:
+            return []
+        unverified = rng.sample(targets['unverified_ids'], min(count, len(targets['unverified_ids'])))
+        return [
+            ('POST', f'/verify/{rumour_id}',
+             {'verifier_id': rng.choice(targets['verifier_ids']),
+              'verification_result': rng.choice(('ข้อมูลจริง', 'ข้อมูลเท็จ'))})
+            for rumour_id in unverified
+        ]
+    raise ValueError(f'ไม่รู้จัก route: {route}')
+
+
+def _run(app, requests, threads):
+    """ยิง request ทั้งหมดด้วยจำนวน thread ที่กำหนด คืนค่า (เวลาต่อครั้ง, เวลารวม, error)"""
+    def worker(batch):
+        client = app.test_client()
+        samples, errors = [], 0
+        for method, url, form in batch:
+            t0 = time.perf_counter()
+            response = client.open(url, method=method, data=form)
+            samples.append(time.perf_counter() - t0)
+            if response.status_code >= 400:
+                errors += 1
+        return samples, errors
+
+    batches = [requests[i::threads] for i in range(threads)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(worker, batches))
+    elapsed = time.perf_counter() - started
+    samples = [sample for batch_samples, _ in results for sample in batch_samples]
+    return samples, elapsed, sum(errors for _, errors in results)
+
+
+def run(db_path, routes=ROUTES, count=200, threads=1, cache=True, warmup=5, seed=2568):
+    """วัดทุก route คืนค่า dict ชื่อ route -> สรุปผล"""
+    app = _load_app(db_path)
+    from models import query_cache
+    from fragments import fragment_cache, page_cache
+    query_cache.clear()
+    query_cache.enabled = fragment_cache.enabled = page_cache.enabled = cache
+
+    targets = load_targets(db_path)
+    rng = random.Random(seed)
+    results = {}
+    for route in routes:
+        extra = warmup if route in READ_ROUTES else 0
+        requests = _requests(route, targets, count + extra, db_path, rng)
+        if extra:
+            _run(app, requests[:extra], 1)
+            requests = requests[extra:]
+        samples, elapsed, errors = _run(app, requests, threads)
+        results[route] = summarize(samples, elapsed, errors)
+    return results
@@ -0,0 +1,225 @@
+"""
+Serving - เทียบ development server เดิม (Werkzeug แบบหนึ่ง thread ต่อการเชื่อมต่อ เหมือน app.run)
+กับ asgi.py บน uvicorn เมื่อมีผู้ใช้เปิด /events/panic ค้างไว้จำนวนมาก
+
+แต่ละ server รันใน process แยกบนสำเนาฐานข้อมูลของตัวเอง แล้ววัด
+- จำนวน thread และหน่วยความจำ (RSS) ของ server ก่อน/ระหว่างมีการเชื่อมต่อ SSE ค้างไว้ idle การเชื่อมต่อ
+- latency/throughput ของ client พร้อมกัน clients ราย ที่ขอหน้าเว็บรวม requests ครั้งระหว่างนั้น
+  (ใช้ keep-alive เมื่อ server รองรับ - uvicorn รองรับ ส่วน development server ปิดการเชื่อมต่อทุก response)
+
+ต้องติดตั้ง uvicorn (pip install uvicorn) และอ่านค่าจาก /proc (Linux) สำหรับจำนวน thread/RSS
+"""
+import asyncio
+import itertools
+import logging
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from config.settings import Config
+from database import migrate
+from .dataset import load_targets
+from .timing import summarize
+
+SERVERS = ('wsgi', 'asgi')
+START_TIMEOUT = 60.0
+REQUEST_TIMEOUT = 30.0
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def serve(kind, db_path, port):
+    """รัน server หนึ่งตัว (เรียกใน process ลูกผ่าน python -m benchmarks.serving)"""
+    Config.DATABASE_NAME = db_path
+    if kind == 'wsgi':
+        from werkzeug.serving import run_simple
+        import main
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        # เหมือน app.run(...) แต่ไม่มี reloader/debugger
+        run_simple(Config.HOST, port, main.app, threaded=True)
+    else:
+        import uvicorn
+        import asgi
+        uvicorn.run(asgi.app, host=Config.HOST, port=port, log_level='warning')
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind((Config.HOST, 0))
+        return sock.getsockname()[1]
+
+
+def _process_status(pid):
+    """(จำนวน thread, RSS เป็น MB) ของ process จาก /proc (None ถ้าอ่านไม่ได้)"""
+    fields = {}
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                name, _, value = line.partition(':')
+                fields[name] = value.split()
+    except OSError:
+        return None, None
+    threads = int(fields['Threads'][0]) if 'Threads' in fields else None
+    rss = round(int(fields['VmRSS'][0]) / 1024, 1) if 'VmRSS' in fields else None
+    return threads, rss
+
+
+async def _wait_ready(port, process):
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'server หยุดทำงาน (exit code {process.returncode})')
+        try:
+            _, writer = await asyncio.open_connection(Config.HOST, port)
+        except OSError:
+            await asyncio.sleep(0.1)
+            continue
+        writer.close()
+        return
+    raise RuntimeError('server ไม่พร้อมภายในเวลาที่กำหนด')
+
+
+async def _open_idle(port, count, concurrency=100):
+    """เปิด GET /events/panic ค้างไว้ count การเชื่อมต่อ คืนค่า (writer ที่เปิดได้, จำนวนที่ล้มเหลว)"""
+    gate = asyncio.Semaphore(concurrency)
+
+    async def connect():
+        async with gate:
+            reader, writer = await asyncio.open_connection(Config.HOST, port)
+            writer.write(f'GET /events/panic HTTP/1.1\r\nHost: {Config.HOST}\r\n\r\n'.encode())
+            head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), REQUEST_TIMEOUT)
+            if b' 200 ' not in head.split(b'\r\n', 1)[0]:
+                writer.close()
+                raise ConnectionError(head.split(b'\r\n', 1)[0].decode())
+            return writer
+
+    results = await asyncio.gather(*(connect() for _ in range(count)), return_exceptions=True)
+    writers = [result for result in results if isinstance(result, asyncio.StreamWriter)]
+    return writers, len(results) - len(writers)
+
+
+async def _request(reader, writer, path):
+    """ส่ง GET หนึ่งครั้งบนการเชื่อมต่อเดิม คืนค่า (status, ใช้การเชื่อมต่อต่อได้หรือไม่)"""
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: {Config.HOST}\r\n\r\n'.encode())
+    head = await reader.readuntil(b'\r\n\r\n')
+    headers = {}
+    for line in head.split(b'\r\n')[1:]:
+        name, _, value = line.partition(b':')
+        headers[name.strip().lower()] = value.strip()
+    if b'content-length' not in headers:
+        raise ConnectionError('response ไม่มี Content-Length')
+    await reader.readexactly(int(headers[b'content-length']))
+    # development server ของ Werkzeug ไม่รองรับ keep-alive (ตอบ Connection: close)
+    return int(head.split(b' ', 2)[1]), headers.get(b'connection', b'').lower() != b'close'
+
+
+async def _load(port, paths, clients, total):
+    """client พร้อมกัน clients ราย (แต่ละรายใช้การเชื่อมต่อของตัวเองซ้ำถ้าทำได้) ขอหน้าเว็บรวม total ครั้ง"""
+    counter = itertools.count()
+    samples, errors = [], [0]
+
+    async def client():
+        connection = None
+        while next(counter) < total:
+            path = paths[len(samples) % len(paths)]
+            t0 = time.perf_counter()
+            try:
+                if connection is None:
+                    connection = await asyncio.open_connection(Config.HOST, port)
+                status, keep_alive = await asyncio.wait_for(_request(*connection, path), REQUEST_TIMEOUT)
+                if status >= 500:
+                    errors[0] += 1
+                if not keep_alive:
+                    connection[1].close()
+                    connection = None
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError):
+                errors[0] += 1
+                if connection is not None:
+                    connection[1].close()
+                connection = None
+            samples.append(time.perf_counter() - t0)
+        if connection is not None:
+            connection[1].close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return summarize(samples, time.perf_counter() - started, errors[0])
+
+
+async def _measure(kind, db_path, idle, clients, requests, paths):
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.serving', kind, db_path, str(port)],
+        cwd=PROJECT_DIR, stdout=subprocess.DEVNULL,
+    )
+    writers = []
+    try:
+        await _wait_ready(port, process)
+        await _load(port, paths, 4, 50)  # warm-up (template/cache/connection pool)
+        threads_before, rss_before = _process_status(process.pid)
+        writers, failed = await _open_idle(port, idle)
+        await asyncio.sleep(0.5)
+        threads_idle, rss_idle = _process_status(process.pid)
+        result = {
+            'idle_connected': len(writers),
+            'idle_failed': failed,
+            'threads_before': threads_before,
+            'threads_with_idle': threads_idle,
+            'rss_mb_before': rss_before,
+            'rss_mb_with_idle': rss_idle,
+            'requests': await _load(port, paths, clients, requests),
+        }
+    finally:
+        for writer in writers:
+            writer.close()
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return result
+
+
+def run(db_path, servers=SERVERS, idle=1000, clients=50, requests=2000, seed=2568):
+    """วัดแต่ละ server บนสำเนาของ db_path คืนค่า dict ชื่อ server -> ผล"""
+    if 'asgi' in servers:
+        try:
+            import uvicorn  # noqa: F401
+        except ImportError:
+            raise SystemExit('ต้องติดตั้ง uvicorn ก่อน: pip install uvicorn')
+    rng = random.Random(seed)
+    targets = load_targets(db_path)
+    paths = ['/', '/summary'] + [f'/detail/{rumour_id}' for rumour_id in rng.sample(targets['rumour_ids'], 8)]
+    workdir = tempfile.mkdtemp(prefix='rumour-serving-')
+    results = {}
+    try:
+        for kind in servers:
+            scratch = os.path.join(workdir, f'{kind}.db')
+            shutil.copyfile(db_path, scratch)
+            migrate(scratch)
+            results[kind] = asyncio.run(_measure(kind, scratch, idle, clients, requests, paths))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def check(results):
+    """เงื่อนไขผ่าน: asgi รับการเชื่อมต่อ SSE ได้ครบโดยจำนวน thread ไม่เพิ่มตาม และไม่มี request ที่ error"""
+    problems = []
+    for kind, result in results.items():
+        if result['requests']['errors']:
+            problems.append(f"{kind}: request error {result['requests']['errors']} ครั้ง")
+    asgi = results.get('asgi')
+    if asgi:
+        if asgi['idle_failed']:
+            problems.append(f"asgi: เปิด /events/panic ค้างไว้ไม่สำเร็จ {asgi['idle_failed']} การเชื่อมต่อ")
+        if asgi['threads_before'] is not None and asgi['threads_with_idle'] > asgi['threads_before'] + Config.ASGI_WORKER_THREADS:
+            problems.append(f"asgi: thread เพิ่มจาก {asgi['threads_before']} เป็น {asgi['threads_with_idle']}")
+    return problems
+
+
+if __name__ == '__main__':
+    serve(sys.argv[1], sys.argv[2], int(sys.argv[3]))
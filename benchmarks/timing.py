@@ -0,0 +1,43 @@
+"""
+Timing - เครื่องมือจับเวลาและสรุปผลเป็น percentile
+"""
+import time
+
+
+def percentile(sorted_samples, fraction):
+    """percentile แบบ nearest-rank จากรายการที่เรียงแล้ว"""
+    if not sorted_samples:
+        return 0.0
+    index = max(0, min(len(sorted_samples) - 1, int(round(fraction * len(sorted_samples))) - 1))
+    return sorted_samples[index]
+
+
+def summarize(samples, elapsed, errors=0):
+    """สรุปเวลาต่อครั้ง (วินาที) เป็น dict หน่วยมิลลิวินาที พร้อม throughput ต่อวินาที"""
+    ordered = sorted(samples)
+    to_ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        'count': len(ordered),
+        'errors': errors,
+        'mean_ms': to_ms(sum(ordered) / len(ordered)) if ordered else 0.0,
+        'p50_ms': to_ms(percentile(ordered, 0.50)),
+        'p90_ms': to_ms(percentile(ordered, 0.90)),
+        'p99_ms': to_ms(percentile(ordered, 0.99)),
+        'max_ms': to_ms(ordered[-1]) if ordered else 0.0,
+        'throughput_per_s': round(len(ordered) / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+def measure(func, iterations):
+    """เรียก func(i) ตามจำนวนครั้ง คืนค่า (รายการเวลาต่อครั้ง, เวลารวม, จำนวนครั้งที่ error)"""
+    samples = []
+    errors = 0
+    started = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        try:
+            func(i)
+        except Exception:
+            errors += 1
+        samples.append(time.perf_counter() - t0)
+    return samples, time.perf_counter() - started, errors
@@ -6,14 +6,109 @@ class Config:
     """การตั้งค่าพื้นฐานของระบบ"""
     # Database
     DATABASE_NAME = 'rumor_tracking.db'
+    DB_POOL_SIZE = 8  # จำนวน connection สูงสุดที่เปิดค้างไว้ต่อไฟล์ฐานข้อมูล
+    DB_POOL_TIMEOUT = 10.0  # เวลา (วินาที) ที่รอ connection ว่างก่อนแจ้งข้อผิดพลาด
+    DB_STATEMENT_CACHE_SIZE = 256  # จำนวน prepared statement ที่เก็บไว้ใช้ซ้ำต่อ connection
+    DB_ITER_BATCH_SIZE = 500  # จำนวนแถวที่ดึงต่อครั้งของ iter_* (generator)
+    
+    # Storage profile - PRAGMA ที่ตั้งให้ทุก connection ใน pool
+    # WAL ทำให้ผู้อ่านไม่ถูกบล็อกระหว่างมีการเขียน และผู้เขียนรอกันตาม busy_timeout แทนการ error ทันที
+    DB_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',  # ปลอดภัยกับ WAL (อาจเสีย transaction ล่าสุดเมื่อไฟดับ แต่ไฟล์ไม่เสีย)
+        'busy_timeout': 5000,  # มิลลิวินาทีที่รอล็อกก่อนแจ้ง database is locked
+        'cache_size': -16000,  # ค่าติดลบ = KiB (ประมาณ 16 MB ต่อ connection)
+        'mmap_size': 268435456,  # อ่านไฟล์ผ่าน memory map สูงสุด 256 MB
+        'temp_store': 'MEMORY',  # ตารางชั่วคราว/การเรียงลำดับอยู่ในหน่วยความจำ
+    }
+    DB_CHECKPOINT_INTERVAL = 300  # วินาทีระหว่าง WAL checkpoint เบื้องหลัง (0 = ปิด ใช้ auto-checkpoint ของ SQLite)
     
     # Flask
     SECRET_KEY = 'rumor_tracking_secret_key_2568'
     DEBUG = True
     
+    # Query cache (read-through, TTL + LRU)
+    CACHE_ENABLED = True
+    CACHE_TTL = 30  # วินาทีที่ผลลัพธ์อยู่ใน cache ได้นานสุด
+    CACHE_MAX_ENTRIES = 1024  # จำนวนรายการสูงสุดก่อนไล่รายการที่ไม่ได้ใช้ออก
+    
+    # Rendered output cache - HTML ทั้งหน้า (/ และ /summary) และ fragment (การ์ดข่าว)
+    PAGE_CACHE_ENABLED = True
+    PAGE_CACHE_MAX_ENTRIES = 256
+    FRAGMENT_CACHE_MAX_ENTRIES = 4096
+    
+    # Pagination
+    PAGE_SIZE = 20  # จำนวนแถวต่อหน้า (ค่าเริ่มต้นของ ?limit=)
+    MAX_PAGE_SIZE = 100  # จำนวนแถวต่อหน้าสูงสุดที่ยอมให้ขอ
+    
+    # Search (/api/users?q= และ /search?q=)
+    USER_SEARCH_LIMIT = 10  # จำนวนผู้ใช้สูงสุดที่คืนต่อการค้นหา
+    SEARCH_MAX_CANDIDATES = 1000  # ค้นหาข่าวลือ: จัดอันดับเฉพาะข่าวที่พบก่อนไม่เกินจำนวนนี้ (คุมเวลาเมื่อคำค้นกว้าง)
+    
+    # Bulk API
+    BULK_MAX_ITEMS = 10000  # จำนวนรายการสูงสุดต่อหนึ่ง request ของ /api/reports/bulk และ POST /api/rumours
+    
+    # การสร้างข่าวลือ
+    RUMOUR_ID_BLOCK = 1000  # จำนวนรหัสข่าวที่แต่ละ process จองต่อครั้ง (models/ids.py)
+    RUMOUR_TITLE_MAX_LENGTH = 200
+    RUMOUR_CONTENT_MAX_LENGTH = 5000
+    RUMOUR_SOURCE_MAX_LENGTH = 100
+    
     # Business Rules
     PANIC_THRESHOLD = 5  # จำนวนรายงานขั้นต่ำที่ทำให้เป็น PANIC
+    # เกณฑ์ความเร็ว: (จำนวนรายงาน, ภายในกี่วินาที) - ถึงเกณฑ์ใดเกณฑ์หนึ่งก็เป็น PANIC ได้ก่อนครบ PANIC_THRESHOLD
+    # ใส่ () เพื่อปิด
+    # ตัวนับ sliding window อยู่ในหน่วยความจำของ process - server.py serve --workers N (N > 1) จึงเปลี่ยนไปนับจาก
+    # Report.report_date ในฐานข้อมูลแทน (models/velocity.py ReportWindows: หนึ่ง query ต่อชุดที่ panic worker ตรวจ
+    # ขอบ window ละเอียดถึงวินาที และไม่ตรวจย้อนหลังตอนเริ่ม worker)
+    PANIC_WINDOWS = (
+        (3, 10 * 60),  # 3 รายงานภายใน 10 นาที
+        (4, 60 * 60),  # 4 รายงานภายใน 1 ชั่วโมง
+    )
+    PANIC_BUCKET_SECONDS = 30  # ความละเอียดของ sliding window
+    
+    # ความร้อนแรงของข่าว (models/hotness.py) - ลำดับของหน้ารวมข่าว: จำนวนรายงานที่ลดน้ำหนักตามอายุของรายงาน
+    HOTNESS_HALF_LIFE = 12 * 60 * 60  # วินาทีที่น้ำหนักของรายงานลดลงเหลือครึ่งหนึ่ง
+    HOTNESS_WINDOW = 14 * 24 * 60 * 60  # รายงานที่เก่ากว่านี้ไม่นับ (น้ำหนักเหลือไม่ถึง 1 ใน 10^8)
+    # วินาทีระหว่างการคำนวณใหม่จากตาราง Report เบื้องหลัง (0 = ปิด)
+    # แต่ละรอบที่ค่าเปลี่ยนเพิ่ม data_version หนึ่งครั้ง - ETag, page cache และ query cache ของทุก worker หมดอายุพร้อมกัน
+    HOTNESS_REBUILD_INTERVAL = 3600
+    
+    # Panic worker - ตรวจ panic เบื้องหลังแทนการตรวจใน request ที่ส่งรายงาน
+    PANIC_ASYNC = True  # False = ตรวจทันทีใน transaction เดียวกับการบันทึกรายงาน
+    PANIC_BATCH_DELAY = 0.05  # วินาทีที่รอรวมรายงานที่เข้ามาต่อเนื่องเป็นชุดเดียว
+    PANIC_MAX_BATCH = 500  # จำนวนข่าวสูงสุดที่ตรวจต่อหนึ่งชุด
+    PANIC_QUEUE_SIZE = 10000  # ถ้าคิวเต็มจะตรวจทันทีใน request นั้นแทน
+    SSE_HEARTBEAT = 15  # วินาทีระหว่าง heartbeat ของ /events/panic (กัน proxy ตัดการเชื่อมต่อ)
+    
+    # Report batcher (models/batcher.py) - รวมรายงานจากหลาย request เขียนใน transaction เดียว (group commit)
+    REPORT_BATCHING = False  # True = POST /report/<id> ส่งรายงานให้ writer thread เดียวแล้วรอผล
+    REPORT_BATCH_SIZE = 256  # จำนวนรายงานสูงสุดต่อหนึ่ง commit
+    REPORT_BATCH_DELAY = 0  # วินาทีที่รอรายงานเพิ่มก่อน commit (0 = commit รายงานที่ค้างในคิวระหว่าง commit ก่อนหน้าทันที)
+    # batch ตัดเฉพาะค่า commit ต่อรายงาน - ใน WAL + synchronous=NORMAL ไม่มี fsync ต่อ commit จึงเร็วขึ้นราว 3-4 เท่า
+    # (งานต่อแถวของ INSERT และ trigger ยังเท่าเดิม) ดิสก์ที่ fsync ช้าจะได้มากกว่านั้น การรอ (DELAY > 0) ไม่ช่วย
+    # เพราะชุดถูกจำกัดด้วยจำนวน request ที่รอผลพร้อมกันอยู่แล้ว (python -m benchmarks batching --batch-delay)
+    REPORT_QUEUE_SIZE = 10000  # ถ้าคิวเต็มจะบันทึกทันทีใน request นั้นแทน
+    
+    # Instrumentation (instrumentation.py) - เวลาต่อ request และ SQL, header Server-Timing และ /metrics
+    # ปิดแล้ว connection เป็น sqlite3.Connection ปกติและไม่มี hook ต่อ request (ต้องตั้งก่อนเปิด connection แรก)
+    METRICS_ENABLED = True
+    METRICS_MAX_QUERIES = 200  # จำนวนคำสั่ง SQL (normalize แล้ว) สูงสุดที่แยกสถิติ ที่เกินรวมเป็น 'other'
+    METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)  # วินาที (histogram ของ request)
+    PROFILE_SAMPLE_RATE = 0  # profile 1 ใน N request ด้วย cProfile แล้วบันทึกไฟล์ .prof (0 = ปิด)
+    PROFILE_DIR = 'profiles'
+
+    # Analytics (analytics.py) - ส่งออกสถิติรายข่าว/รายวัน/รายผู้ใช้แบบ columnar (ต้องติดตั้ง NumPy)
+    ANALYTICS_CHUNK_SIZE = 100000  # จำนวนรายงานที่อ่านต่อครั้ง (หน่วยความจำของ chunk ไม่ขึ้นกับจำนวนรายงานทั้งหมด)
+    ANALYTICS_OUTPUT_DIR = 'analytics'
     
     # Server
     HOST = '127.0.0.1'
     PORT = 5000
+    # ASGI (asgi.py) - thread ที่รัน route ของ Flask (การเรียก Model) พร้อมกันได้สูงสุด
+    # ไม่ควรเกิน DB_POOL_SIZE มากนัก เพราะ thread ที่เกินจะรอ connection จาก pool อยู่ดี
+    ASGI_WORKER_THREADS = 8
+    # Prefork server (server.py serve) - process แม่ fork worker หลายตัวที่รับ request จาก socket เดียวกัน
+    SERVER_WORKERS = 0  # 0 = จำนวน CPU ที่ process นี้ใช้ได้
+    SERVER_BACKLOG = 2048  # listen backlog ของ socket ที่ worker ใช้ร่วมกัน
+    SERVER_GRACEFUL_TIMEOUT = 30  # วินาทีที่รอ worker ตอบ request ที่ค้างให้เสร็จก่อน SIGKILL (ตอนหยุด/reload)
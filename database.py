@@ -1,15 +1,21 @@
 """
 Database - สร้างฐานข้อมูลและข้อมูลตัวอย่าง
+โครงสร้างฐานข้อมูลถูกจัดการด้วย migration ที่มีหมายเลขเวอร์ชัน (เก็บใน PRAGMA user_version)
 """
 import sqlite3
 import random
+import sys
 from datetime import datetime, timedelta
+from config.settings import Config
+from models.database import Database
+from models.hotness import rebuild as _rebuild_hotness
+from models.report import QUERY_PLANS as _report_plans
+from models.rumour import QUERY_PLANS as _rumour_plans
+from models.user import QUERY_PLANS as _user_plans
 
-def init_database():
-    """สร้างตารางในฐานข้อมูล"""
-    conn = sqlite3.connect('rumor_tracking.db')
-    cursor = conn.cursor()
-    
+
+def _create_base_tables(cursor):
+    """สร้างตาราง Users, Rumour และ Report"""
     # สร้างตาราง Users
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS Users (
@@ -51,15 +57,442 @@ def init_database():
             UNIQUE(user_id, rumour_id)
         )
     ''')
-    
-    conn.commit()
-    conn.close()
+
+
+# Trigger ที่ดูแลตัวนับรายงานบน Rumour ให้ตรงกับตาราง Report เสมอ
+# (report_count, credible_count และ credibility_score คำนวณจากตัวนับได้ทันทีแบบ O(1))
+COUNTER_TRIGGERS = {
+    'trg_report_counters_insert': '''
+        CREATE TRIGGER IF NOT EXISTS trg_report_counters_insert
+        AFTER INSERT ON Report
+        BEGIN
+            UPDATE Rumour
+            SET report_count = report_count + 1,
+                credible_count = credible_count + (NEW.report_type = 'น่าเชื่อถือ'),
+                credibility_score = ROUND(
+                    (credible_count + (NEW.report_type = 'น่าเชื่อถือ')) * 100.0 / (report_count + 1), 2)
+            WHERE rumour_id = NEW.rumour_id;
+        END
+    ''',
+    'trg_report_counters_delete': '''
+        CREATE TRIGGER IF NOT EXISTS trg_report_counters_delete
+        AFTER DELETE ON Report
+        BEGIN
+            UPDATE Rumour
+            SET report_count = report_count - 1,
+                credible_count = credible_count - (OLD.report_type = 'น่าเชื่อถือ'),
+                credibility_score = CASE WHEN report_count > 1
+                    THEN ROUND((credible_count - (OLD.report_type = 'น่าเชื่อถือ')) * 100.0 / (report_count - 1), 2)
+                    ELSE 0.0 END
+            WHERE rumour_id = OLD.rumour_id;
+        END
+    ''',
+    'trg_report_counters_update': '''
+        CREATE TRIGGER IF NOT EXISTS trg_report_counters_update
+        AFTER UPDATE OF rumour_id, report_type ON Report
+        BEGIN
+            UPDATE Rumour
+            SET report_count = report_count - 1,
+                credible_count = credible_count - (OLD.report_type = 'น่าเชื่อถือ'),
+                credibility_score = CASE WHEN report_count > 1
+                    THEN ROUND((credible_count - (OLD.report_type = 'น่าเชื่อถือ')) * 100.0 / (report_count - 1), 2)
+                    ELSE 0.0 END
+            WHERE rumour_id = OLD.rumour_id;
+            UPDATE Rumour
+            SET report_count = report_count + 1,
+                credible_count = credible_count + (NEW.report_type = 'น่าเชื่อถือ'),
+                credibility_score = ROUND(
+                    (credible_count + (NEW.report_type = 'น่าเชื่อถือ')) * 100.0 / (report_count + 1), 2)
+            WHERE rumour_id = NEW.rumour_id;
+        END
+    ''',
+}
+
+
+def ensure_counters(cursor):
+    """เพิ่มคอลัมน์ตัวนับและ trigger ให้ตาราง Rumour (ใช้ได้กับฐานข้อมูลเดิม)"""
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(Rumour)")}
+    added = False
+    for column in ('report_count', 'credible_count'):
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE Rumour ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+            added = True
+    for ddl in COUNTER_TRIGGERS.values():
+        cursor.execute(ddl)
+    if added:
+        _rebuild_counters(cursor)
+
+
+def _rebuild_counters(cursor):
+    """คำนวณตัวนับของทุกข่าวใหม่จากตาราง Report"""
+    cursor.execute('''
+        UPDATE Rumour
+        SET report_count = (SELECT COUNT(*) FROM Report WHERE Report.rumour_id = Rumour.rumour_id),
+            credible_count = (SELECT COUNT(*) FROM Report
+                              WHERE Report.rumour_id = Rumour.rumour_id
+                                AND Report.report_type = 'น่าเชื่อถือ')
+    ''')
+    cursor.execute('''
+        UPDATE Rumour
+        SET credibility_score = ROUND(credible_count * 100.0 / report_count, 2)
+        WHERE report_count > 0
+    ''')
+
+
+# Index รองที่ Model ใช้ (ชื่อ index ถูกตรวจใน check_query_plans)
+# แต่ละชุดเป็นของ migration เดียวและห้ามแก้หลังใช้งานแล้ว - index ใหม่ให้เพิ่มเป็นชุดใหม่ใน migration ใหม่
+# (ฐานข้อมูลใหม่และฐานข้อมูลที่อัปเกรดจึงผ่านขั้นตอนเดียวกันเสมอ)
+SECONDARY_INDEXES = (  # migration 3
+    # นับ/จัดกลุ่มรายงานตามข่าวและประเภท
+    'CREATE INDEX IF NOT EXISTS idx_report_rumour_type ON Report(rumour_id, report_type)',
+    # รายการรายงานของข่าว เรียงตามวันที่
+    'CREATE INDEX IF NOT EXISTS idx_report_rumour_date ON Report(rumour_id, report_date)',
+    # ข่าว panic เรียงตามจำนวนรายงาน
+    'CREATE INDEX IF NOT EXISTS idx_rumour_status_count ON Rumour(status, report_count)',
+    # หน้ารวมข่าวลือ เรียงตามจำนวนรายงานและวันที่สร้าง (migration 9 แทนด้วย idx_rumour_hotness)
+    'CREATE INDEX IF NOT EXISTS idx_rumour_hot ON Rumour(report_count, created_date)',
+    # partial index เฉพาะผู้ตรวจสอบ เรียงตาม username
+    'CREATE INDEX IF NOT EXISTS idx_users_verifiers ON Users(username) WHERE verifier_code IS NOT NULL',
+)
+REPORT_DATE_INDEXES = (  # migration 6
+    # รายงานล่าสุดทั้งระบบตามเวลา (seed velocity detector ตอนเริ่มระบบ)
+    'CREATE INDEX IF NOT EXISTS idx_report_date ON Report(report_date)',
+)
+USER_SEARCH_INDEXES = (  # migration 7
+    # ค้นหาผู้ใช้จากคำขึ้นต้นของ username / ชื่อ (/api/users?q=)
+    'CREATE INDEX IF NOT EXISTS idx_users_username ON Users(username)',
+    'CREATE INDEX IF NOT EXISTS idx_users_name ON Users(name)',
+)
+
+
+def _execute_ddl(statements):
+    """migration ที่รันคำสั่ง DDL ชุดตายตัวตามลำดับ"""
+    def apply(cursor):
+        for ddl in statements:
+            cursor.execute(ddl)
+    return apply
+
+
+# หน้ารวมข่าวลือ เรียงตามความร้อนแรงและวันที่สร้าง (แทน idx_rumour_hot บน report_count เดิม)
+HOTNESS_INDEX = 'CREATE INDEX IF NOT EXISTS idx_rumour_hotness ON Rumour(hotness, created_date)'
+
+
+def _create_hotness(cursor):
+    """เพิ่มคอลัมน์ hotness (ความร้อนแรงแบบลดน้ำหนักตามเวลา) พร้อม index แล้วคำนวณจากรายงานล่าสุด"""
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(Rumour)")}
+    if 'hotness' not in columns:
+        cursor.execute("ALTER TABLE Rumour ADD COLUMN hotness REAL NOT NULL DEFAULT 0")
+    cursor.execute(HOTNESS_INDEX)
+    cursor.execute("DROP INDEX IF EXISTS idx_rumour_hot")
+    _rebuild_hotness(cursor)
+
+
+REPORT_TYPES = ('บิดเบือน', 'ปลุกปั่น', 'ข้อมูลเท็จ', 'น่าเชื่อถือ')
+
+# Trigger ที่ดูแลสถิติรวมของทั้งระบบในตาราง Stats (หน้าสรุปผลอ่านได้ทันทีไม่ต้องนับทุกแถว)
+STATS_TRIGGERS = {
+    'trg_stats_rumour_insert': '''
+        CREATE TRIGGER IF NOT EXISTS trg_stats_rumour_insert
+        AFTER INSERT ON Rumour
+        BEGIN
+            UPDATE Stats SET value = value + CASE name
+                WHEN 'rumours' THEN 1
+                WHEN 'verified_rumours' THEN COALESCE(NEW.is_verified, 0) != 0
+                WHEN 'panic_rumours' THEN NEW.status = 'panic'
+                WHEN 'credibility_sum' THEN COALESCE(NEW.credibility_score, 0)
+            END
+            WHERE name IN ('rumours', 'verified_rumours', 'panic_rumours', 'credibility_sum');
+        END
+    ''',
+    'trg_stats_rumour_delete': '''
+        CREATE TRIGGER IF NOT EXISTS trg_stats_rumour_delete
+        AFTER DELETE ON Rumour
+        BEGIN
+            UPDATE Stats SET value = value - CASE name
+                WHEN 'rumours' THEN 1
+                WHEN 'verified_rumours' THEN COALESCE(OLD.is_verified, 0) != 0
+                WHEN 'panic_rumours' THEN OLD.status = 'panic'
+                WHEN 'credibility_sum' THEN COALESCE(OLD.credibility_score, 0)
+            END
+            WHERE name IN ('rumours', 'verified_rumours', 'panic_rumours', 'credibility_sum');
+        END
+    ''',
+    'trg_stats_rumour_update': '''
+        CREATE TRIGGER IF NOT EXISTS trg_stats_rumour_update
+        AFTER UPDATE OF is_verified, status, credibility_score ON Rumour
+        BEGIN
+            UPDATE Stats SET value = value + CASE name
+                WHEN 'verified_rumours' THEN (COALESCE(NEW.is_verified, 0) != 0) - (COALESCE(OLD.is_verified, 0) != 0)
+                WHEN 'panic_rumours' THEN (NEW.status = 'panic') - (OLD.status = 'panic')
+                WHEN 'credibility_sum' THEN COALESCE(NEW.credibility_score, 0) - COALESCE(OLD.credibility_score, 0)
+            END
+            WHERE name IN ('verified_rumours', 'panic_rumours', 'credibility_sum');
+        END
+    ''',
+    'trg_stats_report_insert': '''
+        CREATE TRIGGER IF NOT EXISTS trg_stats_report_insert
+        AFTER INSERT ON Report
+        BEGIN
+            UPDATE Stats SET value = value + 1 WHERE name IN ('reports', 'reports:' || NEW.report_type);
+        END
+    ''',
+    'trg_stats_report_delete': '''
+        CREATE TRIGGER IF NOT EXISTS trg_stats_report_delete
+        AFTER DELETE ON Report
+        BEGIN
+            UPDATE Stats SET value = value - 1 WHERE name IN ('reports', 'reports:' || OLD.report_type);
+        END
+    ''',
+    'trg_stats_report_update': '''
+        CREATE TRIGGER IF NOT EXISTS trg_stats_report_update
+        AFTER UPDATE OF report_type ON Report
+        BEGIN
+            UPDATE Stats SET value = value - 1 WHERE name = 'reports:' || OLD.report_type;
+            UPDATE Stats SET value = value + 1 WHERE name = 'reports:' || NEW.report_type;
+        END
+    ''',
+}
+
+
+def _create_stats(cursor):
+    """สร้างตาราง Stats พร้อม trigger และคำนวณค่าเริ่มต้นจากข้อมูลที่มีอยู่"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Stats (
+            name TEXT PRIMARY KEY,
+            value REAL NOT NULL DEFAULT 0
+        )
+    ''')
+    for ddl in STATS_TRIGGERS.values():
+        cursor.execute(ddl)
+    _rebuild_stats(cursor)
+
+
+def _rebuild_stats(cursor):
+    """คำนวณสถิติรวมใหม่ทั้งหมดจากตาราง Rumour และ Report"""
+    totals = cursor.execute('''
+        SELECT COUNT(*),
+               COALESCE(SUM(COALESCE(is_verified, 0) != 0), 0),
+               COALESCE(SUM(status = 'panic'), 0),
+               COALESCE(SUM(COALESCE(credibility_score, 0)), 0)
+        FROM Rumour
+    ''').fetchone()
+    values = dict(zip(('rumours', 'verified_rumours', 'panic_rumours', 'credibility_sum'), totals))
+    values['reports'] = 0
+    for report_type in REPORT_TYPES:
+        values[f'reports:{report_type}'] = 0
+    for report_type, count in cursor.execute("SELECT report_type, COUNT(*) FROM Report GROUP BY report_type"):
+        values[f'reports:{report_type}'] = count
+        values['reports'] += count
+    cursor.executemany("INSERT OR REPLACE INTO Stats (name, value) VALUES (?, ?)", values.items())
+
+
+# Trigger ที่เพิ่ม data_version และเวลาแก้ไขล่าสุดทุกครั้งที่ข้อมูลข่าวเปลี่ยน
+# (การเพิ่ม/ลบรายงานอัปเดต Rumour ผ่าน trigger ตัวนับ จึงถูกนับรวมด้วย) ใช้สร้าง ETag / Last-Modified
+VERSION_TRIGGERS = {
+    f'trg_version_rumour_{event.lower()}': f'''
+        CREATE TRIGGER IF NOT EXISTS trg_version_rumour_{event.lower()}
+        AFTER {event} ON Rumour
+        BEGIN
+            UPDATE Stats SET value = CASE name
+                WHEN 'data_version' THEN value + 1
+                ELSE CAST(strftime('%s', 'now') AS REAL)
+            END
+            WHERE name IN ('data_version', 'last_modified');
+        END
+    '''
+    for event in ('INSERT', 'UPDATE', 'DELETE')
+}
+
+
+def _create_data_version(cursor):
+    """เพิ่ม data_version / last_modified ในตาราง Stats พร้อม trigger"""
+    cursor.execute("INSERT OR IGNORE INTO Stats (name, value) VALUES ('data_version', 1)")
+    cursor.execute("INSERT OR IGNORE INTO Stats (name, value) VALUES ('last_modified', CAST(strftime('%s', 'now') AS REAL))")
+    for ddl in VERSION_TRIGGERS.values():
+        cursor.execute(ddl)
+
+
+# migration 10: trigger UPDATE เดิมนับทุกคอลัมน์ รวมถึง hotness ที่ add_reports / job เบื้องหลังแก้ทีละหลายข่าว
+# ทำให้ ETag, page cache และ fragment cache หมดอายุทุกแถวที่ถูกคำนวณใหม่ - นับเฉพาะคอลัมน์ที่แสดงผล
+# (hotness.rebuild เพิ่ม data_version เองครั้งเดียวต่อรอบเมื่อลำดับอาจเปลี่ยน)
+VERSIONED_RUMOUR_COLUMNS = (
+    'rumour_id', 'title', 'content', 'source', 'created_date', 'credibility_score', 'status',
+    'is_verified', 'verification_result', 'verified_by', 'report_count', 'credible_count',
+)
+VERSION_UPDATE_TRIGGER = (
+    "DROP TRIGGER IF EXISTS trg_version_rumour_update",
+    f'''
+        CREATE TRIGGER trg_version_rumour_update
+        AFTER UPDATE OF {', '.join(VERSIONED_RUMOUR_COLUMNS)} ON Rumour
+        BEGIN
+            UPDATE Stats SET value = CASE name
+                WHEN 'data_version' THEN value + 1
+                ELSE CAST(strftime('%s', 'now') AS REAL)
+            END
+            WHERE name IN ('data_version', 'last_modified');
+        END
+    ''',
+)
+
+
+# ดัชนีค้นหาข้อความเต็ม (FTS5) ของ title, content, source แบบ external content (ไม่เก็บข้อความซ้ำ)
+# ใช้ tokenizer แบบ trigram เพราะภาษาไทยไม่เว้นวรรคระหว่างคำ จึงค้นหาคำย่อยใดก็ได้ที่ยาว >= 3 ตัวอักษร
+SEARCH_TABLE = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS RumourSearch USING fts5(
+        title, content, source,
+        content='Rumour', content_rowid='rumour_id', tokenize='trigram'
+    )
+'''
+
+# Trigger ที่ทำให้ดัชนีค้นหาตรงกับตาราง Rumour เสมอ (แก้เฉพาะเมื่อข้อความเปลี่ยน ไม่ใช่ทุกครั้งที่ตัวนับเปลี่ยน)
+SEARCH_TRIGGERS = {
+    'trg_search_rumour_insert': '''
+        CREATE TRIGGER IF NOT EXISTS trg_search_rumour_insert
+        AFTER INSERT ON Rumour
+        BEGIN
+            INSERT INTO RumourSearch (rowid, title, content, source)
+            VALUES (NEW.rumour_id, NEW.title, NEW.content, NEW.source);
+        END
+    ''',
+    'trg_search_rumour_delete': '''
+        CREATE TRIGGER IF NOT EXISTS trg_search_rumour_delete
+        AFTER DELETE ON Rumour
+        BEGIN
+            INSERT INTO RumourSearch (RumourSearch, rowid, title, content, source)
+            VALUES ('delete', OLD.rumour_id, OLD.title, OLD.content, OLD.source);
+        END
+    ''',
+    'trg_search_rumour_update': '''
+        CREATE TRIGGER IF NOT EXISTS trg_search_rumour_update
+        AFTER UPDATE OF rumour_id, title, content, source ON Rumour
+        BEGIN
+            INSERT INTO RumourSearch (RumourSearch, rowid, title, content, source)
+            VALUES ('delete', OLD.rumour_id, OLD.title, OLD.content, OLD.source);
+            INSERT INTO RumourSearch (rowid, title, content, source)
+            VALUES (NEW.rumour_id, NEW.title, NEW.content, NEW.source);
+        END
+    ''',
+}
+
+
+def _create_search_index(cursor):
+    """สร้างดัชนีค้นหา RumourSearch พร้อม trigger แล้วสร้างดัชนีจากข่าวที่มีอยู่"""
+    cursor.execute(SEARCH_TABLE)
+    for ddl in SEARCH_TRIGGERS.values():
+        cursor.execute(ddl)
+    _rebuild_search_index(cursor)
+
+
+def _rebuild_search_index(cursor):
+    """สร้างดัชนีค้นหาใหม่ทั้งหมดจากตาราง Rumour"""
+    cursor.execute("INSERT INTO RumourSearch (RumourSearch) VALUES ('rebuild')")
+
+
+# รายการ migration เรียงตามเวอร์ชัน - เพิ่มต่อท้ายเท่านั้น ห้ามแก้ของเดิมที่ใช้งานแล้ว
+# ทุก migration ต้องรันซ้ำบนฐานข้อมูลเดิมได้ (IF NOT EXISTS / ตรวจคอลัมน์ก่อน)
+MIGRATIONS = [
+    (1, 'สร้างตาราง Users, Rumour, Report', _create_base_tables),
+    (2, 'ตัวนับรายงานและ trigger บน Rumour', ensure_counters),
+    (3, 'secondary indexes', _execute_ddl(SECONDARY_INDEXES)),
+    (4, 'ตาราง Stats สำหรับสถิติรวม', _create_stats),
+    (5, 'data_version สำหรับ ETag / Last-Modified', _create_data_version),
+    (6, 'index Report(report_date) สำหรับ velocity detector', _execute_ddl(REPORT_DATE_INDEXES)),
+    (7, 'index Users(username), Users(name) สำหรับค้นหาผู้ใช้', _execute_ddl(USER_SEARCH_INDEXES)),
+    (8, 'ดัชนีค้นหาข้อความเต็ม RumourSearch (FTS5 trigram)', _create_search_index),
+    (9, 'ความร้อนแรงของข่าว Rumour.hotness และ idx_rumour_hotness', _create_hotness),
+    (10, 'data_version ไม่เปลี่ยนเมื่อแก้เฉพาะ Rumour.hotness', _execute_ddl(VERSION_UPDATE_TRIGGER)),
+]
+
+
+def get_schema_version(conn):
+    """อ่านเวอร์ชันโครงสร้างฐานข้อมูลปัจจุบัน"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(db_name=None, verbose=False):
+    """รัน migration ที่ยังไม่ได้รันตามลำดับ (อัปเกรดฐานข้อมูลเดิมได้ในที่)
+
+    แต่ละ migration รันใน transaction ของตัวเองพร้อมบันทึก user_version
+    หลาย process เรียกพร้อมกันได้ เพราะอ่านเวอร์ชันซ้ำหลังได้ล็อกการเขียนแล้ว
+    """
+    conn = sqlite3.connect(db_name or Config.DATABASE_NAME, isolation_level=None)
+    try:
+        cursor = conn.cursor()
+        for version, description, apply in MIGRATIONS:
+            if get_schema_version(conn) >= version:
+                continue
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                if get_schema_version(conn) < version:
+                    apply(cursor)
+                    cursor.execute(f'PRAGMA user_version = {version}')
+                    if verbose:
+                        print(f"✓ migration {version}: {description}")
+                cursor.execute('COMMIT')
+            except BaseException:
+                cursor.execute('ROLLBACK')
+                raise
+        return get_schema_version(conn)
+    finally:
+        conn.close()
+
+
+def init_database(db_name=None):
+    """สร้างตารางในฐานข้อมูล"""
+    migrate(db_name)
     print("✓ สร้างตารางฐานข้อมูลสำเร็จ")
 
 
-def insert_sample_data():
+# statement จริงของ Model (QUERY_PLANS ของแต่ละโมดูลสร้างจากค่าคงที่ของ SQL ที่ Model ใช้)
+# และ index ที่ต้องถูกใช้ - ป้องกันการถอยกลับไปเป็น full table scan เมื่อแก้ query หรือ index
+QUERY_PLAN_EXPECTATIONS = [*_rumour_plans, *_report_plans, *_user_plans]
+
+
+def check_query_plans(db_name=None):
+    """ตรวจ EXPLAIN QUERY PLAN ของ query หลัก คืนค่ารายการปัญหาที่พบ (ว่าง = ผ่าน)"""
+    migrate(db_name)
+    conn = sqlite3.connect(db_name or Config.DATABASE_NAME)
+    problems = []
+    try:
+        for query, params, index in QUERY_PLAN_EXPECTATIONS:
+            plan = ' | '.join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params))
+            if index not in plan or 'USE TEMP B-TREE' in plan:
+                problems.append(f"{query}\n    ต้องใช้ {index} แต่ได้: {plan}")
+    finally:
+        conn.close()
+    return problems
+
+
+def rebuild_counters(db_name=None):
+    """ซ่อมตัวนับรายงานของทุกข่าว ความร้อนแรง และสถิติรวมให้ตรงกับข้อมูลจริง (คำสั่งใช้ครั้งเดียว)"""
+    migrate(db_name)
+    conn = sqlite3.connect(db_name or Config.DATABASE_NAME)
+    try:
+        cursor = conn.cursor()
+        _rebuild_counters(cursor)
+        _rebuild_hotness(cursor)
+        _rebuild_stats(cursor)
+        conn.commit()
+    finally:
+        conn.close()
+    print("✓ คำนวณตัวนับรายงานใหม่สำเร็จ")
+
+
+def rebuild_search_index(db_name=None):
+    """สร้างดัชนีค้นหาข่าวใหม่จากตาราง Rumour (ใช้หลังโหลดข้อมูลโดยถอด trigger ออก)"""
+    migrate(db_name)
+    conn = sqlite3.connect(db_name or Config.DATABASE_NAME)
+    try:
+        _rebuild_search_index(conn.cursor())
+        conn.commit()
+    finally:
+        conn.close()
+    print("✓ สร้างดัชนีค้นหาใหม่สำเร็จ")
+
+
+def insert_sample_data(db_name=None):
     """เพิ่มข้อมูลตัวอย่าง"""
-    conn = sqlite3.connect('rumor_tracking.db')
+    conn = sqlite3.connect(db_name or Config.DATABASE_NAME)
     cursor = conn.cursor()
     
     # ตรวจสอบว่ามีข้อมูลอยู่แล้วหรือไม่
@@ -171,6 +604,8 @@ def insert_sample_data():
         INSERT INTO Report (user_id, rumour_id, report_date, report_type)
         VALUES (?, ?, ?, ?)
     ''', reports)
+    # migration 9 คำนวณ hotness ก่อนมีรายงานตัวอย่าง - คำนวณใหม่ให้หน้ารวมข่าวเรียงได้ทันที
+    _rebuild_hotness(cursor)
     
     conn.commit()
     conn.close()
@@ -181,7 +616,40 @@ def insert_sample_data():
     print("  - มีข่าวที่ถูกตรวจสอบแล้ว: 1 ข่าว")
 
 
+def _check_query_plans_command():
+    problems = check_query_plans()
+    for problem in problems:
+        print(f"✗ {problem}")
+    if problems:
+        sys.exit(1)
+    print(f"✓ query ทั้ง {len(QUERY_PLAN_EXPECTATIONS)} รายการใช้ index ตามที่กำหนด")
+
+
+def _checkpoint_command():
+    result = Database().checkpoint('TRUNCATE')
+    if result['busy']:
+        print(f"✗ checkpoint ไม่ครบเพราะมีการใช้งานอยู่ ({result['checkpointed_frames']}/{result['log_frames']} frames)")
+        sys.exit(1)
+    print(f"✓ checkpoint WAL สำเร็จ ({result['checkpointed_frames']} frames)")
+
+
+COMMANDS = {
+    'migrate': lambda: print(f"✓ schema version {migrate(verbose=True)}"),
+    'rebuild_counters': rebuild_counters,
+    'rebuild_search': rebuild_search_index,
+    'check_plans': _check_query_plans_command,
+    'checkpoint': _checkpoint_command,
+}
+
+
 if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        command = COMMANDS.get(sys.argv[1])
+        if command is None:
+            sys.exit(f"คำสั่งที่ใช้ได้: {', '.join(COMMANDS)}")
+        command()
+        sys.exit(0)
+    
     print("กำลังสร้างฐานข้อมูล...")
     init_database()
     insert_sample_data()
@@ -0,0 +1,62 @@
+"""
+Fragments - cache ผลการ render template (ส่วนของ View)
+- fragment: การ์ดข่าวลือแต่ละข่าว (templates/partials/)
+- ทั้งหน้า: GET / และ /summary ของผู้ที่ไม่มีข้อความ flash ค้างอยู่ โดยใช้ data_version เป็นส่วนหนึ่งของ key
+
+cache ทั้งสองผูกกับ query_cache จึงถูกล้างตาม tag เดียวกันเมื่อข้อมูลข่าว/ผู้ใช้เปลี่ยน
+การ์ดข่าวใช้ค่าทุกคอลัมน์ของข่าวเป็น key และหน้าใช้ data_version จึงไม่ได้ข้อมูลเก่าแม้รันหลาย process
+"""
+import functools
+from flask import g, render_template, request, session
+from markupsafe import Markup
+from config.settings import Config
+from models import query_cache, repository
+from models.cache import QueryCache, rumour_tag, RUMOURS_TAG
+
+fragment_cache = QueryCache(max_entries=Config.FRAGMENT_CACHE_MAX_ENTRIES)
+page_cache = QueryCache(max_entries=Config.PAGE_CACHE_MAX_ENTRIES, enabled=Config.PAGE_CACHE_ENABLED)
+query_cache.link(fragment_cache)
+query_cache.link(page_cache)
+
+
+def render_fragment(template, key, tags, load_context):
+    """render template บางส่วนแล้ว cache ไว้ (load_context เรียกเฉพาะเมื่อ cache miss)"""
+    return fragment_cache.get_or_load(
+        (template, key),
+        lambda: Markup(render_template(template, **load_context())),
+        tags,
+    )
+
+
+def rumour_card(rumour, template='partials/rumour_card.html'):
+    """การ์ดของข่าวลือหนึ่งข่าว (key คือค่าทุกคอลัมน์ ข่าวเปลี่ยนเมื่อไรการ์ดก็ถูก render ใหม่)"""
+    key = tuple(rumour[column] for column in rumour.keys())
+    return render_fragment(template, key, [rumour_tag(rumour['rumour_id'])],
+                           lambda: {'rumour': rumour})
+
+
+def request_data_version():
+    """data_version / last_modified ของ request นี้ (อ่านจากฐานข้อมูลครั้งเดียวต่อ request แล้วเก็บใน flask.g)
+
+    hook ของ server.py, cached_page และ ETag ของ route จึงใช้ค่าเดียวกันโดยไม่ query Stats ซ้ำ
+    """
+    if 'data_version' not in g:
+        g.data_version = repository.rumours.get_data_version()
+    return g.data_version
+
+
+def cached_page(view):
+    """cache HTML ทั้งหน้าของ GET ที่ไม่มีข้อความ flash (key: endpoint + query string + data_version)"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not page_cache.enabled or request.method != 'GET' or session.get('_flashes'):
+            return view(*args, **kwargs)
+        version = request_data_version()['version']
+        key = (request.endpoint, request.query_string, version)
+        return page_cache.get_or_load(key, lambda: view(*args, **kwargs), [RUMOURS_TAG])
+    return wrapper
+
+
+def register(app):
+    """ให้ template ของ app เรียกใช้ fragment ได้"""
+    app.add_template_global(rumour_card)
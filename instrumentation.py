@@ -0,0 +1,221 @@
+"""
+Instrumentation - วัดเวลาของแต่ละ request และ SQL ที่ request นั้นใช้
+- header Server-Timing: เวลารวม (app) เวลา SQL รวม (sql) และคำสั่งที่ช้าที่สุด (sql-slowest)
+  ดูได้ในแท็บ Network/Timing ของเบราว์เซอร์
+- GET /metrics: ตัวนับสะสมของ process ในรูปแบบข้อความของ Prometheus
+- Config.PROFILE_SAMPLE_RATE = N: profile 1 ใน N request ด้วย cProfile แล้วบันทึก .prof ใน Config.PROFILE_DIR
+  (เปิดดูด้วย python -m pstats หรือ snakeviz)
+
+ตัวนับอยู่ใน process เดียว - ถ้ารันหลาย process แต่ละ process มี /metrics ของตัวเอง
+ถ้าปิด Config.METRICS_ENABLED จะไม่ลงทะเบียน hook ใดเลย (profile ยังใช้ได้ถ้าตั้ง PROFILE_SAMPLE_RATE)
+"""
+import cProfile
+import itertools
+import os
+import threading
+import time
+from bisect import bisect_left
+from flask import Response, g, request
+from config.settings import Config
+from models import query_cache
+from models.metrics import sql_metrics
+from fragments import fragment_cache, page_cache
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+SERVER_TIMING_DESC_LENGTH = 120
+
+
+class RequestMetrics:
+    """ตัวนับของ request ตาม endpoint (ใช้ร่วมกันหลาย thread)"""
+
+    def __init__(self, buckets=None):
+        self.buckets = tuple(sorted(buckets or Config.METRICS_BUCKETS))
+        self._requests = {}  # (method, endpoint, status) -> จำนวนครั้ง
+        self._endpoints = {}  # endpoint -> [จำนวนต่อ bucket..., +Inf, เวลารวม, จำนวนคำสั่ง SQL, เวลา SQL รวม]
+        self._lock = threading.Lock()
+
+    def record(self, method, endpoint, status, seconds, sql):
+        bucket = bisect_left(self.buckets, seconds)
+        size = len(self.buckets) + 1
+        with self._lock:
+            key = (method, endpoint, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            entry = self._endpoints.get(endpoint)
+            if entry is None:
+                entry = self._endpoints[endpoint] = [0] * size + [0.0, 0, 0.0]
+            entry[bucket] += 1
+            entry[size] += seconds
+            if sql is not None:
+                entry[size + 1] += sql.statements
+                entry[size + 2] += sql.seconds
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._requests), {endpoint: list(entry) for endpoint, entry in self._endpoints.items()}
+
+    def reset(self):
+        with self._lock:
+            self._requests.clear()
+            self._endpoints.clear()
+
+
+request_metrics = RequestMetrics()
+_profile_counter = itertools.count(1)
+_profiles_written = [0]
+
+
+def _endpoint():
+    # ใช้ชื่อ endpoint ไม่ใช่ path จึงมี label จำกัด (request ที่ไม่ตรง route ใด = 'unmatched')
+    return request.endpoint or 'unmatched'
+
+
+def _timing_desc(text):
+    """ค่า desc ของ Server-Timing: quoted-string ที่เป็น ASCII และไม่ยาวเกิน"""
+    text = text.encode('ascii', 'replace').decode('ascii')
+    if len(text) > SERVER_TIMING_DESC_LENGTH:
+        text = text[:SERVER_TIMING_DESC_LENGTH - 3] + '...'
+    return '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def server_timing(seconds, sql):
+    """ค่า header Server-Timing (หน่วย dur เป็นมิลลิวินาที)"""
+    parts = [f'app;dur={seconds * 1000:.2f}']
+    if sql is not None:
+        parts.append(f'sql;dur={sql.seconds * 1000:.2f};desc="{sql.statements} queries"')
+        if sql.slowest_sql is not None:
+            summary = sql.summary()
+            parts.append(f'sql-slowest;dur={summary["slowest"] * 1000:.2f};desc={_timing_desc(summary["slowest_sql"])}')
+    return ', '.join(parts)
+
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+    if Config.METRICS_ENABLED:
+        sql_metrics.begin_request()
+    rate = Config.PROFILE_SAMPLE_RATE
+    if rate and next(_profile_counter) % rate == 0:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return  # มี profiler อื่นทำงานอยู่ (เช่น ตัว debugger) ข้ามรอบนี้
+        g.metrics_profiler = profiler
+
+
+def _finish_request(response):
+    started = g.pop('metrics_started', None)
+    if started is None or not Config.METRICS_ENABLED:
+        return response
+    seconds = time.perf_counter() - started
+    sql = sql_metrics.end_request()
+    request_metrics.record(request.method, _endpoint(), response.status_code, seconds, sql)
+    response.headers['Server-Timing'] = server_timing(seconds, sql)
+    return response
+
+
+def _teardown_request(error=None):
+    # กรณี after_request ไม่ได้ทำงาน (เช่น error ระหว่างส่ง response) อย่าให้สถิติค้างไปถึง request ถัดไป
+    if Config.METRICS_ENABLED:
+        sql_metrics.end_request()
+    profiler = g.pop('metrics_profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        write_profile(profiler, _endpoint())
+
+
+def write_profile(profiler, endpoint):
+    """บันทึกผล cProfile เป็น PROFILE_DIR/<endpoint>-<เวลา>-<pid>.prof คืนค่า path"""
+    os.makedirs(Config.PROFILE_DIR, exist_ok=True)
+    name = f'{endpoint.replace(".", "_")}-{time.time_ns()}-{os.getpid()}.prof'
+    path = os.path.join(Config.PROFILE_DIR, name)
+    profiler.dump_stats(path)
+    _profiles_written[0] += 1
+    return path
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_label(value)}"' for name, value in labels.items()) + '}'
+
+
+def _metric(lines, name, kind, help_text, samples):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} {kind}')
+    for suffix, labels, value in samples:
+        lines.append(f'{name}{suffix}{labels} {value}')
+
+
+def render_metrics():
+    """ข้อความ /metrics ในรูปแบบ Prometheus text format 0.0.4"""
+    requests, endpoints = request_metrics.snapshot()
+    buckets = request_metrics.buckets
+    size = len(buckets) + 1
+    lines = []
+
+    _metric(lines, 'rumour_http_requests_total', 'counter', 'จำนวน request ตาม method/endpoint/status', [
+        ('', _labels(method=method, endpoint=endpoint, status=status), count)
+        for (method, endpoint, status), count in sorted(requests.items())
+    ])
+
+    histogram = []
+    for endpoint, entry in sorted(endpoints.items()):
+        cumulative = 0
+        for bound, count in zip(buckets + ('+Inf',), entry[:size]):
+            cumulative += count
+            histogram.append(('_bucket', _labels(endpoint=endpoint, le=bound), cumulative))
+        histogram.append(('_sum', _labels(endpoint=endpoint), round(entry[size], 6)))
+        histogram.append(('_count', _labels(endpoint=endpoint), cumulative))
+    _metric(lines, 'rumour_http_request_duration_seconds', 'histogram', 'เวลาตอบ request (วินาที)', histogram)
+
+    _metric(lines, 'rumour_http_request_sql_statements_total', 'counter', 'จำนวนคำสั่ง SQL ที่ request ใช้', [
+        ('', _labels(endpoint=endpoint), entry[size + 1]) for endpoint, entry in sorted(endpoints.items())
+    ])
+    _metric(lines, 'rumour_http_request_sql_seconds_total', 'counter', 'เวลา SQL รวมของ request (วินาที)', [
+        ('', _labels(endpoint=endpoint), round(entry[size + 2], 6)) for endpoint, entry in sorted(endpoints.items())
+    ])
+
+    queries = sql_metrics.snapshot()
+    _metric(lines, 'rumour_sql_statements_total', 'counter', 'จำนวนครั้งที่รันคำสั่ง SQL (ทั้ง request และงานเบื้องหลัง)', [
+        ('', _labels(query=sql), count) for sql, count, _, _ in queries
+    ])
+    _metric(lines, 'rumour_sql_seconds_total', 'counter', 'เวลารวมของคำสั่ง SQL (วินาที)', [
+        ('', _labels(query=sql), round(seconds, 6)) for sql, _, seconds, _ in queries
+    ])
+    _metric(lines, 'rumour_sql_seconds_max', 'gauge', 'เวลาสูงสุดของคำสั่ง SQL หนึ่งครั้ง (วินาที)', [
+        ('', _labels(query=sql), round(slowest, 6)) for sql, _, _, slowest in queries
+    ])
+
+    caches = {'query': query_cache.stats(), 'fragment': fragment_cache.stats(), 'page': page_cache.stats()}
+    for name, kind, field, help_text in (
+        ('rumour_cache_hits_total', 'counter', 'hits', 'จำนวนครั้งที่พบใน cache'),
+        ('rumour_cache_misses_total', 'counter', 'misses', 'จำนวนครั้งที่ไม่พบใน cache'),
+        ('rumour_cache_evictions_total', 'counter', 'evictions', 'จำนวนรายการที่ถูกไล่ออกเพราะ cache เต็ม'),
+        ('rumour_cache_entries', 'gauge', 'size', 'จำนวนรายการใน cache'),
+    ):
+        _metric(lines, name, kind, help_text, [
+            ('', _labels(cache=cache), stats[field]) for cache, stats in caches.items()
+        ])
+
+    _metric(lines, 'rumour_profiles_written_total', 'counter', 'จำนวนไฟล์ .prof ที่บันทึก', [
+        ('', '', _profiles_written[0]),
+    ])
+    return '\n'.join(lines) + '\n'
+
+
+def metrics():
+    """GET /metrics สำหรับ Prometheus"""
+    return Response(render_metrics(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def register(app):
+    """ลงทะเบียน hook วัดเวลาและ route /metrics ให้ app"""
+    if not Config.METRICS_ENABLED and not Config.PROFILE_SAMPLE_RATE:
+        return
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_teardown_request)
+    if Config.METRICS_ENABLED:
+        app.add_url_rule('/metrics', 'metrics', metrics)
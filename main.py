@@ -1,70 +1,121 @@
 """
 Main Application - จุดเริ่มต้นของระบบ Rumor Tracking MVC
 โครงสร้าง: MVC Pattern ที่ชัดเจน แยกโฟลเดอร์
-- models/: ชั้น Model - จัดการข้อมูลและ business logic
+- models/: ชั้น Model - จัดการข้อมูลและ business logic (เข้าถึงผ่าน repository เดียว)
 - templates/: ชั้น View - จัดการการแสดงผล
-- app.py: ชั้น Controller - จัดการ routing และ request/response
+- main.py (ไฟล์นี้): ชั้น Controller - จัดการ routing และ request/response
+  app.py เป็นเพียงชื่อเดิมของ entry point ที่ใช้ app ตัวนี้
 - config/: การตั้งค่าระบบ
 """
-from flask import Flask, render_template, request, redirect, url_for, flash
-from models import RumourModel, ReportModel, UserModel
+import hashlib
+import json
+import queue
+import time
+from datetime import datetime, timezone
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, abort, jsonify
+from models import panic_worker, report_batcher, repository, start_checkpointer, start_hotness_job
+from models.rumour import SEARCH_MIN_TERM
 from config.settings import Config
+from database import migrate
+from fragments import cached_page, request_data_version, register as register_fragments
+from instrumentation import register as register_instrumentation
 
 app = Flask(__name__)
 app.secret_key = Config.SECRET_KEY
+register_fragments(app)
+# Server-Timing, /metrics และ cProfile แบบสุ่ม request (Config.METRICS_ENABLED / PROFILE_SAMPLE_RATE)
+register_instrumentation(app)
+
+# ปรับโครงสร้างฐานข้อมูลเดิมให้เป็นปัจจุบันก่อนเริ่มรับ request
+migrate()
+# checkpoint WAL เป็นระยะ (Config.DB_CHECKPOINT_INTERVAL)
+start_checkpointer()
+# คำนวณความร้อนแรงของข่าวใหม่จากรายงานล่าสุดเป็นระยะ (Config.HOTNESS_REBUILD_INTERVAL)
+start_hotness_job()
+# โหลดรายงานล่าสุดเข้า velocity detector แล้วตรวจสถานะ panic ใน worker เบื้องหลัง (Config.PANIC_ASYNC)
+panic_worker.seed()
+if Config.PANIC_ASYNC:
+    panic_worker.start()
+# รวมรายงานจากหลาย request เขียนใน transaction เดียว (Config.REPORT_BATCHING)
+if Config.REPORT_BATCHING:
+    report_batcher.start()
 
 # กำหนดค่า threshold สำหรับเปลี่ยนสถานะเป็น panic
 PANIC_THRESHOLD = Config.PANIC_THRESHOLD
 
 
+def _page_args():
+    """อ่านพารามิเตอร์แบ่งหน้า ?after= / ?before= / ?limit= จาก query string"""
+    return {
+        'after': request.args.get('after') or None,
+        'before': request.args.get('before') or None,
+        'limit': request.args.get('limit', type=int),
+    }
+
+
 @app.route('/')
+@cached_page
 def index():
-    """หน้ารวมข่าวลือ - แสดงข่าวลือทั้งหมด เรียงตามจำนวนรายงาน"""
-    rumours = RumourModel.get_all_rumours()
-    return render_template('index.html', rumours=rumours)
+    """หน้ารวมข่าวลือ - แสดงข่าวลือทีละหน้า เรียงตามความร้อนแรง (รายงานล่าสุดมีน้ำหนักมากกว่า)"""
+    try:
+        page = repository.rumours.get_rumours_page(**_page_args())
+    except ValueError:
+        abort(400)
+    return render_template('index.html', rumours=page['items'], page=page)
 
 
 @app.route('/detail/<int:rumour_id>')
 def detail(rumour_id):
     """หน้ารายละเอียดข่าวลือ - แสดงรายละเอียดข่าวและจำนวนรายงาน"""
-    rumour = RumourModel.get_rumour_by_id(rumour_id)
+    rumour = repository.rumours.get_rumour_by_id(rumour_id)
     if not rumour:
         flash('ไม่พบข่าวลือที่ค้นหา', 'error')
         return redirect(url_for('index'))
     
-    reports = ReportModel.get_reports_by_rumour(rumour_id)
-    report_count = len(reports)
-    users = UserModel.get_all_users()
-    verifiers = UserModel.get_verifiers()
+    try:
+        page = repository.reports.get_reports_page(rumour_id, **_page_args())
+    except ValueError:
+        abort(400)
     
+    # ผู้ใช้/ผู้ตรวจสอบในฟอร์มค้นหาผ่าน /api/users จึงไม่ต้องโหลดผู้ใช้ทั้งหมดมาที่หน้านี้
     return render_template('detail.html', 
                          rumour=rumour, 
-                         reports=reports, 
-                         report_count=report_count,
-                         users=users,
-                         verifiers=verifiers)
+                         reports=page['items'], 
+                         report_count=rumour['report_count'],
+                         page=page)
+
+
+@app.route('/search')
+@cached_page
+def search():
+    """หน้าค้นหาข่าวลือ - ค้นจากหัวข้อ เนื้อหา และแหล่งที่มา เรียงตามความเกี่ยวข้อง"""
+    text = request.args.get('q', '').strip()
+    page = None
+    if text:
+        try:
+            page = repository.rumours.search(text, **_page_args())
+        except ValueError:
+            abort(400)
+    return render_template('search.html', q=text, rumours=page['items'] if page else [], page=page,
+                           min_term=SEARCH_MIN_TERM, max_candidates=Config.SEARCH_MAX_CANDIDATES)
 
 
 @app.route('/summary')
+@cached_page
 def summary():
     """หน้าสรุปผล - แสดงข่าวลือที่เข้าสู่สถานะ panic และข่าวที่ถูกตรวจสอบแล้ว"""
-    panic_rumours = RumourModel.get_panic_rumours()
-    all_rumours = RumourModel.get_all_rumours()
-    total_rumours = len(all_rumours)
-    
-    # นับจำนวนข่าวที่ตรวจสอบแล้ว (ทั้งระบบ)
-    verified_count = sum(1 for rumour in all_rumours if rumour['is_verified'])
-    # นับจำนวนข่าว PANIC (ไม่สนใจว่าตรวจสอบแล้วหรือยัง)
-    panic_count = len(panic_rumours)
-    # คำนวณข่าวรอการตรวจสอบ = ทั้งหมด - ตรวจสอบแล้ว
-    pending_count = total_rumours - verified_count
+    panic_rumours = repository.rumours.get_panic_rumours()
+    # สถิติรวมทั้งระบบ (ข่าว PANIC อาจอยู่ในตรวจสอบแล้วหรือรอตรวจสอบได้)
+    stats = repository.rumours.get_dashboard_stats()
     
     return render_template('summary.html', 
                          panic_rumours=panic_rumours, 
-                         total_rumours=total_rumours,
-                         verified_count=verified_count,
-                         panic_count=panic_count,
-                         pending_count=pending_count)
+                         total_rumours=stats['total_rumours'],
+                         verified_count=stats['verified_count'],
+                         panic_count=stats['panic_count'],
+                         pending_count=stats['pending_count'],
+                         stats=stats,
+                         events_url=url_for('panic_events'))
 
 
 @app.route('/report/<int:rumour_id>', methods=['POST'])
@@ -78,32 +129,35 @@ def report_rumour(rumour_id):
         flash('กรุณาเลือกผู้ใช้และประเภทรายงาน', 'error')
         return redirect(url_for('detail', rumour_id=rumour_id))
     
-    # ตรวจสอบว่าข่าวลือถูกตรวจสอบแล้วหรือไม่ (Rule 4.3)
-    rumour = RumourModel.get_rumour_by_id(rumour_id)
-    if rumour['is_verified']:
-        flash('ข่าวลือนี้ถูกตรวจสอบแล้ว ไม่สามารถรายงานเพิ่มได้', 'warning')
-        return redirect(url_for('detail', rumour_id=rumour_id))
+    # บันทึกรายงาน + คะแนนใน transaction เดียว (Rule 4.1, 4.3) - ผ่าน report_batcher ถ้าทำงานอยู่
+    # สถานะ panic (Rule 4.2) ตรวจใน panic_worker ถ้าทำงานอยู่ ไม่เช่นนั้นตรวจใน transaction เดียวกัน
+    check_inline = not panic_worker.running
+    result = report_batcher.submit_report(user_id, rumour_id, report_type, check_panic=check_inline)
+    status = result['status']
+    
+    if status == 'rumour_not_found':
+        flash('ไม่พบข่าวลือที่ค้นหา', 'error')
+        return redirect(url_for('index'))
     
-    # ตรวจสอบว่าผู้ใช้เคยรายงานข่าวนี้แล้วหรือไม่ (Rule 4.1)
-    if ReportModel.check_duplicate_report(user_id, rumour_id):
-        user = UserModel.get_user_by_id(user_id)
-        flash(f'⚠️ ผู้ใช้ "{user["name"]}" เคยรายงานข่าวนี้ไปแล้ว กรุณาเลือกผู้ใช้ท่านอื่นที่ยังไม่เคยรายงาน', 'warning')
+    if status in ('user_not_found', 'invalid_type'):
+        flash('กรุณาเลือกผู้ใช้และประเภทรายงาน', 'error')
         return redirect(url_for('detail', rumour_id=rumour_id))
     
-    # สร้างรายงาน
-    ReportModel.create_report(user_id, rumour_id, report_type)
+    if status == 'verified':
+        flash('ข่าวลือนี้ถูกตรวจสอบแล้ว ไม่สามารถรายงานเพิ่มได้', 'warning')
+        return redirect(url_for('detail', rumour_id=rumour_id))
     
-    # อัปเดตคะแนนความน่าเชื่อถือ
-    RumourModel.update_credibility_score(rumour_id)
+    if status == 'duplicate':
+        flash(f'⚠️ ผู้ใช้ "{result["user_name"]}" เคยรายงานข่าวนี้ไปแล้ว กรุณาเลือกผู้ใช้ท่านอื่นที่ยังไม่เคยรายงาน', 'warning')
+        return redirect(url_for('detail', rumour_id=rumour_id))
     
-    user = UserModel.get_user_by_id(user_id)
-    flash(f'✅ รายงานข่าวลือสำเร็จ! ผู้รายงาน: {user["name"]} | ประเภท: {report_type}', 'success')
+    # นับความเร็วการรายงาน (และตรวจจำนวนรายงานรวมถ้ายังไม่ได้ตรวจ)
+    panic_worker.submit(rumour_id)
+    flash(f'✅ รายงานข่าวลือสำเร็จ! ผู้รายงาน: {result["user_name"]} | ประเภท: {report_type}', 'success')
     
-    # ตรวจสอบจำนวนรายงาน และเปลี่ยนสถานะเป็น panic ถ้าเกิน threshold (Rule 4.2)
-    report_count = RumourModel.get_rumour_report_count(rumour_id)
-    if report_count >= PANIC_THRESHOLD and rumour['status'] == 'ปกติ':
-        RumourModel.update_status_to_panic(rumour_id)
-        flash(f'ข่าวลือนี้มีรายงาน {report_count} รายงาน เปลี่ยนสถานะเป็น PANIC!', 'danger')
+    if result['became_panic']:
+        panic_worker.notify([rumour_id])
+        flash(f'ข่าวลือนี้มีรายงาน {result["report_count"]} รายงาน เปลี่ยนสถานะเป็น PANIC!', 'danger')
     
     return redirect(url_for('detail', rumour_id=rumour_id))
 
@@ -120,25 +174,218 @@ def verify_rumour(rumour_id):
         return redirect(url_for('detail', rumour_id=rumour_id))
     
     # ตรวจสอบว่าผู้ใช้เป็นผู้ตรวจสอบหรือไม่
-    verifier = UserModel.get_user_by_id(verifier_id)
+    verifier = repository.users.get_user_by_id(verifier_id)
     if not verifier or not verifier['verifier_code']:
         flash('ผู้ใช้นี้ไม่มีสิทธิ์เป็นผู้ตรวจสอบ', 'error')
         return redirect(url_for('detail', rumour_id=rumour_id))
     
     # ตรวจสอบว่าข่าวลือถูกตรวจสอบแล้วหรือไม่ (Rule 4.4)
-    rumour = RumourModel.get_rumour_by_id(rumour_id)
+    rumour = repository.rumours.get_rumour_by_id(rumour_id)
+    if rumour is None:
+        abort(404)
     if rumour['is_verified']:
         flash('ข่าวลือนี้ถูกตรวจสอบแล้ว', 'warning')
         return redirect(url_for('detail', rumour_id=rumour_id))
     
     # บันทึกผลการตรวจสอบ
-    RumourModel.verify_rumour(rumour_id, verification_result, verifier_id)
+    repository.rumours.verify_rumour(rumour_id, verification_result, verifier_id)
     flash(f'ตรวจสอบข่าวลือสำเร็จ: {verification_result}', 'success')
     
     return redirect(url_for('detail', rumour_id=rumour_id))
 
 
-if __name__ == '__main__':
+def _conditional(etag, last_modified, build):
+    """ตอบ 304 Not Modified ถ้า client มีข้อมูลล่าสุดแล้ว ไม่เช่นนั้นเรียก build() สร้าง response
+    
+    ETag (data_version) มาก่อน If-Modified-Since ตาม RFC 9110 ส่วน Last-Modified ละเอียดแค่วินาที
+    จึงส่งเฉพาะเมื่อการแก้ไขล่าสุดเกิดก่อนวินาทีปัจจุบัน (validator แบบ strong ตาม RFC 9110 8.8.2.2)
+    ค่าที่ client ได้จึงตรงกับ data_version เดียว การเขียนอีกครั้งในวินาทีเดียวกันไม่ทำให้ได้ 304 ของข้อมูลเก่า
+    """
+    if last_modified and int(last_modified) >= int(time.time()):
+        last_modified = None  # อาจมีการเขียนอีกในวินาทีนี้ที่ได้เวลาเดียวกัน
+    last_modified = (datetime.fromtimestamp(int(last_modified), timezone.utc)
+                     if last_modified else None)
+    if request.if_none_match:
+        fresh = request.if_none_match.contains(etag)
+    else:
+        since = request.if_modified_since
+        fresh = bool(since and last_modified and last_modified <= since)
+    
+    response = app.response_class(status=304) if fresh else build()
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    return response
+
+
+def _etag(*parts):
+    """สร้าง ETag จากค่าที่ระบุเวอร์ชันของข้อมูลและ query string ของ request"""
+    raw = repr(parts + (request.query_string,)).encode('utf-8')
+    return hashlib.sha1(raw).hexdigest()[:20]
+
+
+def _page_json(page):
+    return {
+        'items': [dict(row) for row in page['items']],
+        'next_cursor': page['next_cursor'],
+        'prev_cursor': page['prev_cursor'],
+        'limit': page['limit'],
+    }
+
+
+@app.route('/api/rumours')
+def api_rumours():
+    """JSON: ข่าวลือทีละหน้า (รองรับ ?after= / ?before= / ?limit= และ conditional GET)"""
+    data_version = request_data_version()
+    
+    def build():
+        try:
+            page = repository.rumours.get_rumours_page(**_page_args())
+        except ValueError:
+            abort(400)
+        return jsonify(_page_json(page))
+    
+    return _conditional(_etag('rumours', data_version['version']), data_version['last_modified'], build)
+
+
+def _rumour_item(item):
+    """แปลง item ของ POST /api/rumours ({'title', 'content', 'source'} หรือ [title, content, source]) เป็น tuple"""
+    if isinstance(item, dict):
+        return item.get('title'), item.get('content'), item.get('source')
+    if isinstance(item, list) and len(item) == 3:
+        return tuple(item)
+    return None, None, None
+
+
+@app.route('/api/rumours', methods=['POST'])
+def api_create_rumours():
+    """JSON: สร้างข่าวลือ - ส่งข่าวเดียว {"title", "content", "source"} ได้ 201 พร้อมข้อมูลข่าว
+    ส่งเป็นรายการหรือ {"rumours": [...]} เพื่อสร้างหลายข่าว (ผลแยกรายการ created / rejected)
+    """
+    payload = request.get_json(silent=True)
+    if isinstance(payload, dict) and 'rumours' not in payload:
+        title, content, source = _rumour_item(payload)
+        try:
+            rumour_id = repository.rumours.create_rumour(title, source, content)
+        except ValueError as exc:
+            return jsonify(error='ข้อมูลข่าวลือไม่ถูกต้อง', reason=str(exc)), 400
+        response = jsonify(rumour=dict(repository.rumours.get_rumour_by_id(rumour_id)))
+        response.status_code = 201
+        response.headers['Location'] = url_for('api_rumour_detail', rumour_id=rumour_id)
+        return response
+    
+    items = payload.get('rumours') if isinstance(payload, dict) else payload
+    if not isinstance(items, list):
+        return jsonify(error='ต้องส่ง JSON เป็นข่าวเดียว รายการข่าว หรือ {"rumours": [...]}'), 400
+    if len(items) > Config.BULK_MAX_ITEMS:
+        return jsonify(error=f'ส่งได้ไม่เกิน {Config.BULK_MAX_ITEMS} ข่าวต่อครั้ง'), 413
+    return jsonify(repository.rumours.create_rumours([_rumour_item(item) for item in items]))
+
+
+@app.route('/api/rumours/<int:rumour_id>')
+def api_rumour_detail(rumour_id):
+    """JSON: รายละเอียดข่าวลือพร้อมรายงานทีละหน้า (ETag ตามข้อมูลของข่าวนี้)"""
+    rumour = repository.rumours.get_rumour_by_id(rumour_id)
+    if not rumour:
+        return jsonify(error='ไม่พบข่าวลือที่ค้นหา'), 404
+    
+    def build():
+        try:
+            page = repository.reports.get_reports_page(rumour_id, **_page_args())
+        except ValueError:
+            abort(400)
+        return jsonify(rumour=dict(rumour), reports=_page_json(page))
+    
+    return _conditional(_etag('rumour', tuple(rumour)), None, build)
+
+
+@app.route('/api/summary')
+def api_summary():
+    """JSON: สถิติรวมและข่าวลือที่เข้าสู่สถานะ panic"""
+    data_version = request_data_version()
+    
+    def build():
+        stats = repository.rumours.get_dashboard_stats()
+        panic_rumours = [dict(row) for row in repository.rumours.get_panic_rumours()]
+        return jsonify(stats=stats, panic_rumours=panic_rumours)
+    
+    return _conditional(_etag('summary', data_version['version']), data_version['last_modified'], build)
+
+
+@app.route('/api/users')
+def api_users():
+    """JSON: ค้นหาผู้ใช้จากคำขึ้นต้นของ username หรือชื่อ (?q= &role=reporter|verifier &limit=)"""
+    role = request.args.get('role') or None
+    if role is not None and role not in repository.users.ROLES:
+        return jsonify(error=f'role ต้องเป็นหนึ่งใน {", ".join(repository.users.ROLES)}'), 400
+    users = repository.users.search_users(request.args.get('q', ''), role, request.args.get('limit', type=int))
+    return jsonify(users=[dict(row) for row in users])
+
+
+def _bulk_item(item):
+    """แปลง item ของ bulk API ({'user_id', 'rumour_id', 'report_type'} หรือ [user_id, rumour_id, report_type]) เป็น tuple"""
+    if isinstance(item, dict):
+        return item.get('user_id'), item.get('rumour_id'), item.get('report_type')
+    if isinstance(item, list) and len(item) == 3:
+        return tuple(item)
+    return None, None, None
+
+
+@app.route('/api/reports/bulk', methods=['POST'])
+def bulk_report():
+    """รับรายงานจำนวนมากในครั้งเดียว (JSON) - ผลลัพธ์แยกรายการ accepted / duplicate / rejected"""
+    payload = request.get_json(silent=True)
+    items = payload.get('reports') if isinstance(payload, dict) else payload
+    if not isinstance(items, list):
+        return jsonify(error='ต้องส่ง JSON เป็นรายการรายงาน หรือ {"reports": [...]}'), 400
+    if len(items) > Config.BULK_MAX_ITEMS:
+        return jsonify(error=f'ส่งได้ไม่เกิน {Config.BULK_MAX_ITEMS} รายงานต่อครั้ง'), 413
+    
+    parsed = [_bulk_item(item) for item in items]
+    result = repository.reports.bulk_create_reports(parsed)
+    panic_worker.notify(result['panic_rumours'])
+    panic_worker.submit_many(
+        parsed[index][1] for index, item in enumerate(result['results']) if item['status'] == 'accepted'
+    )
+    return jsonify(result)
+
+
+# ข้อความของ /events/panic (asgi.py ส่งรูปแบบเดียวกันโดยไม่ใช้ thread)
+SSE_RETRY_MESSAGE = 'retry: 5000\n\n'
+SSE_HEARTBEAT_MESSAGE = ': heartbeat\n\n'
+SSE_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+
+def sse_event(event):
+    """ข้อความ Server-Sent Events ของข่าวที่เพิ่งเข้าสู่ panic"""
+    return f'event: panic\ndata: {json.dumps(event, ensure_ascii=False)}\n\n'
+
+
+@app.route('/events/panic')
+def panic_events():
+    """Server-Sent Events แจ้งข่าวที่เพิ่งเข้าสู่สถานะ panic (หน้าสรุปผลอัปเดตแบบ live)"""
+    def stream():
+        subscription = panic_worker.events.subscribe()
+        try:
+            yield SSE_RETRY_MESSAGE
+            while True:
+                try:
+                    event = subscription.get(timeout=Config.SSE_HEARTBEAT)
+                except queue.Empty:
+                    yield SSE_HEARTBEAT_MESSAGE
+                    continue
+                if event is None:  # server กำลังปิด (PanicEvents.close)
+                    return
+                yield sse_event(event)
+        finally:
+            panic_worker.events.unsubscribe(subscription)
+    
+    return Response(stream(), mimetype='text/event-stream', headers=SSE_HEADERS)
+
+
+def run():
+    """เริ่ม development server (python main.py หรือ python app.py)"""
     print("=" * 60)
     print("  ระบบติดตามข่าวลือบนสื่อสังคมออนไลน์")
     print("  Rumor Tracking System (MVC Pattern)")
@@ -151,3 +398,7 @@ if __name__ == '__main__':
     print("\n⚠️  กด Ctrl+C เพื่อหยุดโปรแกรม")
     print("=" * 60)
     app.run(debug=Config.DEBUG, host=Config.HOST, port=Config.PORT)
+
+
+if __name__ == '__main__':
+    run()
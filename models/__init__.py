@@ -3,9 +3,15 @@ Models Package - ชั้น Model ของ MVC
 จัดการการเข้าถึงและประมวลผลข้อมูลในฐานข้อมูล
 """
 
-from .database import Database
+from .cache import query_cache
+from .database import Database, start_checkpointer
+from .hotness import start_hotness_job
 from .rumour import RumourModel
 from .report import ReportModel
 from .user import UserModel
+from .repository import Repository, repository
+from .panic import panic_worker
+from .batcher import report_batcher
 
-__all__ = ['Database', 'RumourModel', 'ReportModel', 'UserModel']
+__all__ = ['Database', 'start_checkpointer', 'start_hotness_job', 'query_cache', 'RumourModel', 'ReportModel', 'UserModel',
+           'Repository', 'repository', 'panic_worker', 'report_batcher']
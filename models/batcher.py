@@ -0,0 +1,125 @@
+"""
+Batcher - รวมรายงานจากหลาย request เขียนใน transaction เดียว (group commit)
+request ที่ส่งรายงานใส่รายการเข้าคิวแล้วรอผลของตัวเองผ่าน Future
+writer thread เดียวดึงรายการในคิวเป็นชุด (ไม่เกิน REPORT_BATCH_SIZE หรือรอไม่เกิน REPORT_BATCH_DELAY)
+แล้วบันทึกด้วย ReportModel.submit_reports ซึ่ง commit ครั้งเดียวต่อชุด
+
+ผลของแต่ละรายการเหมือนเรียก submit_report เอง รวมถึงการตรวจรายงานซ้ำด้วย UNIQUE(user_id, rumour_id)
+ผู้เขียนไม่ต้องแย่งล็อกของฐานข้อมูลกันเอง และจ่ายค่า commit (BEGIN/COMMIT, fsync) ครั้งเดียวต่อชุด
+
+ถ้า batcher ไม่ได้เริ่มทำงาน (REPORT_BATCHING = False) หรือคิวเต็ม จะบันทึกทันทีใน thread ที่เรียก
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from config.settings import Config
+from .repository import repository as default_repository
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class ReportBatcher:
+    """writer thread ที่บันทึกรายงานเป็นชุดจากคิว"""
+
+    def __init__(self, repository=None, batch_size=None, batch_delay=None, queue_size=None):
+        self.repository = repository or default_repository
+        self.batch_size = batch_size or Config.REPORT_BATCH_SIZE
+        self.batch_delay = Config.REPORT_BATCH_DELAY if batch_delay is None else batch_delay
+        self._queue = queue.Queue(maxsize=queue_size or Config.REPORT_QUEUE_SIZE)
+        self._thread = None
+        self._accepting = False
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """เริ่ม writer thread (เรียกซ้ำได้)"""
+        with self._lock:
+            if not self.running:
+                self._thread = threading.Thread(target=self._run, name='report-batcher', daemon=True)
+                self._thread.start()
+            self._accepting = True
+        return self._thread
+
+    def stop(self, timeout=5.0):
+        """หยุดรับรายการใหม่ แล้วหยุด writer หลังบันทึกรายการที่ค้างในคิวจนหมด"""
+        with self._lock:
+            thread = self._thread
+            if thread is None or not thread.is_alive():
+                return
+            self._accepting = False
+            self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def submit(self, user_id, rumour_id, report_type, check_panic=True):
+        """ส่งรายงานเข้าคิว คืนค่า Future ของผล (dict แบบเดียวกับ ReportModel.submit_report)"""
+        future = Future()
+        with self._lock:
+            if self._accepting and self.running:
+                try:
+                    self._queue.put_nowait((future, (user_id, rumour_id, report_type), check_panic))
+                    return future
+                except queue.Full:
+                    pass
+        # ไม่มี writer หรือคิวเต็ม: บันทึกทันทีใน thread นี้
+        try:
+            future.set_result(self.repository.reports.submit_report(user_id, rumour_id, report_type, check_panic))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+
+    def submit_report(self, user_id, rumour_id, report_type, check_panic=True):
+        """ส่งรายงานแล้วรอผล (ใช้แทน ReportModel.submit_report ได้โดยตรง)"""
+        return self.submit(user_id, rumour_id, report_type, check_panic).result()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            stopping = item is _STOP
+            batch = [] if stopping else [item]
+
+            # รวมรายการที่เข้ามาในช่วง batch_delay เป็นชุดเดียว
+            deadline = time.monotonic() + self.batch_delay
+            while not stopping and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+
+            if batch:
+                self._write(batch)
+            if stopping:
+                return
+
+    def _write(self, batch):
+        """บันทึกหนึ่งชุด - รายการที่ check_panic ต่างกันแยกเป็นคนละ transaction"""
+        for check_panic in (True, False):
+            group = [entry for entry in batch if bool(entry[2]) is check_panic]
+            if not group:
+                continue
+            try:
+                results = self.repository.reports.submit_reports([entry[1] for entry in group], check_panic)
+            except Exception as error:
+                # ทั้งชุด rollback แล้ว - แจ้ง error เดียวกันให้ทุก request ในชุด
+                logger.exception('บันทึกรายงาน %d รายการไม่สำเร็จ', len(group))
+                for future, _, _ in group:
+                    future.set_exception(error)
+                continue
+            for (future, _, _), result in zip(group, results):
+                future.set_result(result)
+
+
+report_batcher = ReportBatcher()
+atexit.register(report_batcher.stop)
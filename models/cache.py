@@ -0,0 +1,159 @@
+"""
+Cache - cache ผลลัพธ์การอ่านข้อมูลในหน่วยความจำ (read-through)
+หมดอายุตามเวลา (TTL) ไล่รายการที่ไม่ได้ใช้นานที่สุดออกเมื่อเต็ม (LRU)
+และล้างเฉพาะรายการที่เกี่ยวข้องเมื่อข้อมูลเปลี่ยนผ่าน tag เช่น 'rumour:12345678'
+
+cache อยู่ใน process เดียว - ถ้ารันหลาย process ข้อมูลอาจเก่าได้ไม่เกิน CACHE_TTL วินาที
+เว้นแต่เรียก QueryCache.sync ด้วย data_version ก่อนอ่าน (server.py ทำให้ทุก request เมื่อมีหลาย worker)
+"""
+import functools
+import threading
+import time
+from collections import OrderedDict
+from config.settings import Config
+
+RUMOURS_TAG = 'rumours'  # รายการ/สถิติที่รวมหลายข่าว
+USERS_TAG = 'users'
+
+
+def rumour_tag(rumour_id):
+    """tag ของข้อมูลที่ผูกกับข่าวลือหนึ่งข่าว"""
+    return f'rumour:{rumour_id}'
+
+
+class QueryCache:
+    """cache แบบ TTL + LRU ที่ใช้ร่วมกันได้หลาย thread"""
+
+    def __init__(self, max_entries=None, ttl=None, enabled=None):
+        self.max_entries = max_entries or Config.CACHE_MAX_ENTRIES
+        self.ttl = Config.CACHE_TTL if ttl is None else ttl
+        self.enabled = Config.CACHE_ENABLED if enabled is None else enabled
+        self._entries = OrderedDict()  # key -> (expires_at, value, tags)
+        self._tags = {}  # tag -> set ของ key
+        self._generation = 0  # เพิ่มทุกครั้งที่ invalidate เพื่อไม่เก็บค่าที่โหลดมาก่อนข้อมูลเปลี่ยน
+        self._lock = threading.Lock()
+        self._linked = []  # cache อื่นที่ต้องล้างตาม tag เดียวกัน (เช่น cache ของหน้า/fragment)
+        self._synced_version = None  # data_version ล่าสุดที่ sync แล้ว
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_or_load(self, key, loader, tags=()):
+        """คืนค่าจาก cache ถ้ายังไม่หมดอายุ ไม่เช่นนั้นเรียก loader แล้วเก็บผลไว้"""
+        if not self.enabled:
+            return loader()
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            generation = self._generation
+
+        value = loader()
+
+        with self._lock:
+            if generation == self._generation:
+                self._store(key, value, tags, now + self.ttl)
+        return value
+
+    def _store(self, key, value, tags, expires_at):
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (expires_at, value, tuple(tags))
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def link(self, other):
+        """ให้ invalidate/clear ของ cache นี้ส่งต่อไปยัง other ด้วย"""
+        self._linked.append(other)
+
+    def invalidate(self, *tags):
+        """ล้างทุกรายการที่มี tag ใด tag หนึ่งในที่ระบุ"""
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+        for other in self._linked:
+            other.invalidate(*tags)
+
+    def clear(self):
+        """ล้าง cache ทั้งหมด"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tags.clear()
+        for other in self._linked:
+            other.clear()
+
+    def sync(self, version):
+        """ล้าง cache ทั้งหมดเมื่อ data_version ในฐานข้อมูลต่างจากครั้งก่อน
+
+        ใช้เมื่อรันหลาย process (server.py serve --workers) - process อื่นแก้ข้อมูลโดยที่ invalidate
+        ของ process นี้ไม่ได้ถูกเรียก
+        """
+        with self._lock:
+            if self._synced_version == version:
+                return False
+            self._synced_version = version
+        self.clear()
+        return True
+
+    def stats(self):
+        """ตัวนับสำหรับปรับขนาด cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+query_cache = QueryCache()
+
+
+def cached(*tags):
+    """decorator สำหรับ method อ่านข้อมูลของ Model
+
+    tags แต่ละตัวเป็น string หรือ function ที่รับ argument ตัวแรกของ method (เช่น rumour_id) แล้วคืน tag
+    key รวมไฟล์ฐานข้อมูลของ Model ด้วย Model ของ repository ต่างไฟล์จึงไม่ใช้ผลของกันและกัน
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            key = (func.__qualname__, self.db.db_name, args, tuple(sorted(kwargs.items())))
+            entry_tags = [tag(args[0]) if callable(tag) else tag for tag in tags]
+            return query_cache.get_or_load(key, lambda: func(self, *args, **kwargs), entry_tags)
+        return wrapper
+    return decorator
+
+
+def invalidate_rumour(rumour_id):
+    """ล้าง cache ของข่าวลือนี้และรายการที่รวมหลายข่าว (เรียกหลังเขียนข้อมูลข่าว/รายงาน)"""
+    query_cache.invalidate(rumour_tag(rumour_id), RUMOURS_TAG)
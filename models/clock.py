@@ -0,0 +1,19 @@
+"""
+Clock - เวลาปัจจุบันที่ Model ใช้ (เวลาที่บันทึกรายงาน/สร้างข่าว น้ำหนักความร้อนแรง และ velocity window)
+Repository ถือ clock หนึ่งตัว (repository.clock) ค่าเริ่มต้นคือเวลาของระบบ
+ชุดตรวจส่ง clock ของตัวเองให้ repository แทนการแก้ time.time / datetime ของทั้ง process (ดู benchmarks/parity.py)
+"""
+import time
+from datetime import datetime
+
+
+class SystemClock:
+    """เวลาของระบบ"""
+
+    def time(self):
+        """unix time ปัจจุบัน"""
+        return time.time()
+
+    def now(self):
+        """เวลาปัจจุบันแบบ datetime (เวลาท้องถิ่น เหมือน datetime.now())"""
+        return datetime.fromtimestamp(self.time())
@@ -1,43 +1,336 @@
 """
 Database - จัดการการเชื่อมต่อและทำงานกับฐานข้อมูล SQLite
+ทุก Model ใช้ connection ที่เปิดค้างไว้ใน pool ร่วมกัน แทนการเปิด/ปิดใหม่ทุก query
 """
+import atexit
+import os
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
 from config.settings import Config
+from .metrics import InstrumentedConnection
+
+
+CHECKPOINT_MODES = ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE')
+
+
+def apply_pragmas(conn, pragmas=None):
+    """ตั้งค่า PRAGMA ตาม storage profile (Config.DB_PRAGMAS) ให้ connection"""
+    for name, value in (Config.DB_PRAGMAS if pragmas is None else pragmas).items():
+        conn.execute(f'PRAGMA {name} = {value}')
+
+
+class ConnectionPool:
+    """pool ของ connection SQLite ที่เปิดค้างไว้ ใช้ร่วมกันได้หลาย thread
+
+    - สร้าง connection เพิ่มตามความต้องการ ไม่เกิน size
+    - thread ที่ยืม connection อยู่แล้วจะได้ connection เดิมกลับไป (re-entrant)
+      ทำให้ Model หลายตัวที่ถูกเรียกต่อกันทำงานอยู่ใน transaction เดียวกันได้
+    - แต่ละ connection เก็บ prepared statement ไว้ใช้ซ้ำ (cached_statements)
+    """
+
+    def __init__(self, db_name, size=None, timeout=None, cached_statements=None):
+        self.db_name = db_name
+        self.size = size or Config.DB_POOL_SIZE
+        self.timeout = Config.DB_POOL_TIMEOUT if timeout is None else timeout
+        self.cached_statements = cached_statements or Config.DB_STATEMENT_CACHE_SIZE
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._closed = False
+
+    def _connect(self):
+        """เปิด connection ใหม่ (autocommit - ควบคุม transaction เองด้วย BEGIN/COMMIT)
+
+        ถ้า Config.METRICS_ENABLED ทุกคำสั่งจะถูกจับเวลา (models/metrics.py)
+        """
+        conn = sqlite3.connect(
+            self.db_name,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+            isolation_level=None,
+            factory=InstrumentedConnection if Config.METRICS_ENABLED else sqlite3.Connection,
+        )
+        conn.row_factory = sqlite3.Row
+        apply_pragmas(conn)
+        return conn
+
+    def acquire(self):
+        """ยืม connection ว่างจาก pool หรือเปิดใหม่ถ้ายังไม่ครบ size"""
+        if self._closed:
+            raise sqlite3.ProgrammingError('connection pool ถูกปิดแล้ว')
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+        if can_create:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f'connection pool เต็ม: รอเกิน {self.timeout} วินาที ({self.db_name})'
+            ) from None
+
+    def release(self, conn):
+        """คืน connection เข้า pool (ยกเลิก transaction ที่ค้างอยู่ก่อนเสมอ)"""
+        if conn.in_transaction:
+            conn.rollback()
+        if self._closed:
+            conn.close()
+            return
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """ยืม connection สำหรับใช้ใน with block แล้วคืนอัตโนมัติ"""
+        held = getattr(self._local, 'conn', None)
+        if held is not None:
+            yield held
+            return
+
+        conn = self.acquire()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self.release(conn)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def close(self):
+        """ปิด connection ที่ว่างอยู่ทั้งหมด (connection ที่ถูกยืมจะถูกปิดเมื่อคืน)"""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+
+    def abandon(self):
+        """เลิกใช้ pool ที่ติดมาจาก process แม่หลัง fork โดยไม่ปิด connection
+
+        ห้ามใช้หรือปิด handle ของ SQLite ที่เปิดไว้ก่อน fork ใน process ลูก (การปิดอาจ checkpoint/ลบไฟล์ -wal
+        หรือปล่อยล็อกที่ process แม่ยังใช้อยู่) จึงเก็บ connection ไว้เฉย ๆ ไม่ให้ถูก garbage collect
+        """
+        self._closed = True
+        pinned = getattr(self._local, 'conn', None)  # connection ที่ thread ซึ่งเรียก fork ถืออยู่
+        if pinned is not None:
+            _inherited.append(pinned)
+        while True:
+            try:
+                _inherited.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+_inherited = []  # connection ที่ติดมาจาก process แม่ (ดู ConnectionPool.abandon)
+
+
+def get_pool(db_name):
+    """คืน pool ของไฟล์ฐานข้อมูลนี้ (สร้างครั้งแรกที่เรียกใช้)"""
+    pool = _pools.get(db_name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(db_name)
+            if pool is None:
+                pool = _pools[db_name] = ConnectionPool(db_name)
+    return pool
+
+
+def close_all_pools():
+    """ปิด connection ทั้งหมดของทุก pool - เรียกอัตโนมัติตอนปิดโปรแกรม"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_all_pools)
+
+
+_checkpointers = {}
+
+
+def start_checkpointer(db_name=None, interval=None):
+    """เริ่ม thread เบื้องหลังที่ checkpoint WAL ทุก interval วินาที (เรียกซ้ำได้ 0 = ปิด)
+
+    ใช้โหมด PASSIVE จึงไม่รอผู้อ่าน/ผู้เขียนที่ทำงานอยู่ - แค่คัดลอกหน้าที่ทำได้กลับไฟล์หลัก
+    """
+    db_name = db_name or Config.DATABASE_NAME
+    interval = Config.DB_CHECKPOINT_INTERVAL if interval is None else interval
+    if interval <= 0:
+        return None
+    with _pools_lock:
+        existing = _checkpointers.get(db_name)
+        if existing is not None and existing[0].is_alive():
+            return existing[0]
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                try:
+                    Database(db_name).checkpoint()
+                except sqlite3.Error:
+                    pass  # ลองใหม่รอบถัดไป
+
+        thread = threading.Thread(target=run, name=f'wal-checkpoint:{db_name}', daemon=True)
+        _checkpointers[db_name] = (thread, stop)
+    thread.start()
+    return thread
+
+
+def stop_checkpointers(timeout=5.0):
+    """หยุด thread checkpoint ทั้งหมด (รอ checkpoint ที่ทำอยู่ให้เสร็จไม่เกิน timeout วินาที)"""
+    with _pools_lock:
+        checkpointers = list(_checkpointers.values())
+        _checkpointers.clear()
+    for _, stop in checkpointers:
+        stop.set()
+    for thread, _ in checkpointers:
+        thread.join(timeout)
+
+
+atexit.register(stop_checkpointers)
+
+
+def _after_fork():
+    """ใน process ลูกหลัง fork: เลิกใช้ pool และ thread checkpoint ที่ติดมาจาก process แม่
+
+    connection แรกที่ Model ขอใน process ลูกจะเปิดใหม่ใน pool ของ process นั้นเอง
+    (server.py ปิด pool ทั้งหมดก่อน fork อยู่แล้ว ส่วนนี้กันกรณี fork จากที่อื่น)
+    """
+    global _pools_lock
+    _pools_lock = threading.Lock()  # thread อื่นของ process แม่อาจถือล็อกไว้ตอน fork
+    for pool in _pools.values():
+        pool.abandon()
+    _pools.clear()
+    _checkpointers.clear()  # thread ไม่ติดมากับ fork
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
+
 
 class Database:
     """คลาสสำหรับจัดการการเชื่อมต่อฐานข้อมูล"""
-    
+
     def __init__(self, db_name=None):
         self.db_name = db_name or Config.DATABASE_NAME
-        
+        self.pool = get_pool(self.db_name)
+
     def get_connection(self):
-        """สร้างการเชื่อมต่อกับฐานข้อมูล"""
-        return sqlite3.connect(self.db_name)
-    
+        """ยืม connection จาก pool (ใช้กับ with)"""
+        return self.pool.connection()
+
     def execute_query(self, query, params=()):
         """ประมวลผล query ที่เปลี่ยนแปลงข้อมูล (INSERT, UPDATE, DELETE)"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        conn.commit()
-        conn.close()
-        
+        with self.get_connection() as conn:
+            conn.execute(query, params)
+
     def fetch_all(self, query, params=()):
         """ดึงข้อมูลทั้งหมดจาก query"""
-        conn = self.get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        results = cursor.fetchall()
-        conn.close()
-        return results
-    
+        with self.get_connection() as conn:
+            return conn.execute(query, params).fetchall()
+
     def fetch_one(self, query, params=()):
         """ดึงข้อมูลหนึ่งแถวจาก query"""
-        conn = self.get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        result = cursor.fetchone()
-        conn.close()
-        return result
+        with self.get_connection() as conn:
+            return conn.execute(query, params).fetchone()
+
+    def fetch_records(self, record, query, params=()):
+        """ดึงทุกแถวเป็น record (คลาสจาก models/records.py - SELECT ตาม record.select())"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = record.from_row
+            return cursor.execute(query, params).fetchall()
+
+    def fetch_record(self, record, query, params=()):
+        """ดึงแถวแรกเป็น record (None ถ้าไม่มี)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = record.from_row
+            return cursor.execute(query, params).fetchone()
+
+    def iter_records(self, record, query, params=(), batch_size=None):
+        """ดึงแถวทีละชุด (generator) ไม่สร้างรายการของทุกแถวไว้ในหน่วยความจำ
+
+        record เป็น None ได้ (คืนค่าแต่ละแถวเป็น tuple)
+        ถือ connection ของ pool ไว้จนกว่าจะอ่านครบหรือปิด generator จึงควรอ่านให้จบใน request เดียวกัน
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = record.from_row if record else None
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size or Config.DB_ITER_BATCH_SIZE)
+                if not rows:
+                    return
+                yield from rows
+
+    @contextmanager
+    def transaction(self):
+        """ทำงานหลาย query ใน transaction เดียว (BEGIN IMMEDIATE ... COMMIT)
+
+        ล็อกการเขียนตั้งแต่เริ่ม transaction จึงไม่มีผู้เขียนคนอื่นแทรกระหว่างอ่านและเขียน
+        ถ้าเรียกซ้อนกันใน thread เดียวกันจะรวมอยู่ใน transaction ชั้นนอก
+        """
+        with self.get_connection() as conn:
+            if conn.in_transaction:
+                yield conn
+                return
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+
+    def checkpoint(self, mode='PASSIVE'):
+        """คัดลอกข้อมูลจากไฟล์ WAL กลับไฟล์หลัก (TRUNCATE จะลดขนาดไฟล์ -wal เหลือ 0 ด้วย)
+
+        คืนค่า dict: busy (1 = ทำไม่ครบเพราะมีผู้ใช้งานอยู่), log_frames, checkpointed_frames
+        """
+        mode = mode.upper()
+        if mode not in CHECKPOINT_MODES:
+            raise ValueError(f'checkpoint mode ต้องเป็นหนึ่งใน {", ".join(CHECKPOINT_MODES)}')
+        with self.get_connection() as conn:
+            busy, log_frames, checkpointed = conn.execute(f'PRAGMA wal_checkpoint({mode})').fetchone()
+        return {'busy': busy, 'log_frames': log_frames, 'checkpointed_frames': checkpointed}
+
+    @staticmethod
+    def close_all():
+        """ปิด connection pool ทั้งหมด (shutdown hook)"""
+        close_all_pools()
+
+
+class Model:
+    """คลาสฐานของ Model - ใช้ Database และ Model อื่นผ่าน repository เดียวกัน (models/repository.py)"""
+
+    def __init__(self, repository):
+        self.repository = repository
+
+    @property
+    def db(self):
+        return self.repository.db
@@ -0,0 +1,156 @@
+"""
+Hotness - ความร้อนแรงของข่าว: จำนวนรายงานที่ลดน้ำหนักลงครึ่งหนึ่งทุก Config.HOTNESS_HALF_LIFE วินาที
+
+    hotness(t) = ผลรวมของ 2 ** (-(t - เวลาที่รายงาน) / HOTNESS_HALF_LIFE) ของทุกรายงานของข่าว
+
+ทุกข่าวลดลงด้วยอัตราเดียวกัน ลำดับจึงไม่เปลี่ยนตามเวลา - คอลัมน์ Rumour.hotness เก็บค่าเทียบกับเวลาอ้างอิง
+(epoch ใน Stats 'hotness_epoch') คือ ผลรวมของ 2 ** ((เวลาที่รายงาน - epoch) / HOTNESS_HALF_LIFE)
+ซึ่งเรียงลำดับเหมือน hotness(t) ทุกเวลา t การรับรายงานใหม่จึงแค่บวกน้ำหนักของเวลานั้นเข้าไป (add_reports)
+ไม่ต้องแก้ข่าวอื่น และหน้ารวมข่าวอ่าน top-K จาก index Rumour(hotness, created_date) ได้ทันที
+การแก้ hotness ไม่เพิ่ม data_version (รายงานใหม่เพิ่มผ่าน trigger ตัวนับอยู่แล้ว) ยกเว้น rebuild ที่เพิ่มครั้งเดียวต่อรอบ
+
+job เบื้องหลัง (start_hotness_job) คำนวณค่าใหม่จากรายงานใน HOTNESS_WINDOW ล่าสุดเป็นระยะ
+เพื่อตัดรายงานเก่าที่น้ำหนักเหลือน้อยมากออก แก้ค่าที่คลาดจากการเขียน Report โดยไม่ผ่าน Model
+และเลื่อน epoch เมื่อเก่าเกิน REBASE_AFTER ช่วง half-life (น้ำหนักของรายงานใหม่จะโตจน float ล้น)
+"""
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from config.settings import Config
+from .cache import query_cache, RUMOURS_TAG
+from .database import Database
+
+REBASE_AFTER = 64  # เลื่อน epoch เมื่อเก่ากว่านี้ (จำนวน half-life) - น้ำหนักสูงสุดประมาณ 2 ** 64
+EPOCH_KEY = 'hotness_epoch'
+TOUCH_DATA_VERSION = '''
+    UPDATE Stats SET value = CASE name
+        WHEN 'data_version' THEN value + 1
+        ELSE CAST(strftime('%s', 'now') AS REAL)
+    END
+    WHERE name IN ('data_version', 'last_modified')
+'''
+
+
+def report_weight(report_time, epoch, half_life=None):
+    """น้ำหนักของรายงานที่เวลา report_time (unix time) เทียบกับ epoch"""
+    return 2.0 ** ((report_time - epoch) / (half_life or Config.HOTNESS_HALF_LIFE))
+
+
+def get_epoch(conn):
+    """epoch ปัจจุบันจากตาราง Stats (None ถ้ายังไม่เคยคำนวณ)"""
+    row = conn.execute("SELECT value FROM Stats WHERE name = ?", (EPOCH_KEY,)).fetchone()
+    return row[0] if row else None
+
+
+def add_reports(conn, counts, report_time=None):
+    """บวกน้ำหนักของรายงานใหม่ให้ข่าว (counts: rumour_id -> จำนวนรายงาน) ใน transaction ของ conn
+
+    อ่าน epoch ใน transaction เดียวกับการเขียน จึงตรงกับ rebuild ที่อาจรันจาก process อื่น
+    """
+    if not counts:
+        return
+    epoch = get_epoch(conn)
+    if epoch is None:
+        return  # ยังไม่ได้ migrate - rebuild จะคำนวณให้ทั้งหมด
+    weight = report_weight(time.time() if report_time is None else report_time, epoch)
+    conn.executemany(
+        "UPDATE Rumour SET hotness = hotness + ? WHERE rumour_id = ?",
+        [(weight * count, rumour_id) for rumour_id, count in counts.items()],
+    )
+
+
+def rebuild(conn, now=None):
+    """คำนวณ hotness ของทุกข่าวใหม่จากรายงานใน Config.HOTNESS_WINDOW ล่าสุด (ใน transaction ของ conn)
+
+    แก้เฉพาะข่าวที่ค่าเปลี่ยน คืนค่า dict: epoch, hot (จำนวนข่าวที่ hotness > 0), updated
+    """
+    now = time.time() if now is None else now
+    epoch = get_epoch(conn)
+    if epoch is None or now - epoch > REBASE_AFTER * Config.HOTNESS_HALF_LIFE:
+        epoch = now
+        conn.execute("INSERT OR REPLACE INTO Stats (name, value) VALUES (?, ?)", (EPOCH_KEY, epoch))
+
+    since = datetime.fromtimestamp(now - Config.HOTNESS_WINDOW).strftime('%Y-%m-%d %H:%M:%S')
+    totals = defaultdict(float)
+    for rumour_id, report_date in conn.execute(
+            "SELECT rumour_id, report_date FROM Report WHERE report_date >= ?", (since,)):
+        totals[rumour_id] += report_weight(datetime.fromisoformat(report_date).timestamp(), epoch)
+
+    current = dict(conn.execute("SELECT rumour_id, hotness FROM Rumour WHERE hotness > 0").fetchall())
+    changes = [(0.0, rumour_id) for rumour_id in current if rumour_id not in totals]
+    changes.extend(
+        (value, rumour_id) for rumour_id, value in totals.items()
+        if abs(current.get(rumour_id, 0.0) - value) > value * 1e-9
+    )
+    conn.executemany("UPDATE Rumour SET hotness = ? WHERE rumour_id = ?", changes)
+    if changes:
+        # trigger ของ data_version ไม่นับคอลัมน์ hotness (migration 10) - ลำดับหน้ารวมข่าวอาจเปลี่ยน
+        # จึงเพิ่มเองครั้งเดียวต่อรอบ: ETag / page cache หมดอายุหนึ่งครั้งต่อ HOTNESS_REBUILD_INTERVAL
+        conn.execute(TOUCH_DATA_VERSION)
+    return {'epoch': epoch, 'hot': len(totals), 'updated': len(changes)}
+
+
+def refresh(db):
+    """rebuild ใน transaction ของ Database แล้วล้าง cache ของรายการข่าว"""
+    with db.transaction() as conn:
+        result = rebuild(conn)
+    if result['updated']:
+        query_cache.invalidate(RUMOURS_TAG)
+    return result
+
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def start_hotness_job(db_name=None, interval=None):
+    """เริ่ม thread เบื้องหลังที่เรียก refresh ทุก interval วินาที (เรียกซ้ำได้ 0 = ปิด)"""
+    db_name = db_name or Config.DATABASE_NAME
+    interval = Config.HOTNESS_REBUILD_INTERVAL if interval is None else interval
+    if interval <= 0:
+        return None
+    with _jobs_lock:
+        existing = _jobs.get(db_name)
+        if existing is not None and existing[0].is_alive():
+            return existing[0]
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                try:
+                    refresh(Database(db_name))
+                except sqlite3.Error:
+                    pass  # ลองใหม่รอบถัดไป
+
+        thread = threading.Thread(target=run, name=f'hotness:{db_name}', daemon=True)
+        _jobs[db_name] = (thread, stop)
+    thread.start()
+    return thread
+
+
+def stop_hotness_jobs(timeout=5.0):
+    """หยุด thread ของ start_hotness_job ทั้งหมด"""
+    with _jobs_lock:
+        jobs = list(_jobs.values())
+        _jobs.clear()
+    for _, stop in jobs:
+        stop.set()
+    for thread, _ in jobs:
+        thread.join(timeout)
+
+
+atexit.register(stop_hotness_jobs)
+
+
+def _after_fork():
+    global _jobs_lock
+    _jobs_lock = threading.Lock()
+    _jobs.clear()  # thread ไม่ติดมากับ fork
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
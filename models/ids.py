@@ -0,0 +1,83 @@
+"""
+Ids - ออกรหัสข่าวลือ 8 หลัก (10000000..99999999) ที่ไม่ชนกันโดยไม่ต้องสุ่มแล้วลองใหม่
+
+รหัสมาจากตัวนับลำดับ (sequence) ที่ผ่านการเรียงสับเปลี่ยนแบบ affine
+    rumour_id = 10000000 + (MULTIPLIER x sequence + OFFSET) mod 90000000
+MULTIPLIER ไม่มีตัวประกอบร่วมกับ 90000000 การแปลงนี้จึงเป็นหนึ่งต่อหนึ่ง ลำดับต่างกันได้รหัสต่างกันเสมอ
+และรหัสที่ได้กระจายทั่วช่วงเหมือนรหัสเดิมที่สุ่มไว้ (ไม่เปิดเผยจำนวนข่าวในระบบ)
+
+แต่ละ process จองลำดับเป็นชุด (RUMOUR_ID_BLOCK) จากแถว rumour_id_sequence ในตาราง Stats
+ด้วย BEGIN IMMEDIATE จึงปลอดภัยเมื่อมีหลาย thread/process เขียนพร้อมกัน และแตะฐานข้อมูลครั้งเดียวต่อชุด
+รหัสในชุดที่มีข่าวใช้อยู่แล้ว (ข้อมูลเดิมที่สุ่มรหัสไว้) ถูกตัดออกตั้งแต่ตอนจอง
+รหัสที่จองแล้วแต่ไม่ได้ใช้ (process จบก่อน) จะหายไป ซึ่งไม่เป็นปัญหาเพราะช่วงรหัสมี 90 ล้านค่า
+"""
+import os
+import threading
+from collections import deque
+from config.settings import Config
+from .database import Database
+from .report import _chunks
+
+RUMOUR_ID_MIN = 10_000_000
+RUMOUR_ID_SPACE = 90_000_000  # จำนวนรหัส 8 หลักทั้งหมด
+MULTIPLIER = 55_623_059  # ไม่มีตัวประกอบ 2, 3, 5 (90000000 = 2^7 x 3^2 x 5^7) และใกล้ 90000000 x 0.618 รหัสที่ติดกันจึงห่างกัน
+OFFSET = 12_345_678
+SEQUENCE_NAME = 'rumour_id_sequence'
+
+
+def permute(sequence):
+    """แปลงลำดับ 0..89999999 เป็นรหัสข่าว 8 หลัก (หนึ่งต่อหนึ่ง)"""
+    return RUMOUR_ID_MIN + (MULTIPLIER * sequence + OFFSET) % RUMOUR_ID_SPACE
+
+
+class RumourIdAllocator:
+    """ออกรหัสข่าวจากชุดลำดับที่จองไว้ใน process นี้ (แยกชุดตามไฟล์ฐานข้อมูล)"""
+
+    def __init__(self, block_size=None):
+        self.block_size = block_size or Config.RUMOUR_ID_BLOCK
+        self._ids = {}  # ชื่อไฟล์ฐานข้อมูล -> deque ของรหัสที่จองไว้
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def allocate(self, count=1, db_name=None):
+        """คืนค่ารายการรหัสข่าวใหม่ count รหัส (RuntimeError ถ้ารหัสหมด)
+
+        ต้องเรียกนอก transaction ที่อาจ rollback เพราะการจองลำดับต้อง commit แยก
+        ไม่เช่นนั้น process อื่นอาจจองลำดับชุดเดียวกันซ้ำ
+        """
+        db_name = db_name or Config.DATABASE_NAME
+        with self._lock:
+            if self._pid != os.getpid():
+                # process ลูกหลัง fork ห้ามใช้ชุดที่ process แม่จองไว้ (แม่ก็ใช้ชุดเดียวกัน)
+                self._ids.clear()
+                self._pid = os.getpid()
+            ids = self._ids.setdefault(db_name, deque())
+            while len(ids) < count:
+                ids.extend(self._reserve(db_name, max(self.block_size, count - len(ids))))
+            return [ids.popleft() for _ in range(count)]
+
+    def reset(self):
+        """ทิ้งรหัสที่จองไว้ทั้งหมด"""
+        with self._lock:
+            self._ids.clear()
+
+    def _reserve(self, db_name, size):
+        """จองลำดับชุดใหม่ คืนค่ารหัสที่ยังไม่มีข่าวใช้"""
+        db = Database(db_name)
+        with db.transaction() as conn:
+            conn.execute("INSERT OR IGNORE INTO Stats (name, value) VALUES (?, 0)", (SEQUENCE_NAME,))
+            start = int(conn.execute("SELECT value FROM Stats WHERE name = ?", (SEQUENCE_NAME,)).fetchone()[0])
+            end = min(start + size, RUMOUR_ID_SPACE)
+            if start >= end:
+                raise RuntimeError('รหัสข่าวลือ 8 หลักถูกใช้หมดแล้ว')
+            conn.execute("UPDATE Stats SET value = ? WHERE name = ?", (end, SEQUENCE_NAME))
+
+            ids = [permute(sequence) for sequence in range(start, end)]
+            taken = set()
+            for chunk in _chunks(ids):
+                query = f"SELECT rumour_id FROM Rumour WHERE rumour_id IN ({','.join('?' * len(chunk))})"
+                taken.update(row['rumour_id'] for row in conn.execute(query, chunk))
+        return [rumour_id for rumour_id in ids if rumour_id not in taken]
+
+
+rumour_ids = RumourIdAllocator()
@@ -0,0 +1,201 @@
+"""
+Metrics - จับเวลาการทำงานของ SQL ทุกคำสั่งที่ผ่าน connection pool
+ใช้เมื่อ Config.METRICS_ENABLED (ConnectionPool เปิด connection ด้วย InstrumentedConnection)
+ถ้าปิดไว้ pool ใช้ sqlite3.Connection ปกติ จึงไม่มีค่าใช้จ่ายเพิ่มเลย
+
+- เวลาของคำสั่งนับทั้ง execute และ fetchone/fetchmany/fetchall ของ cursor นั้น
+  (การวนอ่านด้วย for row in cursor ไม่ถูกนับเวลาส่วนที่ดึงแถว)
+- ระหว่าง request (begin_request .. end_request) นับแยกของ request นั้น: จำนวนคำสั่ง เวลารวม คำสั่งที่ช้าที่สุด
+- ทุกคำสั่งถูกรวมเข้าสถิติรายคำสั่ง (sql_metrics) โดยใช้ข้อความ SQL ที่ normalize แล้ว
+  (ตัดค่าคงที่ออก ยุบรายการ ?, ?, ? เหลือ ?...) เป็น key จึงมีจำนวน key จำกัดตามโค้ด ไม่ตามข้อมูล
+"""
+import functools
+import re
+import sqlite3
+import threading
+import time
+from config.settings import Config
+
+OTHER_QUERIES = 'other'  # key ของคำสั่งที่เกิน METRICS_MAX_QUERIES
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDERS = re.compile(r'\?(?:\s*,\s*\?)+')
+_SPACE = re.compile(r'\s+')
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize_sql(sql):
+    """ข้อความ SQL สำหรับใช้เป็น key/label: ค่าคงที่เป็น ? รายการ ?, ?, ? เป็น ?... และช่องว่างเหลือช่องเดียว"""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDERS.sub('?...', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+class RequestStats:
+    """สถิติ SQL ของ request หนึ่ง (ใช้ใน thread เดียว ไม่ต้องล็อก)"""
+
+    __slots__ = ('statements', 'seconds', 'slowest', 'slowest_sql', 'queries')
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+        self.slowest = 0.0
+        self.slowest_sql = None
+        self.queries = {}  # SQL ดิบ -> [จำนวนครั้ง, เวลารวม, เวลาสูงสุด]
+
+    def add(self, sql, seconds, count):
+        self.statements += count
+        self.seconds += seconds
+        entry = self.queries.get(sql)
+        if entry is None:
+            entry = self.queries[sql] = [0, 0.0, 0.0]
+        entry[0] += count
+        entry[1] += seconds
+        if seconds > entry[2]:
+            entry[2] = seconds
+        if seconds > self.slowest:
+            self.slowest = seconds
+            self.slowest_sql = sql
+
+    def summary(self):
+        """dict สำหรับ header/log: statements, seconds, slowest, slowest_sql (normalize แล้ว)"""
+        return {
+            'statements': self.statements,
+            'seconds': self.seconds,
+            'slowest': self.slowest,
+            'slowest_sql': normalize_sql(self.slowest_sql) if self.slowest_sql else None,
+        }
+
+
+class SqlMetrics:
+    """สถิติรายคำสั่ง SQL สะสมตั้งแต่เริ่ม process (ใช้ร่วมกันหลาย thread)"""
+
+    def __init__(self, max_queries=None):
+        self.max_queries = max_queries or Config.METRICS_MAX_QUERIES
+        self._queries = {}  # SQL ที่ normalize แล้ว -> [จำนวนครั้ง, เวลารวม, เวลาสูงสุด]
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def begin_request(self):
+        """เริ่มนับ SQL ของ request ใน thread นี้"""
+        self._local.stats = RequestStats()
+
+    def end_request(self):
+        """หยุดนับ รวมสถิติของ request เข้าสถิติรายคำสั่ง คืนค่า RequestStats (None ถ้าไม่ได้เริ่ม)"""
+        stats = getattr(self._local, 'stats', None)
+        if stats is None:
+            return None
+        self._local.stats = None
+        self._merge(stats.queries)
+        return stats
+
+    def record(self, sql, seconds, count=1):
+        """บันทึกเวลาของคำสั่ง - ใน request สะสมไว้ก่อน นอก request (thread เบื้องหลัง) รวมทันที"""
+        stats = getattr(self._local, 'stats', None)
+        if stats is not None:
+            stats.add(sql, seconds, count)
+        else:
+            self._merge({sql: [count, seconds, seconds]})
+
+    def _merge(self, queries):
+        normalized = [(normalize_sql(sql), entry) for sql, entry in queries.items()]
+        with self._lock:
+            for key, (count, seconds, slowest) in normalized:
+                total = self._queries.get(key)
+                if total is None:
+                    if len(self._queries) >= self.max_queries:
+                        key = OTHER_QUERIES
+                        total = self._queries.get(key)
+                    if total is None:
+                        total = self._queries[key] = [0, 0.0, 0.0]
+                total[0] += count
+                total[1] += seconds
+                if slowest > total[2]:
+                    total[2] = slowest
+
+    def snapshot(self):
+        """คืนค่ารายการ (sql, จำนวนครั้ง, เวลารวม, เวลาสูงสุด) เรียงตามเวลารวมมากไปน้อย"""
+        with self._lock:
+            rows = [(sql, *entry) for sql, entry in self._queries.items()]
+        return sorted(rows, key=lambda row: row[2], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._queries.clear()
+
+
+sql_metrics = SqlMetrics()
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """cursor ที่จับเวลา execute/fetch แล้วส่งให้ sql_metrics"""
+
+    _sql = None
+
+    def execute(self, sql, parameters=()):
+        self._sql = sql
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            sql_metrics.record(sql, time.perf_counter() - started)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._sql = sql
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            sql_metrics.record(sql, time.perf_counter() - started)
+
+    def executescript(self, sql_script):
+        self._sql = None
+        started = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            sql_metrics.record(sql_script, time.perf_counter() - started)
+
+    def _fetched(self, started):
+        # เวลาที่ดึงแถวนับรวมกับคำสั่งเดิม (ไม่นับเป็นคำสั่งใหม่)
+        if self._sql is not None:
+            sql_metrics.record(self._sql, time.perf_counter() - started, count=0)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            self._fetched(started)
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        try:
+            return super().fetchmany(self.arraysize if size is None else size)
+        finally:
+            self._fetched(started)
+
+    def fetchall(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self._fetched(started)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """connection ที่ทุก cursor (รวมถึง conn.execute) เป็น InstrumentedCursor"""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
@@ -0,0 +1,102 @@
+"""
+Pagination - แบ่งหน้าแบบ keyset (cursor)
+ใช้ค่าคีย์ของแถวสุดท้าย/แรกของหน้าเป็นจุดเริ่มหน้าถัดไป แทนการใช้ OFFSET
+ทำให้เวลาโหลดหน้าไม่ขึ้นกับขนาดตาราง และไม่ซ้ำ/ข้ามแถวเมื่อมีข้อมูลใหม่แทรกเข้ามา
+"""
+import base64
+import json
+from config.settings import Config
+
+
+def encode_cursor(values):
+    """แปลงค่าคีย์ของแถวเป็น cursor string สำหรับใส่ใน URL"""
+    raw = json.dumps(list(values), ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, size):
+    """แปลง cursor string กลับเป็นค่าคีย์ (ValueError ถ้า cursor ไม่ถูกต้อง)"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError) as exc:
+        raise ValueError('cursor ไม่ถูกต้อง') from exc
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('cursor ไม่ถูกต้อง')
+    # ค่าคีย์ถูกส่งเป็น parameter ของ SQL - รับเฉพาะชนิดที่ sqlite3 bind ได้ (bool เป็น int แต่ไม่ใช่ค่าคีย์)
+    if any(isinstance(value, bool) or not isinstance(value, (str, int, float, type(None))) for value in values):
+        raise ValueError('cursor ไม่ถูกต้อง')
+    return values
+
+
+def clamp_limit(limit):
+    """จำกัดจำนวนแถวต่อหน้าให้อยู่ในช่วง 1..MAX_PAGE_SIZE"""
+    if not limit or limit < 1:
+        return Config.PAGE_SIZE
+    return min(limit, Config.MAX_PAGE_SIZE)
+
+
+def page_query(query, key_columns, cursor_values=None, backward=False):
+    """แทน {keyset} และ {order} ใน query ของ fetch_page คืนค่า (SQL, parameter ของ keyset)
+
+    cursor_values=None คือหน้าแรก backward=True คือหน้าก่อน cursor (เรียงจากน้อยไปมาก)
+    """
+    if cursor_values is None:
+        keyset, keyset_params = '1', []
+    else:
+        operator = '>' if backward else '<'
+        placeholders = ', '.join('?' * len(key_columns))
+        keyset = f"({', '.join(key_columns)}) {operator} ({placeholders})"
+        keyset_params = list(cursor_values)
+    direction = 'ASC' if backward else 'DESC'
+    order = ', '.join(f'{column} {direction}' for column in key_columns)
+    return query.format(keyset=keyset, order=order), keyset_params
+
+
+def page_plans(query, params, key_columns, cursor_values, index):
+    """statement ของหน้าแรก หน้าถัดไป และหน้าก่อนหน้า สำหรับ QUERY_PLANS ของ Model
+
+    คืนค่ารายการ (SQL, parameter, index ที่ต้องใช้) - LIMIT คือ PAGE_SIZE + 1 แบบที่ fetch_page ส่ง
+    """
+    plans = []
+    for values, backward in ((None, False), (cursor_values, False), (cursor_values, True)):
+        sql, keyset_params = page_query(query, key_columns, values, backward)
+        plans.append((sql, (*params, *keyset_params, Config.PAGE_SIZE + 1), index))
+    return plans
+
+
+def fetch_page(db, query, params, key_columns, after=None, before=None, limit=None, record=None):
+    """ดึงข้อมูลหนึ่งหน้าเรียงจากมากไปน้อยตาม key_columns
+
+    query ต้องมี {keyset} ใน WHERE, {order} ใน ORDER BY และ LIMIT ? ท้ายสุด
+    key_columns คือคอลัมน์ที่เรียงลำดับ (คอลัมน์สุดท้ายต้อง unique เช่น primary key)
+    record คือคลาสแถวจาก models/records.py (None = sqlite3.Row) ต้องมีคอลัมน์ใน key_columns
+
+    คืนค่า dict: items, next_cursor, prev_cursor, limit
+    """
+    limit = clamp_limit(limit)
+    names = [column.split('.')[-1] for column in key_columns]
+
+    backward = before is not None
+    cursor = before if backward else after
+    cursor_values = None if cursor is None else decode_cursor(cursor, len(key_columns))
+    query, keyset_params = page_query(query, key_columns, cursor_values, backward)
+    params = tuple(params) + tuple(keyset_params) + (limit + 1,)
+    rows = db.fetch_records(record, query, params) if record else db.fetch_all(query, params)
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    if backward:
+        items.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, after is not None
+
+    def cursor_of(row):
+        return encode_cursor(row[name] for name in names)
+
+    return {
+        'items': items,
+        'next_cursor': cursor_of(items[-1]) if items and has_next else None,
+        'prev_cursor': cursor_of(items[0]) if items and has_prev else None,
+        'limit': limit,
+    }
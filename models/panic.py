@@ -0,0 +1,222 @@
+"""
+Panic - ตรวจสถานะ panic (Rule 4.2) ใน worker เบื้องหลัง
+request ที่ส่งรายงานแค่ส่งรหัสข่าวเข้าคิว worker รวมข่าวที่ได้รับรายงานในช่วงสั้นๆ เป็นชุดเดียว
+ตรวจ/เปลี่ยนสถานะใน transaction เดียว แล้วแจ้งข่าวที่เพิ่งเข้าสู่ panic ให้ผู้รับ event (SSE)
+
+นอกจากจำนวนรายงานรวม worker ยังนับความเร็วการรายงานด้วย VelocityDetector (PANIC_WINDOWS)
+ข่าวที่ถูกรายงานเร็วถึงเกณฑ์จะเป็น panic ได้ก่อนจำนวนรายงานรวมถึง PANIC_THRESHOLD
+(server.py ที่มีหลาย worker ใช้ ReportWindows ซึ่งนับจากฐานข้อมูลแทน)
+
+ถ้า worker ไม่ได้เริ่มทำงาน (PANIC_ASYNC = False) หรือคิวเต็ม จะตรวจทันทีใน thread ที่เรียก
+"""
+import atexit
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from config.settings import Config
+from .repository import repository as default_repository
+from .velocity import VelocityDetector
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class PanicEvents:
+    """กระจาย event ข่าวที่เข้าสู่ panic ให้ผู้รับแต่ละคน (ผู้รับหนึ่งคนมีคิวของตัวเอง)"""
+
+    def __init__(self, max_pending=100):
+        self.max_pending = max_pending
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, subscription=None):
+        """ลงทะเบียนผู้รับ คืนค่าคิวที่ event ใหม่จะถูกใส่เข้าไป
+        
+        subscription คือออบเจกต์ที่มี put_nowait(event) (ค่าเริ่มต้นคือ queue.Queue ใหม่)
+        ผู้รับแบบ asyncio ส่งตัวที่ส่งต่อ event เข้า event loop ของตัวเองได้ (ดู asgi.py)
+        """
+        if subscription is None:
+            subscription = queue.Queue(maxsize=self.max_pending)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def close(self):
+        """แจ้งผู้รับทุกคนให้เลิกรอ (ใส่ None เข้าคิว) ใช้ตอนปิด server ให้ stream SSE จบเอง"""
+        self.publish(None)
+
+    def publish(self, event):
+        """ส่ง event ให้ผู้รับทุกคน (ผู้รับที่อ่านไม่ทันจนคิวเต็มจะพลาด event นั้น)"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.put_nowait(event)
+            except queue.Full:
+                pass
+
+
+def _event(row):
+    return {
+        'rumour_id': row['rumour_id'],
+        'title': row['title'],
+        'report_count': row['report_count'],
+        'credibility_score': row['credibility_score'],
+        'at': time.time(),
+    }
+
+
+class PanicWorker:
+    """thread เบื้องหลังที่ตรวจ panic เป็นชุดจากคิวของรหัสข่าวที่ได้รับรายงานใหม่"""
+
+    def __init__(self, repository=None, events=None, detector=None, batch_delay=None, max_batch=None,
+                 queue_size=None):
+        self.repository = repository or default_repository
+        self.events = events or PanicEvents()
+        self.detector = detector or VelocityDetector()
+        self.batch_delay = Config.PANIC_BATCH_DELAY if batch_delay is None else batch_delay
+        self.max_batch = max_batch or Config.PANIC_MAX_BATCH
+        self._queue = queue.Queue(maxsize=queue_size or Config.PANIC_QUEUE_SIZE)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._seeded = False
+        self._last_prune = time.monotonic()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def seed(self):
+        """โหลดรายงานล่าสุดจาก Report.report_date เข้า velocity detector (ครั้งเดียว)
+        
+        ข่าวที่ถูกรายงานเร็วถึงเกณฑ์อยู่แล้วจะถูกเปลี่ยนเป็น panic ทันที
+        """
+        with self._lock:
+            if self._seeded or not self.detector.enabled:
+                self._seeded = True
+                return []
+            self._seeded = True
+        over = self.detector.seed(self.repository.reports.iter_report_times_since(
+            self.detector.seed_since(self.repository.clock.time())))
+        return self.process((), over) if over else []
+
+    def start(self):
+        """โหลดข้อมูลย้อนหลังแล้วเริ่ม worker (เรียกซ้ำได้)"""
+        self.seed()
+        with self._lock:
+            if not self.running:
+                self._thread = threading.Thread(target=self._run, name='panic-worker', daemon=True)
+                self._thread.start()
+        return self._thread
+
+    def stop(self, timeout=5.0):
+        """หยุด worker หลังตรวจรายการที่ค้างในคิวจนหมด"""
+        with self._lock:
+            thread = self._thread
+            if thread is None or not thread.is_alive():
+                return
+            self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def reset(self):
+        """หยุด worker แล้วล้างข้อมูลใน velocity detector ให้ seed ใหม่จากฐานข้อมูลครั้งถัดไป
+        (process ลูกของ server.py เรียกหลัง fork เพราะ thread ของ process แม่ไม่ติดมาด้วย)"""
+        self.stop()
+        with self._lock:
+            self._thread = None
+            self._queue = queue.Queue(maxsize=self._queue.maxsize)
+            self._seeded = False
+        self.detector.clear()
+
+    def submit(self, rumour_id, timestamp=None):
+        """แจ้งว่าข่าวนี้ได้รับรายงานใหม่ (ไม่รอผลการตรวจ ถ้า worker ทำงานอยู่)"""
+        self.submit_many([rumour_id], timestamp)
+
+    def submit_many(self, rumour_ids, timestamp=None):
+        """แจ้งรายงานใหม่หลายรายการ (เช่นจาก bulk import) - หนึ่งรายการต่อหนึ่งรายงาน"""
+        timestamp = self.repository.clock.time() if timestamp is None else timestamp
+        inline = []
+        for rumour_id in rumour_ids:
+            if self.running:
+                try:
+                    self._queue.put_nowait((rumour_id, timestamp))
+                    continue
+                except queue.Full:
+                    pass
+            inline.append(rumour_id)
+        if inline:
+            fast = {rumour_id for rumour_id in inline if self.detector.record(rumour_id, timestamp)}
+            self.process(inline, fast)
+
+    def flush(self):
+        """รอจนรายการที่อยู่ในคิวถูกตรวจครบ"""
+        if self.running:
+            self._queue.join()
+
+    def notify(self, rumour_ids):
+        """แจ้ง event ของข่าวที่ถูกเปลี่ยนเป็น panic ไปแล้วโดยทางอื่น (เช่น bulk import)"""
+        for rumour_id in rumour_ids:
+            rumour = self.repository.rumours.get_rumour_by_id(rumour_id)
+            if rumour is not None:
+                self.events.publish(_event(rumour))
+
+    def process(self, rumour_ids, velocity_ids=()):
+        """ตรวจและเปลี่ยนสถานะเป็นชุด แล้วแจ้ง event ของข่าวที่เพิ่งเข้าสู่ panic"""
+        velocity_ids = set(velocity_ids) | self.detector.over(rumour_ids, self.repository.clock.time())
+        changed = self.repository.rumours.apply_panic_threshold(rumour_ids, velocity_ids)
+        for row in changed:
+            self.events.publish(_event(row))
+        return changed
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            taken, stopping = 1, item is _STOP
+            batch, fast = set(), set()
+            if not stopping:
+                self._record(item, batch, fast)
+
+            # รวมรายการที่เข้ามาในช่วง batch_delay เป็นชุดเดียว (ข่าวซ้ำตรวจครั้งเดียว)
+            deadline = time.monotonic() + self.batch_delay
+            while not stopping and len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                taken += 1
+                if item is _STOP:
+                    stopping = True
+                else:
+                    self._record(item, batch, fast)
+
+            try:
+                if batch:
+                    self.process(batch, fast)
+                if time.monotonic() - self._last_prune > self.detector.span:
+                    self.detector.prune(self.repository.clock.time())
+                    self._last_prune = time.monotonic()
+            except sqlite3.Error:
+                logger.exception('ตรวจสถานะ panic ไม่สำเร็จ: %s', sorted(batch))
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+            if stopping:
+                return
+
+    def _record(self, item, batch, fast):
+        rumour_id, timestamp = item
+        batch.add(rumour_id)
+        if self.detector.record(rumour_id, timestamp):
+            fast.add(rumour_id)
+
+
+panic_worker = PanicWorker()
+atexit.register(panic_worker.stop)
@@ -0,0 +1,107 @@
+"""
+Records - แถวข้อมูลแบบเบา (__slots__) แทน sqlite3.Row
+แต่ละคลาสกำหนดคอลัมน์ที่ดึง (projection) ตามการใช้งาน เช่น หน้ารายการไม่ต้องดึง content ของข่าว
+และไม่มี dict ต่อแถว จึงใช้หน่วยความจำน้อยกว่า sqlite3.Row มากเมื่อดึงหลายแถว
+
+ใช้ได้เหมือน sqlite3.Row: record.title, record['title'], record.keys(), dict(record), tuple(record)
+"""
+
+
+class Record:
+    """คลาสฐานของแถวข้อมูล - คลาสลูกกำหนด __slots__ = COLUMNS = (ชื่อคอลัมน์ตามลำดับใน SELECT)"""
+
+    __slots__ = ()
+    COLUMNS = ()
+    # นิพจน์ SQL ของคอลัมน์ที่ไม่ได้มาจากตารางหลักโดยตรง (เช่น คอลัมน์จากตารางที่ JOIN)
+    EXPRESSIONS = {}
+
+    def __init__(self, *values):
+        for name, value in zip(self.COLUMNS, values):
+            setattr(self, name, value)
+
+    @classmethod
+    def from_row(cls, cursor, row):
+        """row_factory ของ cursor - ลำดับคอลัมน์ใน SELECT ต้องตรงกับ COLUMNS (ใช้ select())"""
+        return cls(*row)
+
+    @classmethod
+    def select(cls, alias=None):
+        """รายการคอลัมน์สำหรับ SELECT ตามลำดับของ COLUMNS"""
+        prefix = f'{alias}.' if alias else ''
+        return ', '.join(
+            f'{cls.EXPRESSIONS[name]} AS {name}' if name in cls.EXPRESSIONS else f'{prefix}{name}'
+            for name in cls.COLUMNS
+        )
+
+    def keys(self):
+        return list(self.COLUMNS)
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return getattr(self, self.COLUMNS[key])
+        if key not in self.COLUMNS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return (getattr(self, name) for name in self.COLUMNS)
+
+    def __len__(self):
+        return len(self.COLUMNS)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and tuple(self) == tuple(other)
+
+    def __hash__(self):
+        return hash((type(self), tuple(self)))
+
+    def __repr__(self):
+        values = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.COLUMNS)
+        return f'{type(self).__name__}({values})'
+
+
+class RumourSummary(Record):
+    """ข่าวลือสำหรับหน้ารายการ/การ์ดข่าว (ไม่ดึง content)"""
+
+    __slots__ = COLUMNS = (
+        'rumour_id', 'title', 'source', 'created_date', 'credibility_score', 'status',
+        'is_verified', 'verification_result', 'report_count',
+    )
+
+
+class HotRumour(RumourSummary):
+    """ข่าวลือในหน้ารวมข่าว (RumourSummary + hotness สำหรับ cursor - ค่าเทียบกับ hotness_epoch ดู models/hotness.py)"""
+
+    __slots__ = ('hotness',)
+    COLUMNS = RumourSummary.COLUMNS + ('hotness',)
+
+
+class RumourMatch(RumourSummary):
+    """ผลค้นหาข่าวลือ (RumourSummary + คะแนนความเกี่ยวข้อง)"""
+
+    __slots__ = ('score',)
+    COLUMNS = RumourSummary.COLUMNS + ('score',)
+
+
+class Rumour(Record):
+    """ข่าวลือครบทุกคอลัมน์สำหรับหน้ารายละเอียด พร้อมชื่อ/รหัสผู้ตรวจสอบ (JOIN Users u)"""
+
+    __slots__ = COLUMNS = (
+        'rumour_id', 'title', 'content', 'source', 'created_date', 'credibility_score', 'status',
+        'is_verified', 'verification_result', 'verified_by', 'report_count', 'credible_count',
+        'verifier_name', 'verifier_code',
+    )
+    EXPRESSIONS = {'verifier_name': 'u.name', 'verifier_code': 'u.verifier_code'}
+
+
+class Report(Record):
+    """รายงานหนึ่งรายการพร้อม username/ชื่อผู้รายงาน (JOIN Users u)"""
+
+    __slots__ = COLUMNS = ('report_id', 'user_id', 'rumour_id', 'report_date', 'report_type', 'username', 'name')
+    EXPRESSIONS = {'username': 'u.username', 'name': 'u.name'}
+
+
+class User(Record):
+    """ผู้ใช้หนึ่งคน"""
+
+    __slots__ = COLUMNS = ('user_id', 'username', 'name', 'role', 'verifier_code')
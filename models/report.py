@@ -1,41 +1,338 @@
 """
 ReportModel - Model สำหรับจัดการข้อมูลการรายงานข่าวลือ
 """
+import sqlite3
+from collections import Counter
 from datetime import datetime
-from .database import Database
+from config.settings import Config
+from . import hotness
+from .cache import cached, invalidate_rumour, query_cache, rumour_tag, RUMOURS_TAG
+from .database import Model
+from .pagination import fetch_page, page_plans
+from .records import Report
 
 
-class ReportModel:
+def _chunks(values, size=500):
+    """แบ่งค่าเป็นชุดเพื่อไม่ให้จำนวน parameter ใน IN (...) เกินขีดจำกัดของ SQLite"""
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+_REPORTS_BY_RUMOUR = f"""
+    SELECT {Report.select('rep')}
+    FROM Report rep
+    JOIN Users u ON rep.user_id = u.user_id
+    WHERE rep.rumour_id = ?
+    ORDER BY rep.report_date DESC
+"""
+_REPORTS_PAGE = f"""
+    SELECT {Report.select('rep')}
+    FROM Report rep
+    JOIN Users u ON rep.user_id = u.user_id
+    WHERE rep.rumour_id = ? AND {{keyset}}
+    ORDER BY {{order}}
+    LIMIT ?
+"""
+_REPORTS_PAGE_KEY = ('rep.report_date', 'rep.report_id')
+_REPORT_TIMES_SINCE = """
+    SELECT rumour_id, report_date FROM Report
+    WHERE report_date >= ?
+    ORDER BY report_date
+"""
+
+
+def _window_counts_query(windows, rumour_count):
+    """SQL นับรายงานของแต่ละข่าวในแต่ละ window (parameter: ขอบเริ่มของแต่ละ window, รหัสข่าว, ขอบของ window ที่ยาวที่สุด)"""
+    columns = ', '.join(['SUM(report_date >= ?)'] * windows)
+    placeholders = ', '.join('?' * rumour_count)
+    return (f"SELECT rumour_id, {columns} FROM Report "
+            f"WHERE rumour_id IN ({placeholders}) AND report_date >= ? GROUP BY rumour_id")
+
+
+class ReportModel(Model):
     """Model สำหรับการรายงานข่าว"""
     
-    @staticmethod
-    def create_report(user_id, rumour_id, report_type):
+    REPORT_TYPES = ('บิดเบือน', 'ปลุกปั่น', 'ข้อมูลเท็จ', 'น่าเชื่อถือ')
+    
+    def create_report(self, user_id, rumour_id, report_type):
         """สร้างรายงานใหม่"""
-        db = Database()
+        db = self.db
         query = """
             INSERT INTO Report (user_id, rumour_id, report_date, report_type)
             VALUES (?, ?, ?, ?)
         """
-        report_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        db.execute_query(query, (user_id, rumour_id, report_date, report_type))
+        report_date = self.repository.clock.now().strftime('%Y-%m-%d %H:%M:%S')
+        with db.transaction() as conn:
+            conn.execute(query, (user_id, rumour_id, report_date, report_type))
+            hotness.add_reports(conn, {rumour_id: 1}, self.repository.clock.time())
+        invalidate_rumour(rumour_id)
     
-    @staticmethod
-    def check_duplicate_report(user_id, rumour_id):
+    def submit_report(self, user_id, rumour_id, report_type, check_panic=True):
+        """บันทึกรายงาน อัปเดตคะแนนความน่าเชื่อถือ และตรวจสถานะ panic ใน transaction เดียว
+        
+        ใช้ UNIQUE(user_id, rumour_id) ตรวจรายงานซ้ำ (Rule 4.1) แทนการ query ก่อน insert
+        และล็อกการเขียนตลอด transaction จึงเปลี่ยนเป็น panic ได้เพียงครั้งเดียว (Rule 4.2)
+        check_panic=False ข้ามการตรวจ panic (ให้ panic_worker ตรวจภายหลัง)
+        
+        คืนค่า dict:
+            status: 'created', 'duplicate', 'verified', 'rumour_not_found',
+                    'user_not_found' หรือ 'invalid_type'
+            user_name, report_count, credibility_score, became_panic
+        """
+        return self.submit_reports([(user_id, rumour_id, report_type)], check_panic)[0]
+    
+    def submit_reports(self, items, check_panic=True):
+        """บันทึกรายงานหลายรายการใน transaction เดียว (commit ครั้งเดียว) - ใช้โดย report_batcher
+        
+        items คือรายการ (user_id, rumour_id, report_type) แต่ละรายการถูกตรวจตามลำดับ
+        เหมือนเรียก submit_report ทีละรายการ (รายการหลังเห็นรายงานของรายการก่อนหน้าในชุดเดียวกัน)
+        รายงานซ้ำทำให้ INSERT นั้นล้มเหลวเพียงคำสั่งเดียว transaction ยังดำเนินต่อได้
+        
+        คืนค่ารายการ dict ตามลำดับ items (รูปแบบเดียวกับ submit_report)
+        """
+        items = [tuple(item) for item in items]
+        results = []
+        created = Counter()
+        db = self.db
+        with db.transaction() as conn:
+            # ดึงข่าวและผู้ใช้ของทั้งชุดครั้งเดียว (ล็อกการเขียนอยู่ ค่าจึงไม่เปลี่ยนจนจบ transaction)
+            rumours, users = {}, {}
+            for chunk in _chunks({item[1] for item in items}):
+                query = f"SELECT rumour_id, status, is_verified FROM Rumour WHERE rumour_id IN ({','.join('?' * len(chunk))})"
+                rumours.update((row['rumour_id'], [row['status'], row['is_verified']]) for row in conn.execute(query, chunk))
+            for chunk in _chunks({item[0] for item in items}):
+                query = f"SELECT user_id, name FROM Users WHERE user_id IN ({','.join('?' * len(chunk))})"
+                users.update((row['user_id'], row['name']) for row in conn.execute(query, chunk))
+            
+            for user_id, rumour_id, report_type in items:
+                result = self._submit(conn, rumours, users, user_id, rumour_id, report_type, check_panic)
+                if result['status'] == 'created':
+                    created[rumour_id] += 1
+                results.append(result)
+            # น้ำหนักความร้อนแรงของรายงานใหม่ - หนึ่ง UPDATE ต่อข่าวในชุด (models/hotness.py)
+            hotness.add_reports(conn, created, self.repository.clock.time())
+        
+        # ล้าง cache หลัง commit เพื่อไม่ให้ผู้อ่านคนอื่นโหลดข้อมูลเก่ากลับเข้า cache
+        if created:
+            query_cache.invalidate(RUMOURS_TAG, *(rumour_tag(rumour_id) for rumour_id in created))
+        return results
+    
+    def _submit(self, conn, rumours, users, user_id, rumour_id, report_type, check_panic):
+        """ตรวจและบันทึกรายงานหนึ่งรายการใน transaction ของ conn คืนค่า dict ผลลัพธ์
+        
+        rumours (rumour_id -> [status, is_verified]) และ users (user_id -> name) ดึงไว้แล้วโดย submit_reports
+        """
+        result = {
+            'status': None,
+            'user_name': None,
+            'report_count': 0,
+            'credibility_score': None,
+            'became_panic': False,
+        }
+        if report_type not in self.REPORT_TYPES:
+            result['status'] = 'invalid_type'
+            return result
+        
+        rumour = rumours.get(rumour_id)
+        if rumour is None:
+            result['status'] = 'rumour_not_found'
+            return result
+        
+        if user_id not in users:
+            result['status'] = 'user_not_found'
+            return result
+        result['user_name'] = users[user_id]
+        
+        # ข่าวที่ตรวจสอบแล้วรับรายงานเพิ่มไม่ได้ (Rule 4.3)
+        status, is_verified = rumour
+        if is_verified:
+            result['status'] = 'verified'
+            return result
+        
+        report_date = self.repository.clock.now().strftime('%Y-%m-%d %H:%M:%S')
+        try:
+            conn.execute(
+                "INSERT INTO Report (user_id, rumour_id, report_date, report_type) VALUES (?, ?, ?, ?)",
+                (user_id, rumour_id, report_date, report_type),
+            )
+        except sqlite3.IntegrityError:
+            result['status'] = 'duplicate'
+            return result
+        
+        # trigger อัปเดต report_count/credible_count/credibility_score ให้แล้ว
+        counters = conn.execute(
+            "SELECT report_count, credibility_score FROM Rumour WHERE rumour_id = ?",
+            (rumour_id,),
+        ).fetchone()
+        report_count = counters['report_count']
+        became_panic = check_panic and report_count >= Config.PANIC_THRESHOLD and status == 'ปกติ'
+        if became_panic:
+            conn.execute("UPDATE Rumour SET status = 'panic' WHERE rumour_id = ?", (rumour_id,))
+            rumour[0] = 'panic'
+        result.update(
+            status='created',
+            report_count=report_count,
+            credibility_score=counters['credibility_score'],
+            became_panic=became_panic,
+        )
+        return result
+    
+    def bulk_create_reports(self, items):
+        """บันทึกรายงานจำนวนมากใน transaction เดียว
+        
+        items คือรายการ (user_id, rumour_id, report_type)
+        - insert ด้วย executemany และข้ามรายงานซ้ำด้วย UNIQUE(user_id, rumour_id)
+        - ตัวนับและคะแนนความน่าเชื่อถือถูกอัปเดตโดย trigger ทีละแถว (O(1))
+        - ตรวจสถานะ panic ครั้งเดียวต่อข่าวที่ได้รับรายงานใหม่
+        
+        คืนค่า dict:
+            results: รายการผลของแต่ละ item ตามลำดับ {'status': 'accepted' | 'duplicate' | 'rejected',
+                     'reason': ...} (reason มีเฉพาะ rejected)
+            accepted, duplicates, rejected: จำนวนแต่ละผล
+            panic_rumours: รหัสข่าวที่เปลี่ยนเป็น panic จากชุดนี้
+        """
+        items = [tuple(item) for item in items]
+        results = [None] * len(items)
+        candidates = []
+        for index, (user_id, rumour_id, report_type) in enumerate(items):
+            if not all(type(value) is int for value in (user_id, rumour_id)):
+                results[index] = {'status': 'rejected', 'reason': 'invalid_item'}
+            elif report_type not in self.REPORT_TYPES:
+                results[index] = {'status': 'rejected', 'reason': 'invalid_type'}
+            else:
+                candidates.append((index, user_id, rumour_id, report_type))
+        
+        panic_rumours = []
+        affected = Counter()
+        db = self.db
+        with db.transaction() as conn:
+            rumours = {}
+            users = set()
+            for chunk in _chunks({c[2] for c in candidates}):
+                query = f"SELECT rumour_id, is_verified FROM Rumour WHERE rumour_id IN ({','.join('?' * len(chunk))})"
+                rumours.update((row['rumour_id'], row['is_verified']) for row in conn.execute(query, chunk))
+            for chunk in _chunks({c[1] for c in candidates}):
+                query = f"SELECT user_id FROM Users WHERE user_id IN ({','.join('?' * len(chunk))})"
+                users.update(row['user_id'] for row in conn.execute(query, chunk))
+            
+            report_date = self.repository.clock.now().strftime('%Y-%m-%d %H:%M:%S')
+            rows = []
+            pending = []
+            for index, user_id, rumour_id, report_type in candidates:
+                if rumour_id not in rumours:
+                    results[index] = {'status': 'rejected', 'reason': 'rumour_not_found'}
+                elif user_id not in users:
+                    results[index] = {'status': 'rejected', 'reason': 'user_not_found'}
+                elif rumours[rumour_id]:
+                    results[index] = {'status': 'rejected', 'reason': 'verified'}
+                else:
+                    rows.append((user_id, rumour_id, report_date, report_type))
+                    pending.append((index, user_id, rumour_id))
+            
+            # report_id เป็น AUTOINCREMENT ทุกแถวที่ insert สำเร็จจึงมี id มากกว่าค่าสูงสุดเดิม
+            last_id = conn.execute("SELECT COALESCE(MAX(report_id), 0) FROM Report").fetchone()[0]
+            conn.executemany(
+                "INSERT OR IGNORE INTO Report (user_id, rumour_id, report_date, report_type) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            inserted = {
+                (row['user_id'], row['rumour_id'])
+                for row in conn.execute("SELECT user_id, rumour_id FROM Report WHERE report_id > ?", (last_id,))
+            }
+            for index, user_id, rumour_id in pending:
+                if (user_id, rumour_id) in inserted:
+                    inserted.discard((user_id, rumour_id))
+                    results[index] = {'status': 'accepted'}
+                    affected[rumour_id] += 1
+                else:
+                    results[index] = {'status': 'duplicate'}
+            
+            # น้ำหนักความร้อนแรงของรายงานใหม่ (models/hotness.py)
+            hotness.add_reports(conn, affected, self.repository.clock.time())
+            
+            # ตรวจ panic ครั้งเดียวต่อข่าว (Rule 4.2)
+            for chunk in _chunks(affected):
+                placeholders = ','.join('?' * len(chunk))
+                query = f"""
+                    SELECT rumour_id FROM Rumour
+                    WHERE rumour_id IN ({placeholders}) AND status = 'ปกติ' AND report_count >= ?
+                """
+                panic_rumours.extend(row['rumour_id'] for row in conn.execute(query, (*chunk, Config.PANIC_THRESHOLD)))
+            for chunk in _chunks(panic_rumours):
+                conn.execute(
+                    f"UPDATE Rumour SET status = 'panic' WHERE rumour_id IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+        
+        if affected:
+            query_cache.invalidate(RUMOURS_TAG, *(rumour_tag(rumour_id) for rumour_id in affected))
+        
+        counts = {'accepted': 0, 'duplicate': 0, 'rejected': 0}
+        for result in results:
+            counts[result['status']] += 1
+        return {
+            'results': results,
+            'accepted': counts['accepted'],
+            'duplicates': counts['duplicate'],
+            'rejected': counts['rejected'],
+            'panic_rumours': sorted(panic_rumours),
+        }
+    
+    def check_duplicate_report(self, user_id, rumour_id):
         """ตรวจสอบว่าผู้ใช้เคยรายงานข่าวนี้แล้วหรือไม่"""
-        db = Database()
+        db = self.db
         query = "SELECT COUNT(*) as count FROM Report WHERE user_id = ? AND rumour_id = ?"
         result = db.fetch_one(query, (user_id, rumour_id))
         return result['count'] > 0
     
-    @staticmethod
-    def get_reports_by_rumour(rumour_id):
-        """ดึงรายงานทั้งหมดของข่าวลือ พร้อมรหัสผู้ใช้"""
-        db = Database()
-        query = """
-            SELECT rep.*, u.username, u.name
-            FROM Report rep
-            JOIN Users u ON rep.user_id = u.user_id
-            WHERE rep.rumour_id = ?
-            ORDER BY rep.report_date DESC
+    @cached(rumour_tag)
+    def get_reports_by_rumour(self, rumour_id):
+        """ดึงรายงานทั้งหมดของข่าวลือ พร้อมรหัสผู้ใช้ (Report)"""
+        db = self.db
+        return db.fetch_records(Report, _REPORTS_BY_RUMOUR, (rumour_id,))
+    
+    def iter_reports_by_rumour(self, rumour_id):
+        """เหมือน get_reports_by_rumour แต่ทยอยคืนทีละแถว (generator ไม่ผ่าน cache)"""
+        db = self.db
+        return db.iter_records(Report, _REPORTS_BY_RUMOUR, (rumour_id,))
+    
+    @cached(rumour_tag)
+    def get_reports_page(self, rumour_id, after=None, before=None, limit=None):
+        """ดึงรายงานของข่าวลือทีละหน้า เรียงจากใหม่ไปเก่า (keyset pagination)"""
+        db = self.db
+        return fetch_page(db, _REPORTS_PAGE, (rumour_id,), _REPORTS_PAGE_KEY,
+                          after=after, before=before, limit=limit, record=Report)
+    
+    def count_reports_in_windows(self, rumour_ids, seconds, now):
+        """จำนวนรายงานของแต่ละข่าวภายใน seconds[i] วินาทีก่อน now คืนค่า dict rumour_id -> [จำนวนต่อ window]
+        
+        นับจาก Report โดยตรง (index rumour_id, report_date) จึงเห็นรายงานจากทุก process - ข่าวที่ไม่มีรายงานใน window ไม่อยู่ในผล
         """
-        return db.fetch_all(query, (rumour_id,))
+        if not seconds:
+            return {}
+        starts = [datetime.fromtimestamp(now - span).strftime('%Y-%m-%d %H:%M:%S') for span in seconds]
+        oldest = min(starts)
+        db = self.db
+        counts = {}
+        for chunk in _chunks(set(rumour_ids)):
+            for rumour_id, *window_counts in db.fetch_all(_window_counts_query(len(starts), len(chunk)),
+                                                          (*starts, *chunk, oldest)):
+                counts[rumour_id] = window_counts
+        return counts
+    
+    def iter_report_times_since(self, since):
+        """ทยอยคืน (rumour_id, report_date) ของรายงานตั้งแต่เวลา since เรียงตามเวลา (ใช้ seed velocity detector)"""
+        db = self.db
+        return db.iter_records(None, _REPORT_TIMES_SINCE, (datetime.fromtimestamp(since).strftime('%Y-%m-%d %H:%M:%S'),))
+
+
+# statement ที่ Model นี้รันจริง และ index ที่ต้องถูกใช้ (database.check_query_plans ตรวจด้วย EXPLAIN QUERY PLAN)
+QUERY_PLANS = [
+    (_REPORTS_BY_RUMOUR, (12345678,), 'idx_report_rumour_date'),
+    *page_plans(_REPORTS_PAGE, (12345678,), _REPORTS_PAGE_KEY, ('2026-01-01 00:00:00', 100),
+                'idx_report_rumour_date'),
+    (_REPORT_TIMES_SINCE, ('2026-01-01 00:00:00',), 'idx_report_date'),
+    (_window_counts_query(2, 2), ('2026-01-01 08:00:00', '2026-01-01 08:50:00', 12345678, 12345679,
+                                  '2026-01-01 08:00:00'), 'idx_report_rumour_date'),
+]
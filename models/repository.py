@@ -0,0 +1,51 @@
+"""
+Repository - จุดเข้าถึงข้อมูลเดียวของระบบ
+ถือ Database (connection pool ของไฟล์ฐานข้อมูล) ไว้หนึ่งตัวและ Model ทุกตัวที่ใช้ Database นั้นร่วมกัน
+Controller ทุกตัว (main.py, app.py) และงานเบื้องหลังจึงใช้ pool, cache และ prepared statement ชุดเดียวกัน
+
+    from models import repository
+    repository.rumours.get_rumours_page()
+    repository.reports.submit_report(user_id, rumour_id, report_type)
+    repository.users.search_users('user0')
+
+SQL ที่ตายตัวของแต่ละ method สร้างไว้ครั้งเดียวตอน import (ค่าคงที่ระดับ module)
+จึงตรงกับ prepared statement ที่ sqlite3 cache ไว้ในแต่ละ connection (DB_STATEMENT_CACHE_SIZE) ทุกครั้ง
+"""
+from config.settings import Config
+from .clock import SystemClock
+from .database import Database
+from .report import ReportModel
+from .rumour import RumourModel
+from .user import UserModel
+
+
+class Repository:
+    """Model ทุกตัวของฐานข้อมูลหนึ่งไฟล์ (db_name=None = ตาม Config.DATABASE_NAME ณ ตอนใช้งาน)
+
+    clock คือเวลาปัจจุบันที่ Model ใช้ (models/clock.py ค่าเริ่มต้นคือเวลาของระบบ)
+    """
+
+    def __init__(self, db_name=None, clock=None):
+        self.db_name = db_name
+        self.clock = clock or SystemClock()
+        self._db = None
+        self.rumours = RumourModel(self)
+        self.reports = ReportModel(self)
+        self.users = UserModel(self)
+
+    @property
+    def db(self):
+        """Database ของ repository - สร้างใหม่เมื่อไฟล์ฐานข้อมูลเปลี่ยน (เช่น benchmark สลับไฟล์)
+        หรือเมื่อ pool เดิมถูกปิด (Database.close_all หรือหลัง fork ใน server.py)"""
+        db_name = self.db_name or Config.DATABASE_NAME
+        db = self._db
+        if db is None or db.db_name != db_name or db.pool.closed:
+            db = self._db = Database(db_name)
+        return db
+
+    def transaction(self):
+        """transaction ที่ Model ทุกตัวของ repository นี้ใช้ร่วมกันได้ (ดู Database.transaction)"""
+        return self.db.transaction()
+
+
+repository = Repository()
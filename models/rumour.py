@@ -1,87 +1,299 @@
 """
 RumourModel - Model สำหรับจัดการข้อมูลข่าวลือ
 """
-from .database import Database
+from config.settings import Config
+from .cache import cached, invalidate_rumour, query_cache, rumour_tag, RUMOURS_TAG
+from . import hotness
+from .database import Model
+from .ids import rumour_ids
+from .records import HotRumour, Rumour, RumourMatch, RumourSummary
+from .pagination import clamp_limit, fetch_page, page_plans
+from .report import ReportModel, _chunks
 
+SEARCH_MIN_TERM = 3  # tokenizer แบบ trigram ค้นหาในดัชนีได้เฉพาะคำที่ยาว >= 3 ตัวอักษร
 
-class RumourModel:
+
+def _search_terms(terms):
+    """แบ่งคำค้นเป็น (คำสั่ง MATCH ของ FTS5, คำสั้นที่ต้องกรองด้วย LIKE)
+    
+    คำที่ยาวพอถูกค้นในดัชนีเป็นวลี (ต้องพบทุกคำ) ส่วนคำสั้นกว่า SEARCH_MIN_TERM
+    ใช้กรองผลที่ได้จากดัชนีอีกชั้น ถ้าไม่มีคำที่ยาวพอเลยคืนค่า MATCH เป็น None
+    """
+    indexed = [term for term in terms if len(term) >= SEARCH_MIN_TERM]
+    short = [term for term in terms if len(term) < SEARCH_MIN_TERM]
+    if not indexed:
+        return None, short
+    match = ' AND '.join('"' + term.replace('"', '""') + '"' for term in indexed)
+    return match, short
+
+
+def _search_score(terms, weights, saturation):
+    """นิพจน์ SQL ของคะแนนความเกี่ยวข้อง คืนค่า (SQL, parameters)
+    
+    คะแนน = ผลรวมของ น้ำหนักคอลัมน์ x tf / (tf + saturation) ของทุกคำในทุกคอลัมน์
+    (ส่วน term frequency ของ bm25) ไม่ใช้ IDF เพราะทุกแถวที่ค้นพบมีครบทุกคำอยู่แล้ว
+    และ bm25() ของ FTS5 ต้องนับเอกสารของแต่ละคำทั้งตารางทุกครั้ง ซึ่งช้ามากเมื่อคำนั้นพบบ่อย
+    """
+    parts, params = [], []
+    for term in terms:
+        for column, weight in zip(('title', 'content', 'source'), weights):
+            text = f"lower(COALESCE(r.{column}, ''))"
+            tf = f"((length({text}) - length(replace({text}, ?, ''))) / ?)"
+            parts.append(f"{weight} * {tf} / ({tf} + {saturation})")
+            params.extend((term.lower(), float(len(term))) * 2)
+    return ' + '.join(parts), params
+
+
+def _rumour_problem(title, content, source):
+    """ตรวจข้อมูลข่าวใหม่ คืนค่าเหตุผลที่ไม่รับ (None = ถูกต้อง)"""
+    if not isinstance(title, str) or not isinstance(source, str) or not isinstance(content, (str, type(None))):
+        return 'invalid_item'
+    if not title:
+        return 'missing_title'
+    if not source:
+        return 'missing_source'
+    if (len(title) > Config.RUMOUR_TITLE_MAX_LENGTH or len(source) > Config.RUMOUR_SOURCE_MAX_LENGTH
+            or len(content or '') > Config.RUMOUR_CONTENT_MAX_LENGTH):
+        return 'too_long'
+    return None
+
+
+def _like_pattern(term):
+    """รูปแบบ LIKE ที่หาคำนี้ตรงตัว (escape % _ และ \\)"""
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+_ALL_RUMOURS = f"SELECT {RumourSummary.select()} FROM Rumour ORDER BY hotness DESC, created_date DESC"
+_PANIC_RUMOURS = f"SELECT {RumourSummary.select()} FROM Rumour WHERE status = 'panic' ORDER BY report_count DESC"
+_RUMOURS_PAGE = f"SELECT {HotRumour.select()} FROM Rumour WHERE {{keyset}} ORDER BY {{order}} LIMIT ?"
+_RUMOURS_PAGE_KEY = ('hotness', 'created_date', 'rumour_id')
+_RUMOUR_BY_ID = f"""
+    SELECT {Rumour.select('r')}
+    FROM Rumour r
+    LEFT JOIN Users u ON r.verified_by = u.user_id
+    WHERE r.rumour_id = ?
+"""
+
+
+class RumourModel(Model):
     """Model สำหรับข่าวลือ"""
     
-    @staticmethod
-    def calculate_credibility_score(rumour_id):
-        """คำนวณคะแนนความน่าเชื่อถือจากข้อมูลจริง
+    # น้ำหนักของคอลัมน์ในคะแนนค้นหา ตามลำดับคอลัมน์ของ RumourSearch (title, content, source)
+    SEARCH_WEIGHTS = (10.0, 1.0, 2.0)
+    SEARCH_SATURATION = 1.2  # ค่า k1 ของ bm25 - คำที่ซ้ำหลายครั้งในคอลัมน์เดียวได้คะแนนเพิ่มน้อยลงเรื่อยๆ
+    
+    def calculate_credibility_score(self, rumour_id):
+        """คำนวณคะแนนความน่าเชื่อถือจากตัวนับรายงานของข่าว
         สูตร: (จำนวนผู้รายงานว่าน่าเชื่อถือ ÷ จำนวนผู้รายงานทั้งหมด) × 100
         """
-        db = Database()
-        # นับจำนวนรายงานทั้งหมด
-        query_total = "SELECT COUNT(*) as total FROM Report WHERE rumour_id = ?"
-        total_result = db.fetch_one(query_total, (rumour_id,))
-        total_reports = total_result['total'] if total_result else 0
-        
-        if total_reports == 0:
+        db = self.db
+        query = "SELECT report_count, credible_count FROM Rumour WHERE rumour_id = ?"
+        result = db.fetch_one(query, (rumour_id,))
+        if not result:
+            return 0.0
+        return self.score_from_counts(result['credible_count'], result['report_count'])
+    
+    @staticmethod
+    def score_from_counts(credible_reports, total_reports):
+        """คำนวณคะแนนจากจำนวนรายงาน "น่าเชื่อถือ" และจำนวนรายงานทั้งหมด"""
+        if not total_reports:
             return 0.0
-        
-        # นับจำนวนรายงานที่เป็น "น่าเชื่อถือ"
-        query_credible = "SELECT COUNT(*) as credible FROM Report WHERE rumour_id = ? AND report_type = 'น่าเชื่อถือ'"
-        credible_result = db.fetch_one(query_credible, (rumour_id,))
-        credible_reports = credible_result['credible'] if credible_result else 0
-        
-        # คำนวณคะแนน
         score = (credible_reports / total_reports) * 100
         return round(score, 2)
     
-    @staticmethod
-    def update_credibility_score(rumour_id):
+    def update_credibility_score(self, rumour_id):
         """อัปเดตคะแนนความน่าเชื่อถือในฐานข้อมูล"""
-        score = RumourModel.calculate_credibility_score(rumour_id)
-        db = Database()
-        query = "UPDATE Rumour SET credibility_score = ? WHERE rumour_id = ?"
-        db.execute_query(query, (score, rumour_id))
-    
-    @staticmethod
-    def get_all_rumours():
-        """ดึงข่าวลือทั้งหมด เรียงตามจำนวนรายงาน (ความร้อนแรง)"""
-        db = Database()
+        db = self.db
         query = """
-            SELECT r.*, COUNT(rep.report_id) as report_count
-            FROM Rumour r
-            LEFT JOIN Report rep ON r.rumour_id = rep.rumour_id
-            GROUP BY r.rumour_id
-            ORDER BY report_count DESC, r.created_date DESC
+            UPDATE Rumour
+            SET credibility_score = CASE WHEN report_count > 0
+                THEN ROUND(credible_count * 100.0 / report_count, 2)
+                ELSE 0.0 END
+            WHERE rumour_id = ?
         """
-        return db.fetch_all(query)
+        db.execute_query(query, (rumour_id,))
+        invalidate_rumour(rumour_id)
     
-    @staticmethod
-    def get_rumour_by_id(rumour_id):
-        """ดึงข่าวลือตาม ID"""
-        db = Database()
-        query = """
-            SELECT r.*, u.name as verifier_name, u.verifier_code
-            FROM Rumour r
-            LEFT JOIN Users u ON r.verified_by = u.user_id
-            WHERE r.rumour_id = ?
+    def create_rumour(self, title, source, content=None):
+        """สร้างข่าวลือใหม่หนึ่งข่าว คืนค่ารหัสข่าว (ValueError พร้อมเหตุผล ถ้าข้อมูลไม่ถูกต้อง)"""
+        result = self.create_rumours([(title, content, source)])['results'][0]
+        if result['status'] != 'created':
+            raise ValueError(result['reason'])
+        return result['rumour_id']
+    
+    def create_rumours(self, items):
+        """สร้างข่าวลือหลายข่าวใน transaction เดียว
+        
+        items คือรายการ (title, content, source) - content เป็น None ได้, ตัดช่องว่างหัวท้ายให้
+        รหัสข่าวมาจาก rumour_ids (models/ids.py) ไม่ชนกันแม้หลาย process สร้างพร้อมกัน
+        
+        คืนค่า dict:
+            results: ผลของแต่ละ item ตามลำดับ {'status': 'created', 'rumour_id': ...}
+                     หรือ {'status': 'rejected', 'reason': 'invalid_item' | 'missing_title' | 'missing_source' | 'too_long'}
+            created, rejected: จำนวนแต่ละผล
         """
-        return db.fetch_one(query, (rumour_id,))
+        results = []
+        rows = []
+        for item in items:
+            title, content, source = item if isinstance(item, (tuple, list)) and len(item) == 3 else (None,) * 3
+            title, source = (value.strip() if isinstance(value, str) else value for value in (title, source))
+            problem = _rumour_problem(title, content, source)
+            if problem:
+                results.append({'status': 'rejected', 'reason': problem})
+            else:
+                results.append({'status': 'created'})
+                rows.append((title, content, source))
+        
+        if rows:
+            # จองรหัสก่อนเริ่ม transaction (การจองต้อง commit แยก ไม่ถูก rollback ไปกับการ insert)
+            db = self.db
+            ids = rumour_ids.allocate(len(rows), db.db_name)
+            created_date = self.repository.clock.now().strftime('%Y-%m-%d %H:%M:%S')
+            # ข่าวใหม่ยังไม่มีรายงาน ความน่าเชื่อถือจึงเป็น 0 (ค่า default 50.0 ของ schema จะถูกนับรวมใน credibility_sum)
+            with db.transaction() as conn:
+                conn.executemany(
+                    "INSERT INTO Rumour (rumour_id, title, content, source, created_date, credibility_score) "
+                    "VALUES (?, ?, ?, ?, ?, 0.0)",
+                    [(rumour_id, *row, created_date) for rumour_id, row in zip(ids, rows)],
+                )
+            new_ids = iter(ids)
+            for result in results:
+                if result['status'] == 'created':
+                    result['rumour_id'] = next(new_ids)
+            query_cache.invalidate(RUMOURS_TAG, *(rumour_tag(rumour_id) for rumour_id in ids))
+        
+        return {
+            'results': results,
+            'created': len(rows),
+            'rejected': len(results) - len(rows),
+        }
     
-    @staticmethod
-    def get_rumour_report_count(rumour_id):
+    @cached(RUMOURS_TAG)
+    def get_all_rumours(self):
+        """ดึงข่าวลือทั้งหมด (RumourSummary ไม่มี content) เรียงตามความร้อนแรง (ดู models/hotness.py)"""
+        db = self.db
+        return db.fetch_records(RumourSummary, _ALL_RUMOURS)
+    
+    def iter_rumours(self):
+        """เหมือน get_all_rumours แต่ทยอยคืนทีละแถว (generator ไม่ผ่าน cache) สำหรับรายการขนาดใหญ่"""
+        db = self.db
+        return db.iter_records(RumourSummary, _ALL_RUMOURS)
+    
+    @cached(RUMOURS_TAG)
+    def get_rumours_page(self, after=None, before=None, limit=None):
+        """ดึงข่าวลือทีละหน้า เรียงตามความร้อนแรง วันที่สร้าง และรหัสข่าว (keyset pagination)
+        
+        อ่านจาก index Rumour(hotness, created_date) ตามลำดับ หน้าแรกคือ top-K ของข่าวที่ร้อนแรงที่สุด
+        โดยไม่ต้องเรียงข่าวทั้งหมด แต่ละแถวเป็น HotRumour (มีคอลัมน์ hotness สำหรับ cursor)
+        """
+        db = self.db
+        return fetch_page(db, _RUMOURS_PAGE, (), _RUMOURS_PAGE_KEY,
+                          after=after, before=before, limit=limit, record=HotRumour)
+    
+    def rebuild_hotness(self):
+        """คำนวณความร้อนแรงของทุกข่าวใหม่จากรายงานล่าสุด (job เบื้องหลังเรียกเป็นระยะ ดู models/hotness.py)"""
+        return hotness.refresh(self.db)
+    
+    @cached(RUMOURS_TAG)
+    def search(self, text, after=None, before=None, limit=None):
+        """ค้นหาข่าวลือจาก title, content และ source ผ่านดัชนี RumourSearch (FTS5 trigram)
+        
+        เรียงตามความเกี่ยวข้อง (ความถี่ของคำ ให้น้ำหนัก title > source > content) แล้วตามรหัสข่าว
+        แบ่งหน้าแบบ keyset เหมือน get_rumours_page แต่ละแถวเป็น RumourMatch (มีคอลัมน์ score เพิ่ม)
+        คำค้นต้องมีอย่างน้อยหนึ่งคำที่ยาว >= SEARCH_MIN_TERM ตัวอักษร ไม่เช่นนั้นคืนค่าหน้าว่าง
+        
+        จัดอันดับเฉพาะ SEARCH_MAX_CANDIDATES ข่าวแรกที่พบในดัชนี เวลาค้นหาจึงไม่ขึ้นกับจำนวนข่าว
+        ถ้าพบมากกว่านั้น dict ที่คืนค่าจะมี truncated = True (ควรให้ผู้ใช้เพิ่มคำค้น)
+        """
+        terms = list(dict.fromkeys((text or '').split()))
+        match, short = _search_terms(terms)
+        if match is None:
+            return {'items': [], 'next_cursor': None, 'prev_cursor': None,
+                    'limit': clamp_limit(limit), 'truncated': False}
+        
+        filters = ''.join(
+            " AND (RumourSearch.title || char(10) || COALESCE(RumourSearch.content, '') || char(10)"
+            " || RumourSearch.source) LIKE ? ESCAPE '\\'"
+            for _ in short
+        )
+        candidates = f"""
+            SELECT rowid AS hit FROM RumourSearch
+            WHERE RumourSearch MATCH ?{filters}
+            ORDER BY rowid DESC LIMIT ?
+        """
+        match_params = [match] + [_like_pattern(term) for term in short]
+        cap = Config.SEARCH_MAX_CANDIDATES
+        score, score_params = _search_score(terms, self.SEARCH_WEIGHTS, self.SEARCH_SATURATION)
+        
+        db = self.db
+        found = db.fetch_one(f"SELECT COUNT(*) AS found FROM ({candidates})", match_params + [cap + 1])['found']
+        query = f"""
+            SELECT * FROM (
+                SELECT {RumourSummary.select('r')}, ROUND({score}, 6) AS score
+                FROM ({candidates}) AS candidates
+                JOIN Rumour r ON r.rumour_id = candidates.hit
+            )
+            WHERE {{keyset}} ORDER BY {{order}} LIMIT ?
+        """
+        page = fetch_page(db, query, score_params + match_params + [cap], ('score', 'rumour_id'),
+                          after=after, before=before, limit=limit, record=RumourMatch)
+        page['truncated'] = found > cap
+        return page
+    
+    @cached(rumour_tag)
+    def get_rumour_by_id(self, rumour_id):
+        """ดึงข่าวลือตาม ID"""
+        db = self.db
+        return db.fetch_record(Rumour, _RUMOUR_BY_ID, (rumour_id,))
+    
+    def get_rumour_report_count(self, rumour_id):
         """นับจำนวนรายงานของข่าวลือ"""
-        db = Database()
-        query = "SELECT COUNT(*) as count FROM Report WHERE rumour_id = ?"
+        db = self.db
+        query = "SELECT report_count FROM Rumour WHERE rumour_id = ?"
         result = db.fetch_one(query, (rumour_id,))
-        return result['count'] if result else 0
+        return result['report_count'] if result else 0
     
-    @staticmethod
-    def update_status_to_panic(rumour_id):
+    def update_status_to_panic(self, rumour_id):
         """เปลี่ยนสถานะเป็น panic"""
-        db = Database()
+        db = self.db
         query = "UPDATE Rumour SET status = 'panic' WHERE rumour_id = ?"
         db.execute_query(query, (rumour_id,))
+        invalidate_rumour(rumour_id)
     
-    @staticmethod
-    def verify_rumour(rumour_id, verification_result, verified_by):
+    def apply_panic_threshold(self, rumour_ids, velocity_ids=()):
+        """เปลี่ยนข่าวที่ถึงเกณฑ์เป็น panic ทีละชุดใน transaction เดียว (Rule 4.2)
+        
+        ข่าวถึงเกณฑ์เมื่อมีรายงานรวม >= PANIC_THRESHOLD หรืออยู่ใน velocity_ids
+        (ข่าวที่ถูกรายงานเร็วถึงเกณฑ์ของ PANIC_WINDOWS)
+        คืนค่ารายการแถว (rumour_id, title, report_count, credibility_score) ของข่าวที่เพิ่งเปลี่ยนสถานะ
+        """
+        velocity_ids = set(velocity_ids)
+        changed = []
+        db = self.db
+        with db.transaction() as conn:
+            for chunk in _chunks(set(rumour_ids) | velocity_ids):
+                placeholders = ','.join('?' * len(chunk))
+                rows = [
+                    row for row in conn.execute(f"""
+                        SELECT rumour_id, title, report_count, credibility_score FROM Rumour
+                        WHERE rumour_id IN ({placeholders}) AND status = 'ปกติ'
+                    """, chunk)
+                    if row['report_count'] >= Config.PANIC_THRESHOLD or row['rumour_id'] in velocity_ids
+                ]
+                if rows:
+                    ids = [row['rumour_id'] for row in rows]
+                    conn.execute(
+                        f"UPDATE Rumour SET status = 'panic' WHERE rumour_id IN ({','.join('?' * len(ids))})", ids)
+                    changed.extend(rows)
+        
+        if changed:
+            query_cache.invalidate(RUMOURS_TAG, *(rumour_tag(row['rumour_id']) for row in changed))
+        return changed
+    
+    def verify_rumour(self, rumour_id, verification_result, verified_by):
         """ตรวจสอบและยืนยันข่าวลือโดยผู้ตรวจสอบ"""
-        db = Database()
+        db = self.db
         query = """
             UPDATE Rumour 
             SET is_verified = 1, 
@@ -90,17 +302,59 @@ class RumourModel:
             WHERE rumour_id = ?
         """
         db.execute_query(query, (verification_result, verified_by, rumour_id))
+        invalidate_rumour(rumour_id)
     
-    @staticmethod
-    def get_panic_rumours():
-        """ดึงข่าวลือที่เข้าสู่สถานะ panic"""
-        db = Database()
-        query = """
-            SELECT r.*, COUNT(rep.report_id) as report_count
-            FROM Rumour r
-            LEFT JOIN Report rep ON r.rumour_id = rep.rumour_id
-            WHERE r.status = 'panic'
-            GROUP BY r.rumour_id
-            ORDER BY report_count DESC
+    @cached(RUMOURS_TAG)
+    def get_panic_rumours(self):
+        """ดึงข่าวลือที่เข้าสู่สถานะ panic (RumourSummary)"""
+        db = self.db
+        return db.fetch_records(RumourSummary, _PANIC_RUMOURS)
+    
+    def iter_panic_rumours(self):
+        """เหมือน get_panic_rumours แต่ทยอยคืนทีละแถว (generator ไม่ผ่าน cache)"""
+        db = self.db
+        return db.iter_records(RumourSummary, _PANIC_RUMOURS)
+    
+    @cached(RUMOURS_TAG)
+    def get_dashboard_stats(self):
+        """ดึงสถิติรวมของทั้งระบบจากตาราง Stats ที่ trigger ดูแลให้ (query เดียว ไม่ขึ้นกับจำนวนข่าว)
+        
+        คืนค่า dict: total_rumours, verified_count, pending_count, panic_count,
+        report_count, report_types (จำนวนรายงานแยกตามประเภท), average_credibility
         """
-        return db.fetch_all(query)
+        db = self.db
+        values = {row['name']: row['value'] for row in db.fetch_all("SELECT name, value FROM Stats")}
+        total = int(values.get('rumours', 0))
+        verified = int(values.get('verified_rumours', 0))
+        credibility_sum = values.get('credibility_sum', 0.0)
+        return {
+            'total_rumours': total,
+            'verified_count': verified,
+            'pending_count': total - verified,
+            'panic_count': int(values.get('panic_rumours', 0)),
+            'report_count': int(values.get('reports', 0)),
+            'report_types': {
+                report_type: int(values.get(f'reports:{report_type}', 0))
+                for report_type in ReportModel.REPORT_TYPES
+            },
+            'average_credibility': round(credibility_sum / total, 2) if total else 0.0,
+        }
+    
+    def get_data_version(self):
+        """ดึงเวอร์ชันข้อมูลข่าวทั้งระบบ (เพิ่มขึ้นทุกครั้งที่ข่าวหรือรายงานเปลี่ยน) และเวลาแก้ไขล่าสุด (unix time)"""
+        db = self.db
+        rows = db.fetch_all("SELECT name, value FROM Stats WHERE name IN ('data_version', 'last_modified')")
+        values = {row['name']: row['value'] for row in rows}
+        return {
+            'version': int(values.get('data_version', 0)),
+            'last_modified': values.get('last_modified'),
+        }
+
+
+# statement ที่ Model นี้รันจริง และ index ที่ต้องถูกใช้ (database.check_query_plans ตรวจด้วย EXPLAIN QUERY PLAN)
+QUERY_PLANS = [
+    (_PANIC_RUMOURS, (), 'idx_rumour_status_count'),
+    (_ALL_RUMOURS, (), 'idx_rumour_hotness'),
+    *page_plans(_RUMOURS_PAGE, (), _RUMOURS_PAGE_KEY, (1.5, '2026-01-01 00:00:00', 12345678),
+                'idx_rumour_hotness'),
+]
@@ -1,29 +1,111 @@
 """
 UserModel - Model สำหรับจัดการข้อมูลผู้ใช้
 """
-from .database import Database
+import sys
+from config.settings import Config
+from .cache import cached, USERS_TAG
+from .database import Model
+from .records import User
 
 
-class UserModel:
+def _prefix_range(prefix):
+    """ช่วง [prefix, ถัดจาก prefix) สำหรับค้นหาด้วย index แบบ range (แทน LIKE 'prefix%')
+    
+    code point สูงสุด (U+10FFFF) ท้าย prefix ไม่มีค่าถัดไป จึงเลื่อนตัวก่อนหน้าแทน
+    ถ้าทั้ง prefix เป็น U+10FFFF คืนค่าขอบบน None (ช่วงเปิด >= prefix)
+    """
+    head = prefix.rstrip(chr(sys.maxunicode))
+    if not head:
+        return prefix, None
+    return prefix, head[:-1] + chr(ord(head[-1]) + 1)
+
+
+_ALL_USERS = f"SELECT {User.select()} FROM Users ORDER BY user_id"
+_VERIFIERS = f"SELECT {User.select()} FROM Users WHERE verifier_code IS NOT NULL ORDER BY username"
+_USER_BY_ID = f"SELECT {User.select()} FROM Users WHERE user_id = ?"
+
+
+def _search_query(column, prefix, condition):
+    """SQL และ parameter (ไม่รวม LIMIT) ของการค้นหาผู้ใช้ที่ column ขึ้นต้นด้วย prefix ('' = ทุกคน)"""
+    if prefix:
+        lower, upper = _prefix_range(prefix)
+        if upper is None:
+            where, params = f"{column} >= ?", (lower,)
+        else:
+            where, params = f"{column} >= ? AND {column} < ?", (lower, upper)
+    else:
+        where, params = '1', ()
+    return f"SELECT {User.select()} FROM Users WHERE {where} AND {condition} ORDER BY {column} LIMIT ?", params
+
+
+class UserModel(Model):
     """Model สำหรับผู้ใช้งาน"""
     
-    @staticmethod
-    def get_all_users():
+    ROLES = {
+        'reporter': "role = 'ผู้ใช้ทั่วไป'",
+        'verifier': "verifier_code IS NOT NULL",
+    }
+    
+    @cached(USERS_TAG)
+    def get_all_users(self):
         """ดึงผู้ใช้ทั้งหมด"""
-        db = Database()
-        query = "SELECT * FROM Users ORDER BY user_id"
-        return db.fetch_all(query)
+        db = self.db
+        return db.fetch_records(User, _ALL_USERS)
+    
+    def iter_users(self):
+        """เหมือน get_all_users แต่ทยอยคืนทีละแถว (generator ไม่ผ่าน cache)"""
+        db = self.db
+        return db.iter_records(User, _ALL_USERS)
     
-    @staticmethod
-    def get_verifiers():
+    @cached(USERS_TAG)
+    def get_verifiers(self):
         """ดึงข้อมูลผู้ตรวจสอบทั้งหมด"""
-        db = Database()
-        query = "SELECT * FROM Users WHERE verifier_code IS NOT NULL ORDER BY username"
-        return db.fetch_all(query)
+        db = self.db
+        return db.fetch_records(User, _VERIFIERS)
     
-    @staticmethod
-    def get_user_by_id(user_id):
+    def get_user_by_id(self, user_id):
         """ดึงผู้ใช้ตาม ID"""
-        db = Database()
-        query = "SELECT * FROM Users WHERE user_id = ?"
-        return db.fetch_one(query, (user_id,))
+        db = self.db
+        return db.fetch_record(User, _USER_BY_ID, (user_id,))
+    
+    @cached(USERS_TAG)
+    def search_users(self, query, role=None, limit=None):
+        """ค้นหาผู้ใช้จากคำขึ้นต้นของ username หรือชื่อ (ใช้ index ของแต่ละคอลัมน์ ไม่ขึ้นกับจำนวนผู้ใช้)
+        
+        role: None, 'reporter' (ผู้ใช้ทั่วไป) หรือ 'verifier' (ผู้ตรวจสอบ)
+        เทียบตรงตัวพิมพ์ (เหมือน index ของ username และ name) ถ้า query เป็นตัวเลขจะรวมผู้ใช้ที่มี user_id ตรงกันด้วย
+        คืนค่ารายการผู้ใช้ไม่เกิน limit คน เรียงตาม username
+        """
+        limit = min(limit or Config.USER_SEARCH_LIMIT, Config.USER_SEARCH_LIMIT)
+        condition = self.ROLES.get(role, '1')
+        query = (query or '').strip()
+        db = self.db
+        
+        found = {}
+        if query.isdigit():
+            for row in db.fetch_records(User, f"SELECT {User.select()} FROM Users WHERE user_id = ? AND {condition}",
+                                        (int(query),)):
+                found[row['user_id']] = row
+        searches = [('username', query), ('name', query)] if query else [('username', '')]
+        for column, prefix in searches:
+            sql, params = _search_query(column, prefix, condition)
+            rows = db.fetch_records(User, sql, (*params, limit))
+            for row in rows:
+                found.setdefault(row['user_id'], row)
+        return sorted(found.values(), key=lambda row: row['username'])[:limit]
+
+
+def _search_plan(column, prefix, role, index):
+    sql, params = _search_query(column, prefix, UserModel.ROLES.get(role, '1'))
+    return sql, (*params, Config.USER_SEARCH_LIMIT), index
+
+
+# statement ที่ Model นี้รันจริง และ index ที่ต้องถูกใช้ (database.check_query_plans ตรวจด้วย EXPLAIN QUERY PLAN)
+QUERY_PLANS = [
+    (_VERIFIERS, (), 'idx_users_verifiers'),
+    _search_plan('username', 'user00', 'reporter', 'idx_users_username'),
+    _search_plan('username', 'user00', None, 'idx_users_username'),
+    _search_plan('name', 'สม', None, 'idx_users_name'),
+    _search_plan('name', 'สม', 'verifier', 'idx_users_name'),
+    _search_plan('name', chr(sys.maxunicode), None, 'idx_users_name'),
+]
@@ -0,0 +1,190 @@
+"""
+Velocity - ตรวจความเร็วของการรายงาน (N รายงานภายใน M วินาที) แบบ sliding window
+แต่ละข่าวมี ring buffer ของตัวนับรายช่วงเวลา (bucket) ร่วมกันทุก window
+และเก็บผลรวมของแต่ละ window ไว้ จึงบันทึกรายงานหนึ่งครั้งเป็น O(จำนวน window) ไม่ขึ้นกับจำนวนรายงาน
+
+ขอบ window ละเอียดเท่ากับขนาด bucket (PANIC_BUCKET_SECONDS)
+
+ตัวนับในหน่วยความจำเห็นเฉพาะรายงานที่ process นั้นรับ - เมื่อหลาย process รับรายงาน (server.py --workers > 1)
+ใช้ ReportWindows ที่นับจากตาราง Report แทน
+"""
+import threading
+import time
+from datetime import datetime
+from config.settings import Config
+
+
+class _RumourCounter:
+    """ring buffer ของตัวนับรายงานต่อ bucket ของข่าวหนึ่งข่าว"""
+
+    __slots__ = ('buckets', 'head', 'sums')
+
+    def __init__(self, size, head, windows):
+        self.buckets = [0] * size
+        self.head = head  # เลข bucket (นับจาก epoch) ล่าสุดที่อยู่ใน ring
+        self.sums = [0] * windows
+
+
+class VelocityDetector:
+    """นับรายงานในหลาย sliding window ต่อข่าว และบอกว่าข่าวใดเร็วถึงเกณฑ์ panic"""
+
+    def __init__(self, windows=None, bucket_seconds=None):
+        windows = Config.PANIC_WINDOWS if windows is None else windows
+        self.bucket_seconds = bucket_seconds or Config.PANIC_BUCKET_SECONDS
+        # (เกณฑ์จำนวนรายงาน, จำนวน bucket ของ window)
+        self.windows = [
+            (threshold, max(1, -(-seconds // self.bucket_seconds)))
+            for threshold, seconds in windows
+        ]
+        self.size = max((span for _, span in self.windows), default=1)
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.windows)
+
+    @property
+    def span(self):
+        """ความยาว (วินาที) ของ window ที่ยาวที่สุด"""
+        return self.size * self.bucket_seconds
+
+    def _bucket(self, timestamp):
+        return int(timestamp // self.bucket_seconds)
+
+    def _advance(self, counter, bucket):
+        """เลื่อน ring ไปถึง bucket (ลบ bucket ที่หลุดออกจากแต่ละ window ออกจากผลรวม)"""
+        steps = bucket - counter.head
+        if steps >= self.size:
+            counter.buckets = [0] * self.size
+            counter.sums = [0] * len(self.windows)
+            counter.head = bucket
+            return
+        buckets, sums, size = counter.buckets, counter.sums, self.size
+        for head in range(counter.head + 1, bucket + 1):
+            for index, (_, span) in enumerate(self.windows):
+                sums[index] -= buckets[(head - span) % size]
+            buckets[head % size] = 0
+        counter.head = bucket
+
+    def record(self, rumour_id, timestamp=None):
+        """บันทึกรายงานหนึ่งครั้ง คืนค่า True ถ้ามี window ใดถึงเกณฑ์"""
+        if not self.windows:
+            return False
+        bucket = self._bucket(time.time() if timestamp is None else timestamp)
+        with self._lock:
+            counter = self._counters.get(rumour_id)
+            if counter is None:
+                counter = self._counters[rumour_id] = _RumourCounter(self.size, bucket, len(self.windows))
+            if bucket > counter.head:
+                self._advance(counter, bucket)
+            age = counter.head - bucket
+            if age >= self.size:
+                return False  # เก่ากว่า window ที่ยาวที่สุด
+            counter.buckets[bucket % self.size] += 1
+            over = False
+            for index, (threshold, span) in enumerate(self.windows):
+                if age < span:
+                    counter.sums[index] += 1
+                    over = over or counter.sums[index] >= threshold
+            return over
+
+    def rates(self, rumour_id, now=None):
+        """จำนวนรายงานในแต่ละ window ณ เวลาปัจจุบัน"""
+        with self._lock:
+            counter = self._counters.get(rumour_id)
+            if counter is None:
+                return [0] * len(self.windows)
+            bucket = self._bucket(time.time() if now is None else now)
+            if bucket > counter.head:
+                self._advance(counter, bucket)
+            return list(counter.sums)
+
+    def prune(self, now=None):
+        """ลบตัวนับของข่าวที่ไม่มีรายงานเลยในช่วง window ที่ยาวที่สุด"""
+        oldest = self._bucket(time.time() if now is None else now) - self.size
+        with self._lock:
+            stale = [rumour_id for rumour_id, counter in self._counters.items() if counter.head <= oldest]
+            for rumour_id in stale:
+                del self._counters[rumour_id]
+        return len(stale)
+
+    def over(self, rumour_ids, now=None):
+        """ข่าวที่ถึงเกณฑ์ - ตรวจไปแล้วตอน record จึงไม่มีเพิ่ม (ดู ReportWindows.over)"""
+        return set()
+
+    def clear(self):
+        """ลบตัวนับของทุกข่าว"""
+        with self._lock:
+            self._counters.clear()
+
+    def seed(self, report_times):
+        """โหลดรายงานย้อนหลัง (rumour_id, report_date) คืนค่ารหัสข่าวที่ถึงเกณฑ์อยู่แล้ว"""
+        over = set()
+        for rumour_id, report_date in report_times:
+            timestamp = datetime.strptime(report_date, '%Y-%m-%d %H:%M:%S').timestamp()
+            if self.record(rumour_id, timestamp):
+                over.add(rumour_id)
+        return over
+
+    def seed_since(self, now=None):
+        """เวลาเริ่มต้นของรายงานที่ต้องโหลดตอนเริ่มระบบ (ครอบคลุม window ที่ยาวที่สุด)"""
+        return (time.time() if now is None else now) - self.span
+
+    def __len__(self):
+        return len(self._counters)
+
+
+class ReportWindows:
+    """เกณฑ์ความเร็วแบบนับจาก Report.report_date ในฐานข้อมูล (ใช้แทน VelocityDetector เมื่อมีหลาย process)
+    
+    ไม่เก็บสถานะในหน่วยความจำ - ตรวจข่าวทั้งชุดที่ได้รับรายงานด้วย query เดียวตอน over()
+    จึงเห็นรายงานจากทุก worker แต่ไม่ตรวจย้อนหลังตอนเริ่มระบบ (รายงานถัดไปของข่าวนั้นจะถูกตรวจตามปกติ)
+    """
+
+    def __init__(self, repository, windows=None):
+        self.repository = repository
+        self.windows = list(Config.PANIC_WINDOWS if windows is None else windows)
+
+    @property
+    def enabled(self):
+        return bool(self.windows)
+
+    @property
+    def span(self):
+        return max((seconds for _, seconds in self.windows), default=0)
+
+    def record(self, rumour_id, timestamp=None):
+        return False  # รายงานอยู่ในตาราง Report แล้ว
+
+    def over(self, rumour_ids, now=None):
+        """รหัสข่าวใน rumour_ids ที่มี window ใดถึงเกณฑ์ ณ เวลา now"""
+        if not self.windows or not rumour_ids:
+            return set()
+        counts = self.repository.reports.count_reports_in_windows(
+            rumour_ids, [seconds for _, seconds in self.windows], time.time() if now is None else now)
+        return {
+            rumour_id for rumour_id, window_counts in counts.items()
+            if any(count >= threshold for count, (threshold, _) in zip(window_counts, self.windows))
+        }
+
+    def rates(self, rumour_id, now=None):
+        """จำนวนรายงานในแต่ละ window ณ เวลาปัจจุบัน"""
+        counts = self.repository.reports.count_reports_in_windows(
+            [rumour_id], [seconds for _, seconds in self.windows], time.time() if now is None else now)
+        return counts.get(rumour_id, [0] * len(self.windows))
+
+    def prune(self, now=None):
+        return 0
+
+    def clear(self):
+        pass
+
+    def seed(self, report_times):
+        return set()
+
+    def seed_since(self, now=None):
+        return time.time() if now is None else now
+
+    def __len__(self):
+        return 0
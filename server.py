@@ -0,0 +1,377 @@
+"""
+Server - prefork server สำหรับใช้งานจริง (process แม่หนึ่งตัวดูแล worker หลาย process แบบ gunicorn)
+
+    python server.py serve                         (worker = จำนวน CPU, ที่ Config.HOST:Config.PORT)
+    python server.py serve --workers 4 --port 8000 --db /srv/rumor_tracking.db
+    python server.py serve --asgi                  (worker แต่ละตัวรัน asgi.py บน uvicorn)
+
+- process แม่เปิด socket ที่ worker ทุกตัวใช้รับการเชื่อมต่อร่วมกัน แล้ว import main.py (migrate, route)
+  และ compile template ทั้งหมดก่อน fork - worker เริ่มรับ request ได้ทันทีและใช้หน่วยความจำส่วนนี้ร่วมกัน (copy-on-write)
+- ก่อน fork process แม่หยุด thread เบื้องหลังและปิด connection SQLite ทั้งหมด worker จึงเปิด connection
+  ของตัวเองหลัง fork เสมอ (ไม่มี handle ของ SQLite ที่ใช้ร่วมกันข้าม process)
+- worker แต่ละตัวเริ่ม panic worker / report batcher ของตัวเอง และ worker ตัวแรกเป็นผู้ checkpoint WAL
+  และคำนวณความร้อนแรงของข่าวใหม่เป็นระยะ
+- worker ที่ตายจะถูกสร้างใหม่อัตโนมัติ
+
+สัญญาณที่ส่งให้ process แม่:
+    SIGHUP           reload: สร้าง worker ชุดใหม่ แล้วให้ชุดเดิมตอบ request ที่ค้างจนเสร็จก่อนออก
+                     (โค้ดที่ preload ไว้ไม่ถูกโหลดใหม่ - แก้โค้ดแล้วต้องเริ่ม server ใหม่)
+    SIGTERM/SIGINT   หยุดแบบ graceful (รอ worker ไม่เกิน Config.SERVER_GRACEFUL_TIMEOUT วินาที)
+    SIGQUIT          หยุดทันที
+
+ข้อมูลในหน่วยความจำแยกกันในแต่ละ worker:
+- query cache ล้างตัวเองเมื่อ data_version ในฐานข้อมูลเปลี่ยน (QueryCache.sync) จึงไม่เห็นข้อมูลเก่า
+- เกณฑ์ความเร็ว (PANIC_WINDOWS) นับจาก Report ในฐานข้อมูล (ReportWindows) แทนตัวนับในหน่วยความจำของแต่ละ worker
+  ซึ่งเห็นรายงานเพียงประมาณ 1/N
+- /events/panic ได้รับ event จาก worker ที่รับการเชื่อมต่อนั้นเท่านั้น และ /metrics เป็นตัวนับของ worker ที่ตอบ
+"""
+import argparse
+import errno
+import gc
+import logging
+import os
+import select
+import signal
+import socket
+import sys
+import threading
+import time
+from config.settings import Config
+
+logger = logging.getLogger('server')
+
+WORKER_SIGNALS = (signal.SIGHUP, signal.SIGQUIT, signal.SIGCHLD)
+RESPAWN_BACKOFF_MAX = 30.0  # วินาทีสูงสุดที่รอก่อนสร้าง worker ที่ตายตั้งแต่เริ่มใหม่
+
+
+def default_workers():
+    """จำนวน worker ค่าเริ่มต้น - Config.SERVER_WORKERS หรือจำนวน CPU ที่ process นี้ใช้ได้"""
+    if Config.SERVER_WORKERS:
+        return Config.SERVER_WORKERS
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def preload(use_asgi=False, workers=1):
+    """import app และ compile template ใน process แม่ แล้วปล่อยทรัพยากรที่ห้ามติดไปกับ fork คืนค่า app ที่ worker ใช้"""
+    import main
+    from fragments import request_data_version
+    from models import Database, panic_worker, query_cache, report_batcher
+    from models.database import stop_checkpointers
+    from models.hotness import stop_hotness_jobs
+    from models.velocity import ReportWindows
+
+    flask_app = main.app
+    for name in flask_app.jinja_env.list_templates():
+        flask_app.jinja_env.get_template(name)
+    flask_app.url_map.update()
+    if workers > 1:
+        # worker อื่นแก้ข้อมูลโดยที่ invalidate ของ worker นี้ไม่ถูกเรียก - ล้าง cache เมื่อ data_version เปลี่ยน
+        @flask_app.before_request
+        def sync_query_cache():
+            query_cache.sync(request_data_version()['version'])
+
+        # รายงานกระจายไปทุก worker - นับเกณฑ์ความเร็วจากฐานข้อมูลที่ทุก worker เห็นร่วมกัน
+        panic_worker.detector = ReportWindows(panic_worker.repository)
+
+    app = flask_app
+    if use_asgi:
+        import uvicorn  # noqa: F401 (ให้ process แม่ล้มตั้งแต่เริ่มถ้ายังไม่ได้ติดตั้ง)
+        import asgi
+        app = asgi.app
+
+    # thread ไม่ติดไปกับ fork และ connection ของ SQLite ห้ามใช้ข้าม process
+    report_batcher.stop()
+    panic_worker.stop()
+    stop_checkpointers()
+    stop_hotness_jobs()
+    Database.close_all()
+    query_cache.clear()
+    gc.collect()
+    gc.freeze()  # object ที่ preload แล้วไม่ถูก gc แตะ หน้าหน่วยความจำจึงใช้ร่วมกับ worker ได้นาน
+    return app
+
+
+def _start_worker_services(index):
+    """เริ่ม thread เบื้องหลังของ worker (เหมือนที่ main.py ทำตอน import แต่หลัง fork)"""
+    from instrumentation import request_metrics
+    from models import panic_worker, report_batcher, start_checkpointer, start_hotness_job
+    from models.metrics import sql_metrics
+
+    request_metrics.reset()
+    sql_metrics.reset()
+    panic_worker.reset()
+    panic_worker.seed()
+    if Config.PANIC_ASYNC:
+        panic_worker.start()
+    if Config.REPORT_BATCHING:
+        report_batcher.start()
+    if index == 0:
+        start_checkpointer()
+        start_hotness_job()
+
+
+def _stop_worker_services():
+    from models import Database, panic_worker, report_batcher
+    from models.database import stop_checkpointers
+    from models.hotness import stop_hotness_jobs
+
+    report_batcher.stop()
+    panic_worker.stop()
+    stop_checkpointers()
+    stop_hotness_jobs()
+    Database.close_all()
+
+
+def _serve_wsgi(app, listener, access_log):
+    from werkzeug.serving import make_server
+    from models import panic_worker
+
+    logging.getLogger('werkzeug').setLevel(logging.INFO if access_log else logging.WARNING)
+    host, port = listener.getsockname()[:2]
+    server = make_server(host, port, app, threaded=True, fd=listener.fileno())
+    server.daemon_threads = False  # server_close รอ request ที่กำลังตอบให้เสร็จ
+
+    def shutdown():
+        panic_worker.events.close()  # ให้ stream ของ /events/panic จบเอง
+        server.shutdown()
+
+    def graceful(signum, frame):
+        threading.Thread(target=shutdown, name='shutdown', daemon=True).start()
+
+    signal.signal(signal.SIGTERM, graceful)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def _serve_asgi(app, listener, access_log):
+    import uvicorn
+    from models import panic_worker
+
+    class Server(uvicorn.Server):
+        async def shutdown(self, sockets=None):
+            panic_worker.events.close()  # ให้ stream ของ /events/panic จบเอง
+            await super().shutdown(sockets)
+
+    config = uvicorn.Config(app, log_level='warning', access_log=access_log,
+                            timeout_graceful_shutdown=Config.SERVER_GRACEFUL_TIMEOUT)
+    # uvicorn ส่ง SIGTERM ที่รับไว้ซ้ำให้ handler เดิมหลังหยุด - handler นี้ไม่ทำอะไร worker จึงได้ปิดฐานข้อมูลต่อ
+    signal.signal(signal.SIGTERM, lambda signum, frame: None)
+    Server(config).run(sockets=[listener])
+
+
+def _worker(app, listener, index, use_asgi, access_log):
+    """ทำงานใน process ลูก - ไม่ return (ออกด้วย os._exit)"""
+    signal.set_wakeup_fd(-1)
+    for signum in WORKER_SIGNALS + (signal.SIGTERM,):
+        signal.signal(signum, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C ถึงทุก process ในกลุ่ม - ให้ process แม่สั่งหยุดเอง
+    code = 0
+    try:
+        _start_worker_services(index)
+        if use_asgi:
+            _serve_asgi(app, listener, access_log)
+        else:
+            _serve_wsgi(app, listener, access_log)
+    except BaseException:
+        logger.exception('worker %d หยุดทำงานเพราะ error', os.getpid())
+        code = 1
+    finally:
+        try:
+            _stop_worker_services()
+        finally:
+            logging.shutdown()
+            os._exit(code)
+
+
+class Arbiter:
+    """process แม่: สร้าง/ดูแล worker, reload และหยุดตามสัญญาณ"""
+
+    def __init__(self, app, listener, workers, use_asgi=False, access_log=False, graceful_timeout=None):
+        self.app = app
+        self.listener = listener
+        self.worker_count = workers
+        self.use_asgi = use_asgi
+        self.access_log = access_log
+        self.graceful_timeout = Config.SERVER_GRACEFUL_TIMEOUT if graceful_timeout is None else graceful_timeout
+        self.generation = 0
+        self.stopping = False
+        self.workers = {}  # pid -> (generation, index, เวลาที่เริ่ม)
+        self.retiring = {}  # pid -> เวลาที่ต้อง SIGKILL ถ้ายังไม่ออก
+        self._signals = []
+        self._failures = 0
+        self._next_spawn = 0.0
+
+    def run(self):
+        """วนดูแล worker จนได้รับสัญญาณให้หยุด คืนค่า exit code"""
+        wakeup_read, wakeup_write = os.pipe()
+        os.set_blocking(wakeup_read, False)
+        os.set_blocking(wakeup_write, False)
+        signal.set_wakeup_fd(wakeup_write)
+        for signum in WORKER_SIGNALS + (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, self._on_signal)
+        try:
+            self._spawn_missing()
+            while True:
+                while self._signals:
+                    signum = self._signals.pop(0)
+                    if signum in (signal.SIGTERM, signal.SIGINT):
+                        self.stop(graceful=True)
+                        return 0
+                    if signum == signal.SIGQUIT:
+                        self.stop(graceful=False)
+                        return 0
+                    if signum == signal.SIGHUP:
+                        self.reload()
+                self._reap()
+                self._kill_overdue()
+                self._spawn_missing()
+                try:
+                    select.select([wakeup_read], [], [], 1.0)
+                    os.read(wakeup_read, 4096)
+                except (BlockingIOError, InterruptedError):
+                    pass
+        finally:
+            signal.set_wakeup_fd(-1)
+            os.close(wakeup_read)
+            os.close(wakeup_write)
+
+    def _on_signal(self, signum, frame):
+        if signum != signal.SIGCHLD:
+            self._signals.append(signum)
+
+    def spawn(self, index):
+        pid = os.fork()
+        if pid == 0:
+            _worker(self.app, self.listener, index, self.use_asgi, self.access_log)
+        self.workers[pid] = (self.generation, index, time.monotonic())
+        logger.info('เริ่ม worker %d (ลำดับ %d รุ่น %d)', pid, index, self.generation)
+        return pid
+
+    def _spawn_missing(self):
+        if time.monotonic() < self._next_spawn:
+            return
+        current = {index for generation, index, _ in self.workers.values() if generation == self.generation}
+        for index in range(self.worker_count):
+            if index not in current:
+                self.spawn(index)
+
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            self.retiring.pop(pid, None)
+            worker = self.workers.pop(pid, None)
+            if worker is None:
+                continue
+            generation, index, started = worker
+            code = os.waitstatus_to_exitcode(status)
+            if generation != self.generation or self.stopping:
+                continue  # worker ชุดเก่าที่ reload หรือถูกสั่งหยุด
+            logger.warning('worker %d หยุดทำงาน (exit code %d) - สร้างใหม่', pid, code)
+            # worker ที่ตายทันทีหลังเริ่มซ้ำ ๆ (เช่นฐานข้อมูลเปิดไม่ได้) - รอนานขึ้นเรื่อย ๆ ก่อนสร้างใหม่
+            if time.monotonic() - started < 1.0:
+                self._failures += 1
+                self._next_spawn = time.monotonic() + min(2 ** self._failures / 4, RESPAWN_BACKOFF_MAX)
+            else:
+                self._failures = 0
+
+    def _kill_overdue(self):
+        now = time.monotonic()
+        for pid, deadline in list(self.retiring.items()):
+            if now >= deadline:
+                logger.warning('worker %d ไม่ออกภายใน %ds - SIGKILL', pid, self.graceful_timeout)
+                self._kill(pid, signal.SIGKILL)
+                self.retiring[pid] = float('inf')
+
+    def _kill(self, pid, signum):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def _retire(self, pids):
+        deadline = time.monotonic() + self.graceful_timeout
+        for pid in pids:
+            self.retiring.setdefault(pid, deadline)
+            self._kill(pid, signal.SIGTERM)
+
+    def reload(self):
+        """สร้าง worker รุ่นใหม่ครบจำนวนก่อน แล้วค่อยให้รุ่นเดิมออกแบบ graceful (ไม่มีช่วงที่ไม่มีผู้รับ request)"""
+        old = [pid for pid, (generation, _, _) in self.workers.items() if generation == self.generation]
+        self.generation += 1
+        self._failures, self._next_spawn = 0, 0.0
+        logger.info('reload: worker รุ่น %d', self.generation)
+        self._spawn_missing()
+        self._retire(old)
+
+    def stop(self, graceful=True):
+        """หยุด worker ทั้งหมด (graceful: SIGTERM แล้วรอไม่เกิน graceful_timeout ก่อน SIGKILL)"""
+        self.stopping = True
+        if graceful:
+            self._retire(list(self.workers))
+        else:
+            for pid in list(self.workers):
+                self._kill(pid, signal.SIGKILL)
+                self.retiring[pid] = float('inf')
+        while self.workers:
+            self._reap()
+            self._kill_overdue()
+            if self.workers:
+                time.sleep(0.1)
+
+
+def serve(args):
+    if args.db:
+        Config.DATABASE_NAME = args.db
+    workers = args.workers or default_workers()
+    host = args.host or Config.HOST
+    port = Config.PORT if args.port is None else args.port
+    try:
+        listener = socket.create_server((host, port), backlog=args.backlog or Config.SERVER_BACKLOG)
+    except OSError as error:
+        if error.errno == errno.EADDRINUSE:
+            sys.exit(f'พอร์ต {port} ถูกใช้งานอยู่')
+        raise
+    listener.set_inheritable(True)
+    app = preload(args.asgi, workers)
+    host, port = listener.getsockname()[:2]
+    print(f"📍 {'ASGI' if args.asgi else 'WSGI'} prefork: http://{host}:{port} "
+          f"(worker {workers} ตัว, process แม่ {os.getpid()})", flush=True)
+    arbiter = Arbiter(app, listener, workers, use_asgi=args.asgi, access_log=args.access_log)
+    try:
+        return arbiter.run()
+    finally:
+        listener.close()
+
+
+COMMANDS = {
+    'serve': serve,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python server.py', description='prefork server ของระบบติดตามข่าวลือ')
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve_command = commands.add_parser('serve', help='รับ request ด้วย worker หลาย process')
+    serve_command.add_argument('--workers', type=int, help='จำนวน worker (ค่าเริ่มต้น Config.SERVER_WORKERS หรือจำนวน CPU)')
+    serve_command.add_argument('--host', help=f'ค่าเริ่มต้น {Config.HOST}')
+    serve_command.add_argument('--port', type=int, help=f'ค่าเริ่มต้น {Config.PORT} (0 = สุ่มพอร์ตว่าง)')
+    serve_command.add_argument('--backlog', type=int, help=f'ค่าเริ่มต้น {Config.SERVER_BACKLOG}')
+    serve_command.add_argument('--db', help='ไฟล์ฐานข้อมูล (ค่าเริ่มต้น Config.DATABASE_NAME)')
+    serve_command.add_argument('--asgi', action='store_true', help='worker รัน asgi.py บน uvicorn (ต้องติดตั้ง uvicorn)')
+    serve_command.add_argument('--access-log', action='store_true', help='บันทึกทุก request ลง stderr')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(process)d %(levelname)s %(message)s')
+    return COMMANDS[args.command](args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
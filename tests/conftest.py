@@ -0,0 +1,13 @@
+"""
+fixture ร่วมของชุดทดสอบ - ทุกการทดสอบใช้ฐานข้อมูลชั่วคราว ไม่แตะ rumor_tracking.db ของโปรเจกต์
+"""
+import pytest
+from config.settings import Config
+
+
+@pytest.fixture(autouse=True)
+def scratch_database(tmp_path, monkeypatch):
+    """ชี้ Config.DATABASE_NAME ไปที่ไฟล์ชั่วคราว (เผื่อโค้ดที่ migrate ฐานข้อมูลหลักตอน import)"""
+    path = str(tmp_path / 'rumour.db')
+    monkeypatch.setattr(Config, 'DATABASE_NAME', path)
+    return path
@@ -0,0 +1,23 @@
+"""
+ผู้อ่านไม่ถูกบล็อกระหว่างเขียนต่อเนื่องใน WAL และรายงานที่ตอบว่าบันทึกแล้วอยู่ครบ ไม่ซ้ำ ตัวนับตรง
+"""
+import pytest
+from benchmarks import concurrency, dataset
+
+
+@pytest.fixture
+def small_dataset(tmp_path):
+    path = str(tmp_path / 'bench.db')
+    dataset.generate(path, users=300, rumours=60, reports=2_000)
+    return path
+
+
+def test_wal_readers_and_writers_are_not_locked(small_dataset):
+    from models import query_cache
+    enabled = query_cache.enabled
+    try:
+        results = concurrency.run(small_dataset, readers=2, writers=2, writes=200)
+    finally:
+        query_cache.enabled = enabled
+    assert set(results) == {'DELETE', 'WAL'}
+    assert concurrency.check(results) == []
@@ -0,0 +1,16 @@
+"""
+route เดิมทำงานตรงกับพฤติกรรมของโค้ดต้นฉบับ (ฐานข้อมูลชุดเล็กและนาฬิกาคงที่ของ benchmarks.parity)
+"""
+from benchmarks import parity
+
+
+def test_routes_match_original_behaviour():
+    results = parity.run()
+    assert results['failed'] == []
+    assert parity.check(results) == []
+
+
+def test_parity_detects_changed_threshold(monkeypatch):
+    from config.settings import Config
+    monkeypatch.setattr(Config, 'PANIC_THRESHOLD', Config.PANIC_THRESHOLD - 1)
+    assert parity.run()['failed']
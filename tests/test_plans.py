@@ -0,0 +1,24 @@
+"""
+query หลักของ Model ต้องใช้ index ตาม QUERY_PLANS และไม่เรียงผลด้วย temp b-tree
+"""
+import sqlite3
+from database import check_query_plans, insert_sample_data, migrate
+
+
+def test_query_plans_use_indexes(scratch_database):
+    assert check_query_plans(scratch_database) == []
+
+
+def test_query_plans_with_sample_data(scratch_database):
+    migrate(scratch_database)
+    insert_sample_data(scratch_database)
+    assert check_query_plans(scratch_database) == []
+
+
+def test_missing_index_is_reported(scratch_database):
+    migrate(scratch_database)
+    conn = sqlite3.connect(scratch_database)
+    conn.execute("DROP INDEX idx_rumour_hotness")
+    conn.close()
+    problems = check_query_plans(scratch_database)
+    assert problems and all('idx_rumour_hotness' in problem for problem in problems)